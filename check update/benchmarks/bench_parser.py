@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析基准与回归语料
+在保存的页面和合成页面上运行 parse_video_info / _extract_* / _parse_relative_time，
+报告 页面/秒、容器/秒、峰值内存和内存块数，并与保存的基线对比；
+同时校验解析输出与基线（及两种解析后端之间）完全一致
+
+用法:
+    python benchmarks/bench_parser.py                  # 运行并与基线对比
+    python benchmarks/bench_parser.py --save-baseline  # 运行并保存为新基线
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.append(BASE_DIR)
+sys.path.append(BENCH_DIR)
+
+from services.web_scraper import WebScraper
+from synthetic import make_videos, render_creator_page
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'parser_baseline.json')
+SAVED_PAGES = ['user_page.html', 'debug_page.html']
+
+# 固定基准时间，保证相对时间解析结果可复现
+RUN_TIMESTAMP = datetime(2026, 1, 1, 12, 0, 0)
+
+def build_corpus(synthetic_pages: int = 30, seed: int = 42) -> list:
+    """语料：[(名称, html, 页面地址), ...]"""
+    corpus = []
+    for name in SAVED_PAGES:
+        path = os.path.join(BASE_DIR, name)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                corpus.append((name, f.read(), 'https://hsex.men'))
+
+    rng = random.Random(seed)
+    for i in range(synthetic_pages):
+        videos = make_videos(seed + i, rng.choice([8, 15, 24, 40, 60]), now=RUN_TIMESTAMP,
+                             mean_interval_hours=rng.choice([6, 24, 72, 240]))
+        author = f"creator{i:03d}"
+        corpus.append((f"synthetic/{author}", render_creator_page(author, videos, now=RUN_TIMESTAMP),
+                       f"https://hsex.icu/user.htm?author={author}"))
+    return corpus
+
+def make_scraper(backend: str) -> WebScraper:
+    scraper = WebScraper(parser_backend=backend)
+    scraper.run_timestamp = RUN_TIMESTAMP
+    return scraper
+
+def digest(videos: list) -> str:
+    """解析输出的摘要，用于回归比对"""
+    rows = [
+        [v['video_id'], v['title'], v['thumbnail_url'], v['relative_time'], v['upload_time'].isoformat()]
+        for v in videos
+    ]
+    return hashlib.sha256(json.dumps(rows, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+def measure(fn, rounds: int, pages: int, containers: int) -> dict:
+    """计时（不开tracemalloc）+ 单独一轮测内存"""
+    fn()  # 预热
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = fn()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    return {
+        'seconds_per_round': elapsed / rounds,
+        'pages_per_sec': pages * rounds / elapsed if pages else 0.0,
+        'containers_per_sec': containers * rounds / elapsed if containers else 0.0,
+        'peak_kib': peak / 1024,
+        'alloc_blocks': blocks
+    }
+
+def run_benchmarks(corpus: list, rounds: int) -> tuple:
+    """返回 (指标, 每页输出摘要, 后端不一致的页面)"""
+    results = {}
+    digests = {}
+    mismatches = []
+
+    outputs = {}
+    for backend in ('bs4', 'lxml'):
+        scraper = make_scraper(backend)
+        outputs[backend] = {name: scraper.parse_video_info(html, url) for name, html, url in corpus}
+    for name, _, _ in corpus:
+        digests[name] = digest(outputs['bs4'][name])
+        if digest(outputs['lxml'][name]) != digests[name]:
+            mismatches.append(name)
+
+    pages = len(corpus)
+    containers = sum(len(videos) for videos in outputs['bs4'].values())
+
+    for backend in ('bs4', 'lxml'):
+        scraper = make_scraper(backend)
+        results[f'parse_video_info[{backend}]'] = measure(
+            lambda: [scraper.parse_video_info(html, url) for _, html, url in corpus],
+            rounds, pages, containers
+        )
+
+    # 单个提取函数：在已建好的容器上计时，不含建树
+    from bs4 import BeautifulSoup
+    scraper = make_scraper('bs4')
+    items = []
+    for _, html, url in corpus:
+        soup = BeautifulSoup(html, 'lxml')
+        domain = scraper._get_domain(url)
+        items.extend((container, url, domain) for container in scraper._find_containers(soup, domain))
+    extractors = {
+        '_extract_video_id': lambda c, u, d: scraper._extract_video_id(c),
+        '_extract_title': lambda c, u, d: scraper._extract_title(c, d),
+        '_extract_thumbnail': lambda c, u, d: scraper._extract_thumbnail(c, u, d),
+        '_extract_time': lambda c, u, d: scraper._extract_time(c, d),
+    }
+    for label, extractor in extractors.items():
+        results[label] = measure(
+            lambda extractor=extractor: [extractor(c, u, d) for c, u, d in items],
+            rounds, 0, len(items)
+        )
+
+    time_texts = [v['relative_time'] for videos in outputs['bs4'].values() for v in videos]
+    results['_parse_relative_time'] = measure(
+        lambda: [scraper._parse_relative_time(t) for t in time_texts],
+        rounds, 0, len(time_texts)
+    )
+    return results, digests, mismatches
+
+def print_report(results: dict, baseline: dict = None):
+    base_results = (baseline or {}).get('results', {})
+    print(f"{'基准项':<28}{'页面/秒':>10}{'容器/秒':>12}{'峰值KiB':>10}{'内存块':>8}{'对比基线':>10}")
+    for label, r in results.items():
+        delta = ''
+        old = base_results.get(label)
+        if old and old.get('seconds_per_round'):
+            change = (old['seconds_per_round'] - r['seconds_per_round']) / old['seconds_per_round']
+            delta = f"{change:+.0%}"
+        print(f"{label:<28}{r['pages_per_sec']:>10.1f}{r['containers_per_sec']:>12.0f}"
+              f"{r['peak_kib']:>10.0f}{r['alloc_blocks']:>8}{delta:>10}")
+
+def main():
+    ap = argparse.ArgumentParser(description="解析基准与回归语料")
+    ap.add_argument('--rounds', type=int, default=5, help='计时轮数')
+    ap.add_argument('--synthetic', type=int, default=30, help='合成页面数量')
+    ap.add_argument('--baseline', default=DEFAULT_BASELINE, help='基线文件路径')
+    ap.add_argument('--save-baseline', action='store_true', help='把本次结果保存为基线')
+    args = ap.parse_args()
+
+    logging.disable(logging.WARNING)
+    corpus = build_corpus(args.synthetic)
+    results, digests, mismatches = run_benchmarks(corpus, args.rounds)
+    logging.disable(logging.NOTSET)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print(f"📚 语料: {len(corpus)} 个页面\n")
+    print_report(results, None if args.save_baseline else baseline)
+
+    failed = False
+    if mismatches:
+        failed = True
+        print(f"\n❌ lxml 与 BeautifulSoup 输出不一致: {mismatches}")
+
+    if baseline and not args.save_baseline:
+        changed = [name for name, d in digests.items() if baseline.get('digests', {}).get(name) not in (None, d)]
+        if changed:
+            failed = True
+            print(f"\n❌ 解析输出与基线不一致: {changed}")
+        else:
+            print("\n✅ 解析输出与基线一致")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'python': platform.python_version(),
+                'rounds': args.rounds,
+                'results': results,
+                'digests': digests
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 基线已保存: {args.baseline}")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
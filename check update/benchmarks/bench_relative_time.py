@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相对时间解析基准
+在真实时间文本语料上对比原 _parse_relative_time 与 utils.relative_time 的速度，并校验结果一致
+
+用法: python benchmarks/bench_relative_time.py [--rounds 20]
+"""
+
+import os
+import re
+import sys
+import time
+import logging
+import argparse
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from utils.relative_time import RelativeTimeParser
+
+logger = logging.getLogger(__name__)
+
+def legacy_parse_relative_time(time_str: str, now: datetime) -> datetime:
+    """原 WebScraper._parse_relative_time（仅把 datetime.now() 换成传入的 now）"""
+    try:
+        if not time_str or time_str == '最近更新':
+            return now
+
+        logger.debug(f"解析时间字符串: {time_str}")
+
+        # 清理字符串，移除多余的空白字符和特殊字符
+        time_str = ' '.join(time_str.split())
+        time_str = re.sub(r'[^\w\s\-:]+', '', time_str).strip()
+
+        # 首先尝试解析完整日期格式
+        date_patterns = [
+            r'(\d{4})-(\d{1,2})-(\d{1,2})',  # YYYY-MM-DD
+            r'(\d{1,2})-(\d{1,2})-(\d{4})',  # DD-MM-YYYY
+            r'(\d{1,2})/(\d{1,2})/(\d{4})',   # MM/DD/YYYY
+            r'(\d{4})/(\d{1,2})/(\d{1,2})'    # YYYY/MM/DD
+        ]
+
+        for pattern in date_patterns:
+            match = re.search(pattern, time_str)
+            if match:
+                groups = match.groups()
+                if len(groups) == 3:
+                    # 根据格式确定年月日
+                    if pattern.startswith(r'(\d{4})'):
+                        year, month, day = int(groups[0]), int(groups[1]), int(groups[2])
+                    elif pattern.startswith(r'(\d{1,2})-(\d{1,2})-(\d{4})'):
+                        day, month, year = int(groups[0]), int(groups[1]), int(groups[2])
+                    else:
+                        month, day, year = int(groups[0]), int(groups[1]), int(groups[2])
+
+                    try:
+                        return datetime(year, month, day)
+                    except ValueError:
+                        continue
+
+        # 解析相对时间 - 英文格式
+        patterns = [
+            (r'(\d+)\s*day[s]?\s*ago', 'days'),
+            (r'(\d+)\s*hour[s]?\s*ago', 'hours'),
+            (r'(\d+)\s*minute[s]?\s*ago', 'minutes'),
+            (r'(\d+)\s*week[s]?\s*ago', 'weeks'),
+            (r'(\d+)\s*month[s]?\s*ago', 'months'),
+            (r'(\d+)\s*year[s]?\s*ago', 'years'),
+            # 中文格式
+            (r'(\d+)\s*天前', 'days'),
+            (r'(\d+)\s*小时前', 'hours'),
+            (r'(\d+)\s*分钟前', 'minutes'),
+            (r'(\d+)\s*周前', 'weeks'),
+            (r'(\d+)\s*月前', 'months'),
+            (r'(\d+)\s*年前', 'years')
+        ]
+
+        for pattern, unit in patterns:
+            match = re.search(pattern, time_str, re.IGNORECASE)
+            if match:
+                value = int(match.group(1))
+                if unit == 'days':
+                    return now - timedelta(days=value)
+                elif unit == 'hours':
+                    return now - timedelta(hours=value)
+                elif unit == 'minutes':
+                    return now - timedelta(minutes=value)
+                elif unit == 'weeks':
+                    return now - timedelta(weeks=value)
+                elif unit == 'months':
+                    return now - timedelta(days=30*value)
+                elif unit == 'years':
+                    return now - timedelta(days=365*value)
+
+        # 尝试解析英文月份格式
+        month_patterns = [
+            r'(\w+)\s+(\d{1,2}),?\s+(\d{4})',  # Month DD, YYYY
+            r'(\d{1,2})\s+(\w+)\s+(\d{4})',  # DD Month YYYY
+        ]
+
+        month_map = {
+            'jan': 1, 'january': 1, 'feb': 2, 'february': 2, 'mar': 3, 'march': 3,
+            'apr': 4, 'april': 4, 'may': 5, 'jun': 6, 'june': 6,
+            'jul': 7, 'july': 7, 'aug': 8, 'august': 8,
+            'sep': 9, 'september': 9, 'oct': 10, 'october': 10,
+            'nov': 11, 'november': 11, 'dec': 12, 'december': 12
+        }
+
+        for pattern in month_patterns:
+            match = re.search(pattern, time_str, re.IGNORECASE)
+            if match:
+                groups = match.groups()
+                if len(groups) == 3:
+                    # 解析月份
+                    month_str = groups[0].lower() if groups[0].isalpha() else groups[1].lower()
+                    month = month_map.get(month_str, 1)
+
+                    # 解析日和年
+                    if groups[0].isdigit():
+                        day = int(groups[0])
+                        year = int(groups[2])
+                    else:
+                        day = int(groups[1])
+                        year = int(groups[2])
+
+                    try:
+                        return datetime(year, month, day)
+                    except ValueError:
+                        continue
+
+        logger.warning(f"无法解析的时间格式: {time_str}")
+        return now
+
+    except Exception as e:
+        logger.error(f"解析时间失败: {str(e)}")
+        return now
+
+
+def load_corpus() -> list:
+    """
+    构建时间文本语料：保存页面里的真实文本 + 站点常见格式
+    按真实页面的分布重复，模拟一次检查中大量重复的文本
+    """
+    from services.web_scraper import WebScraper
+
+    corpus = []
+    scraper = WebScraper(parser_backend='bs4')
+    for name in ['user_page.html', 'debug_page.html']:
+        path = os.path.join(BASE_DIR, name)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                html = f.read()
+            corpus.extend(v['relative_time'] for v in scraper.parse_video_info(html, 'https://hsex.men'))
+
+    common = (
+        [f'{n}天前' for n in range(1, 7)] * 6 +
+        [f'{n}小时前' for n in range(1, 24)] * 2 +
+        [f'{n}分钟前' for n in (5, 10, 30)] +
+        [f'{n}周前' for n in range(1, 4)] * 3 +
+        [f'{n}月前' for n in range(1, 12)] * 8 +
+        [f'{n}年前' for n in range(1, 4)] * 4 +
+        ['最近更新', '3 days ago', '1 hour ago', '2 weeks ago', '5 Months Ago',
+         '2024-01-05', '05-01-2024', 'March 3, 2023', '3 March 2023', '1个月前', '刚刚']
+    )
+    return corpus * 20 + common * 10
+
+def run(rounds: int):
+    corpus = load_corpus()
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    distinct = len(set(corpus))
+    print(f"📚 语料: {len(corpus)} 条，{distinct} 种不同文本")
+
+    # 结果一致性
+    parser = RelativeTimeParser()
+    mismatches = [t for t in set(corpus) if parser.parse(t, now) != legacy_parse_relative_time(t, now)]
+    if mismatches:
+        print(f"❌ 结果不一致: {mismatches[:10]}")
+        return 1
+    print("✅ 结果与原实现一致")
+
+    logging.disable(logging.WARNING)
+    try:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for text in corpus:
+                legacy_parse_relative_time(text, now)
+        legacy_elapsed = time.perf_counter() - start
+
+        # 每轮用新的解析器，记忆只在一轮（一次检查）内生效
+        start = time.perf_counter()
+        for _ in range(rounds):
+            parser = RelativeTimeParser()
+            for text in corpus:
+                parser.parse(text, now)
+        new_elapsed = time.perf_counter() - start
+    finally:
+        logging.disable(logging.NOTSET)
+
+    total = len(corpus) * rounds
+    print(f"⏱️  原实现: {legacy_elapsed * 1e6 / total:.2f} µs/条 ({total / legacy_elapsed:,.0f} 条/秒)")
+    print(f"⚡ 新实现: {new_elapsed * 1e6 / total:.2f} µs/条 ({total / new_elapsed:,.0f} 条/秒)")
+    print(f"🚀 加速: {legacy_elapsed / new_elapsed:.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="相对时间解析基准")
+    ap.add_argument('--rounds', type=int, default=20, help='重复轮数')
+    args = ap.parse_args()
+    sys.exit(run(args.rounds))
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线端到端检查基准
+record 模式对真实站点跑一次完整检查，把所有请求/响应录成归档，并保存检查前的数据库快照；
+replay 模式从同一快照出发、按归档回放，得到不受网络和站点限速影响、可重复的检查耗时
+
+用法:
+    python benchmarks/bench_replay.py record --db ../database.sqlite --archive run.har.jsonl.gz
+    python benchmarks/bench_replay.py replay --archive run.har.jsonl.gz [--latency-scale 0.5] [--unthrottled]
+"""
+
+import os
+import sys
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import tempfile
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.append(BASE_DIR)
+
+from models.database import init_db
+from services.update_checker import UpdateChecker
+from services.request_manager import request_manager
+from utils.http_archive import http_archive
+from utils.page_cache import page_cache
+
+def snapshot_path(archive: str) -> str:
+    """归档对应的数据库快照"""
+    return archive + '.sqlite'
+
+def run_check(db_path: str, workers: int = None) -> dict:
+    """在 db_path 上跑一次完整检查，返回耗时和结果统计"""
+    session = init_db(db_path)
+    try:
+        checker = UpdateChecker(session, max_workers=workers)
+        kinds = Counter()
+        found = []
+        start = time.perf_counter()
+        for result in checker.iter_check_results():
+            kinds[result.kind] += 1
+            found.extend(f"{result.bookmark.id}:{video.video_id}" for video in result.videos)
+        elapsed = time.perf_counter() - start
+    finally:
+        session.close()
+    return {
+        'elapsed': elapsed,
+        'bookmarks': sum(kinds.values()),
+        'kinds': dict(kinds),
+        'videos': len(found),
+        # 回放结果的摘要，两次回放应完全一致
+        'digest': hashlib.sha256('\n'.join(sorted(found)).encode('utf-8')).hexdigest()[:16]
+    }
+
+def report(stats: dict):
+    rate = stats['bookmarks'] / stats['elapsed'] if stats['elapsed'] else 0
+    print(f"书签 {stats['bookmarks']}  结果 {stats['kinds']}  新视频 {stats['videos']}  摘要 {stats['digest']}")
+    print(f"耗时 {stats['elapsed']:.2f} 秒，{rate:.1f} 书签/秒")
+    print(f"HTTP归档: {http_archive.get_stats()}")
+
+def main():
+    ap = argparse.ArgumentParser(description="离线端到端检查基准")
+    sub = ap.add_subparsers(dest='command', required=True)
+
+    p_record = sub.add_parser('record', help='对真实站点检查并录制')
+    p_record.add_argument('--db', required=True, help='源数据库（不会被修改）')
+    p_record.add_argument('--archive', required=True)
+    p_record.add_argument('--workers', type=int, default=None)
+
+    p_replay = sub.add_parser('replay', help='按归档离线回放')
+    p_replay.add_argument('--archive', required=True)
+    p_replay.add_argument('--latency-scale', type=float, default=1.0, help='回放耗时比例，0 表示不等待')
+    p_replay.add_argument('--unthrottled', action='store_true', help='关闭请求管理器的域名间隔和全局限速')
+    p_replay.add_argument('--workers', type=int, default=None)
+    p_replay.add_argument('--rounds', type=int, default=1)
+
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+    work_dir = tempfile.mkdtemp(prefix='bench_replay_')
+    # 页面缓存放到临时目录，避免命中本机缓存或发出条件请求
+    page_cache.cache_dir = os.path.join(work_dir, 'pages')
+    page_cache._ensure_cache_dir()
+    try:
+        if args.command == 'record':
+            shutil.copyfile(args.db, snapshot_path(args.archive))
+            db_path = os.path.join(work_dir, 'record.sqlite')
+            shutil.copyfile(args.db, db_path)
+            http_archive.record(args.archive)
+            try:
+                stats = run_check(db_path, args.workers)
+            finally:
+                http_archive.stop()
+            report(stats)
+            return
+
+        if args.unthrottled:
+            request_manager.domain_min_interval = 0
+            request_manager.global_rate_limit = float('inf')
+        for round_no in range(args.rounds):
+            db_path = os.path.join(work_dir, f'replay{round_no}.sqlite')
+            shutil.copyfile(snapshot_path(args.archive), db_path)
+            page_cache.clear_all()
+            http_archive.replay(args.archive, args.latency_scale)
+            try:
+                stats = run_check(db_path, args.workers)
+                print(f"--- 第 {round_no + 1} 轮")
+                report(stats)
+            finally:
+                http_archive.stop()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
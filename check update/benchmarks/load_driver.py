@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成站点压测驱动
+建一个含 N 个书签的临时数据库，全部指向合成站点（synthetic_site.py），用 UpdateChecker
+连续跑几轮完整检查，报告吞吐、单书签耗时分布、结果写入、页面缓存、数据库大小和服务器统计
+
+用法:
+    python benchmarks/load_driver.py --bookmarks 10000 --workers 16 --unthrottled --latency-ms 50
+    python benchmarks/load_driver.py --bookmarks 50000 --url http://127.0.0.1:8765   # 使用已启动的站点
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import urllib.request
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.append(BASE_DIR)
+sys.path.append(BENCH_DIR)
+
+from sqlalchemy import insert
+
+from models.database import init_db, Bookmark, Settings
+from services.update_checker import UpdateChecker
+from services.request_manager import request_manager
+from utils.page_cache import page_cache
+from synthetic_site import add_site_arguments, site_from_args, start_server
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def populate(session, base_urls: list, count: int, update_range_days: int):
+    """写入 count 个书签，按顺序轮流分到各个站点地址（不同地址视为不同域名）"""
+    rows = [{
+        'url': f"{base_urls[i % len(base_urls)]}/user.htm?author=creator{i:05d}",
+        'name': f"creator{i:05d}"
+    } for i in range(count)]
+    engine = session.get_bind()
+    with engine.begin() as conn:
+        for start in range(0, len(rows), 5000):
+            conn.execute(insert(Bookmark.__table__), rows[start:start + 5000])
+    session.add(Settings(check_interval=3600, update_range_days=update_range_days))
+    session.commit()
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+def server_stats(base_url: str) -> dict:
+    try:
+        with urllib.request.urlopen(f"{base_url}/__stats", timeout=5) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except Exception:
+        return {}
+
+def run_once(session, workers: int) -> dict:
+    checker = UpdateChecker(session, max_workers=workers)
+    kinds = Counter()
+    elapsed_per_bookmark = []
+    videos = 0
+    first_result = None
+    start = time.perf_counter()
+    for result in checker.iter_check_results():
+        if first_result is None:
+            first_result = time.perf_counter() - start
+        kinds[result.kind] += 1
+        elapsed_per_bookmark.append(result.elapsed)
+        videos += len(result.videos)
+    elapsed = time.perf_counter() - start
+    return {
+        'elapsed': elapsed,
+        'bookmarks': sum(kinds.values()),
+        'rate': sum(kinds.values()) / elapsed if elapsed else 0.0,
+        'first_result': first_result or 0.0,
+        'kinds': dict(kinds),
+        'videos': videos,
+        'p50': percentile(elapsed_per_bookmark, 0.5),
+        'p95': percentile(elapsed_per_bookmark, 0.95),
+        'writer': checker.last_writer_stats
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description="合成站点压测驱动")
+    ap.add_argument('--bookmarks', type=int, default=1000)
+    ap.add_argument('--workers', type=int, default=None)
+    ap.add_argument('--runs', type=int, default=2, help='连续检查轮数（第二轮起走增量和缓存路径）')
+    ap.add_argument('--update-range-days', type=int, default=30)
+    ap.add_argument('--url', action='append', help='已启动站点的地址（可多次给出），不给则在进程内启动')
+    ap.add_argument('--hosts', type=int, default=1, help='进程内站点使用的回环地址数（127.0.0.1~N，各算一个域名）')
+    ap.add_argument('--unthrottled', action='store_true', help='关闭请求管理器的域名间隔和全局限速')
+    ap.add_argument('--db', default=None, help='保留数据库到该路径（默认用临时文件）')
+    add_site_arguments(ap)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+    work_dir = tempfile.mkdtemp(prefix='load_driver_')
+    page_cache.cache_dir = os.path.join(work_dir, 'pages')
+    page_cache._ensure_cache_dir()
+
+    server = None
+    if args.url:
+        base_urls = [url.rstrip('/') for url in args.url]
+    else:
+        site = site_from_args(args)
+        server, base_url = start_server(site, '0.0.0.0' if args.hosts > 1 else '127.0.0.1', 0)
+        port = server.server_address[1]
+        base_urls = [f"http://127.0.0.{i + 1}:{port}" for i in range(args.hosts)]
+
+    if args.unthrottled:
+        request_manager.domain_min_interval = 0
+        request_manager.global_rate_limit = float('inf')
+        request_manager.domain_max_concurrency = args.workers or 64
+
+    db_path = args.db or os.path.join(work_dir, 'load.sqlite')
+    session = init_db(db_path)
+    try:
+        start = time.perf_counter()
+        populate(session, base_urls, args.bookmarks, args.update_range_days)
+        print(f"📋 {args.bookmarks} 个书签，{len(base_urls)} 个域名，建库 {time.perf_counter() - start:.1f} 秒")
+
+        for run_no in range(args.runs):
+            before = server_stats(base_urls[0])
+            stats = run_once(session, args.workers)
+            after = server_stats(base_urls[0])
+            print(f"--- 第 {run_no + 1} 轮")
+            print(f"耗时 {stats['elapsed']:.1f} 秒  {stats['rate']:.1f} 书签/秒  首个结果 {stats['first_result']:.2f} 秒")
+            print(f"结果 {stats['kinds']}  新视频 {stats['videos']}  单书签 p50 {stats['p50']:.2f} 秒 p95 {stats['p95']:.2f} 秒")
+            print(f"写入 {stats['writer']}")
+            print(f"页面缓存 {page_cache.get_stats()}")
+            wal_path = db_path + '-wal'
+            wal_size = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+            print(f"数据库 {os.path.getsize(db_path) / 1024 / 1024:.1f} MB  WAL {wal_size / 1024 / 1024:.1f} MB")
+            if before and after:
+                status = Counter(after['status'])
+                status.subtract(before['status'])
+                print(f"站点 请求 {after['requests'] - before['requests']}  状态 {dict(+status)}")
+        if resource is not None:
+            print(f"峰值内存 {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    finally:
+        session.close()
+        if server is not None:
+            server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
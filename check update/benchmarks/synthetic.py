@@ -0,0 +1,144 @@
+"""
+合成创作者页面
+按真实站点的标记结构（.col-xs-6.col-md-3 卡片、video-N.htm 链接、"N天前"时间）生成页面，
+供解析基准和本地压测服务器使用
+"""
+
+import random
+from datetime import datetime, timedelta
+from html import escape
+from typing import Dict, List, Optional
+
+_TITLE_WORDS = ['泉州', '后入', '瑜伽裤', '原创', '自拍', '周末', '旅行', '夜景', '日常', '合集',
+                '高清', '第二弹', '完整版', '花絮', '精选', 'Vlog', 'HD', 'part']
+
+_PAGE_HEAD = '''<!DOCTYPE html>
+<html lang="zh-CN">
+    <head>
+    <title>“{author}”的视频合集 - 好色™ Tv</title>
+    <meta charset="utf-8">
+    <link href="/npm/bootstrap@3.4.1/dist/css/bootstrap.min.css" rel="stylesheet"/>
+    <link href="/static/css/global.css" rel="stylesheet"/>
+    </head>
+    <body>
+        <div class="container" id = "container">
+<nav aria-label="Page navigation" class="text-center">
+    <ul class="pagination1">
+{pagination}            </ul>
+</nav>
+<div class="row body">
+'''
+
+_CARD = '''          <div class="col-xs-6 col-md-3">
+        <div class="thumbnail">
+            <a target="_self" href="video-{video_id}.htm">
+                <div class="image" style="background-image: url('https://img.example.com/thumb/{video_id}.webp')" title= "{title}">
+                    <div class="marker-overlays">
+                        <var class="duration">
+                            {duration}</var>                    </div>
+                </div>
+            </a>
+            <div class="caption title">
+                <h5><a target="_self" href="video-{video_id}.htm">{title}</a></h5>
+            </div>
+            <div class="info">
+                <p>&nbsp;&nbsp;<a target="_self" href="user.htm?author={author}">&nbsp;{author}</a><br/>
+                &nbsp;&nbsp;{views}次观看&nbsp;&nbsp;{time_text}</p>
+            </div>
+        </div>
+      </div>
+'''
+
+_PAGE_TAIL = '''    </div>
+<nav aria-label="Page navigation" class="text-center">
+    <ul class="pagination1">
+            </ul>
+</nav>
+    </div>
+    <footer>
+        <div class="container">
+            <div class="footerNav text-center">
+                Copyright ©2016-2025 好色™ Tv 版权所有<br>
+            </div>
+        </div>
+    </footer>
+</body>
+</html>
+'''
+
+def format_age(age: timedelta, uploaded: datetime) -> str:
+    """按站点的习惯把视频年龄格式化为时间文本"""
+    seconds = int(age.total_seconds())
+    if seconds < 3600:
+        return f"{max(1, seconds // 60)}分钟前"
+    if seconds < 86400:
+        return f"{seconds // 3600}小时前"
+    if age.days < 30:
+        return f"{age.days}天前"
+    if age.days < 365:
+        return f"{age.days // 30}月前"
+    return f"{uploaded.year}-{uploaded.month}-{uploaded.day}"
+
+def format_views(views: int) -> str:
+    if views >= 1000:
+        return f"{views / 1000:.1f}k"
+    return str(views)
+
+def make_videos(seed: int, count: int, now: Optional[datetime] = None,
+                mean_interval_hours: float = 72.0, first_video_id: int = 1000000) -> List[Dict]:
+    """
+    生成一个创作者的视频列表（按上传时间倒序）
+
+    Args:
+        seed: 随机种子，相同种子生成相同列表
+        count: 视频数量
+        now: 基准时间
+        mean_interval_hours: 平均发布间隔（小时）
+        first_video_id: 最早视频的ID
+    """
+    rng = random.Random(seed)
+    now = now or datetime.now()
+    videos = []
+    uploaded = now - timedelta(hours=rng.expovariate(1 / mean_interval_hours))
+    video_id = first_video_id + count * 7 + rng.randint(0, 1000)
+    for _ in range(count):
+        words = rng.sample(_TITLE_WORDS, rng.randint(2, 5))
+        videos.append({
+            'video_id': str(video_id),
+            'title': ''.join(words),
+            'uploaded': uploaded,
+            'views': rng.randint(10, 20000),
+            'duration': f"{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+        })
+        uploaded -= timedelta(hours=rng.expovariate(1 / mean_interval_hours))
+        video_id -= rng.randint(1, 7)
+    return videos
+
+def render_creator_page(author: str, videos: List[Dict], now: Optional[datetime] = None,
+                        next_page_url: Optional[str] = None) -> str:
+    """
+    渲染创作者视频页
+
+    Args:
+        author: 创作者名
+        videos: make_videos 生成的视频（按页面顺序）
+        now: 计算"N天前"的基准时间
+        next_page_url: 下一页地址（有则生成分页链接）
+    """
+    now = now or datetime.now()
+    author = escape(author)
+    pagination = ''
+    if next_page_url:
+        pagination = f'                <li><a href="{escape(next_page_url)}">下一页</a></li>\n'
+    parts = [_PAGE_HEAD.format(author=author, pagination=pagination)]
+    for video in videos:
+        parts.append(_CARD.format(
+            video_id=video['video_id'],
+            title=escape(video['title']),
+            duration=video['duration'],
+            author=author,
+            views=format_views(video['views']),
+            time_text=format_age(now - video['uploaded'], video['uploaded'])
+        ))
+    parts.append(_PAGE_TAIL)
+    return ''.join(parts)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成创作者站点（本地压测服务器）
+按真实站点的标记生成任意数量创作者的视频页，可配置延迟、错误、429、Cloudflare验证页、
+ETag/304 和发布频率，供 load_driver.py 在 1k~50k 书签规模下压测调度器、缓存和数据库
+
+页面地址与真实站点一致：
+    /user.htm?author=X、/user-N.htm?author=X（第N页）、/author/X、/author/X/N
+    /__stats  服务器统计（JSON）
+
+用法:
+    python benchmarks/synthetic_site.py --port 8765 --latency-ms 80 --error-rate 0.01 --rate-429 0.02
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, quote, unquote
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BENCH_DIR)
+
+from synthetic import make_videos, render_creator_page
+
+USER_PATH_PATTERN = re.compile(r'/user(?:-(\d+))?\.htm')
+AUTHOR_PATH_PATTERN = re.compile(r'/author/([^/]+)(?:/(\d+))?/?')
+
+CHALLENGE_PAGE = '''<!DOCTYPE html>
+<html><head><title>Just a moment...</title></head>
+<body><h1>Checking your browser before accessing the site.</h1>
+<p>Please enable JavaScript and cookies to continue.</p>
+<p>Cloudflare Ray ID: {ray_id}</p></body></html>
+'''
+
+class SyntheticSite:
+    """站点内容与故障注入（线程安全）"""
+
+    def __init__(self, videos_per_creator: int = 60, mean_interval_hours: float = 72.0,
+                 page_size: int = 24, latency_ms: float = 0.0, latency_jitter: float = 0.5,
+                 error_rate: float = 0.0, rate_429: float = 0.0, challenge_rate: float = 0.0,
+                 retry_after: int = 1, time_scale: float = 1.0, seed: int = 0):
+        """
+        Args:
+            videos_per_creator: 每个创作者的视频总数（含尚未"发布"的）
+            mean_interval_hours: 平均发布间隔（小时），决定发布频率
+            page_size: 每页视频数
+            latency_ms: 平均响应延迟（毫秒）
+            latency_jitter: 延迟的随机浮动比例
+            error_rate: 返回 500 的概率
+            rate_429: 返回 429 的概率
+            challenge_rate: 返回 Cloudflare 验证页（403）的概率
+            retry_after: 429 响应的 Retry-After（秒）
+            time_scale: 站点时钟倍速，3600 表示现实1秒=站点1小时，用于模拟持续发布
+            seed: 内容随机种子
+        """
+        self.videos_per_creator = videos_per_creator
+        self.mean_interval_hours = mean_interval_hours
+        self.page_size = page_size
+        self.latency = latency_ms / 1000.0
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.challenge_rate = challenge_rate
+        self.retry_after = retry_after
+        self.time_scale = time_scale
+        self.seed = seed
+
+        self._started = time.time()
+        self._epoch = datetime.now()
+        # 每个创作者的时间线以"未来"为终点生成，随站点时钟推进逐个发布；
+        # 提前量按平均间隔给足，保证站点运行期间一直有新视频
+        self._horizon = timedelta(hours=mean_interval_hours * max(videos_per_creator // 4, 1))
+
+        self._lock = threading.Lock()
+        self.status_counts = Counter()
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def now(self) -> datetime:
+        """站点时钟"""
+        return self._epoch + timedelta(seconds=(time.time() - self._started) * self.time_scale)
+
+    def creator_videos(self, author: str, now: datetime) -> list:
+        """创作者截至 now 已发布的视频（按上传时间倒序）；每次按种子重新生成，不占内存"""
+        seed = zlib.crc32(author.encode('utf-8')) ^ self.seed
+        videos = make_videos(seed, self.videos_per_creator, now=self._epoch + self._horizon,
+                             mean_interval_hours=self.mean_interval_hours)
+        return [video for video in videos if video['uploaded'] <= now]
+
+    def render(self, author: str, page: int, path_style: str) -> str:
+        """渲染第 page 页，超出范围时返回空列表页"""
+        now = self.now()
+        videos = self.creator_videos(author, now)
+        start = (page - 1) * self.page_size
+        page_videos = videos[start:start + self.page_size]
+        next_page_url = None
+        if start + self.page_size < len(videos):
+            if path_style == 'author':
+                next_page_url = f"/author/{quote(author)}/{page + 1}"
+            else:
+                next_page_url = f"user-{page + 1}.htm?author={quote(author)}"
+        return render_creator_page(author, page_videos, now=now, next_page_url=next_page_url)
+
+    def pick_fault(self) -> str:
+        """按配置的概率选出本次请求的故障，None 表示正常响应"""
+        roll = random.random()
+        for fault, rate in (('challenge', self.challenge_rate), ('429', self.rate_429), ('500', self.error_rate)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+    def delay(self):
+        if self.latency > 0:
+            jitter = random.uniform(-self.latency_jitter, self.latency_jitter)
+            time.sleep(max(self.latency * (1 + jitter), 0))
+
+    def record(self, status: int, size: int):
+        with self._lock:
+            self.requests += 1
+            self.status_counts[status] += 1
+            self.bytes_sent += size
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'status': {str(k): v for k, v in sorted(self.status_counts.items())},
+                'bytes_sent': self.bytes_sent,
+                'site_time': self.now().isoformat(timespec='seconds')
+            }
+
+class SyntheticSiteHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    site: SyntheticSite = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: str = '', headers: dict = None, content_type='text/html; charset=utf-8'):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+        if self.site is not None:
+            self.site.record(status, len(data))
+
+    def do_GET(self):
+        site = self.site
+        parsed = urlparse(self.path)
+        if parsed.path == '/__stats':
+            self._send(200, json.dumps(site.get_stats(), ensure_ascii=False), content_type='application/json')
+            return
+
+        match = USER_PATH_PATTERN.fullmatch(parsed.path)
+        if match:
+            author = parse_qs(parsed.query).get('author', [''])[0]
+            page, path_style = int(match.group(1) or 1), 'user'
+        else:
+            match = AUTHOR_PATH_PATTERN.fullmatch(parsed.path)
+            if not match:
+                self._send(404, 'Not Found')
+                return
+            author = unquote(match.group(1))
+            page, path_style = int(match.group(2) or 1), 'author'
+        if not author:
+            self._send(404, 'Not Found')
+            return
+
+        site.delay()
+        fault = site.pick_fault()
+        if fault == 'challenge':
+            self._send(403, CHALLENGE_PAGE.format(ray_id=f"{random.getrandbits(64):016x}"))
+            return
+        if fault == '429':
+            self._send(429, 'Too Many Requests', {'Retry-After': str(site.retry_after)})
+            return
+        if fault == '500':
+            self._send(500, 'Internal Server Error')
+            return
+
+        body = site.render(author, page, path_style)
+        etag = '"' + hashlib.md5(body.encode('utf-8')).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, headers={'ETag': etag})
+            return
+        self._send(200, body, {'ETag': etag})
+
+def start_server(site: SyntheticSite, host: str = '127.0.0.1', port: int = 0):
+    """在后台线程启动服务器，返回 (server, 基础地址)；port 为 0 时自动分配"""
+    handler = type('BoundSyntheticSiteHandler', (SyntheticSiteHandler,), {'site': site})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='synthetic-site', daemon=True)
+    thread.start()
+    return server, f"http://{host if host != '0.0.0.0' else '127.0.0.1'}:{server.server_address[1]}"
+
+def add_site_arguments(ap: argparse.ArgumentParser):
+    """站点参数（服务器和压测驱动共用）"""
+    ap.add_argument('--videos-per-creator', type=int, default=60)
+    ap.add_argument('--mean-interval-hours', type=float, default=72.0, help='平均发布间隔（小时）')
+    ap.add_argument('--page-size', type=int, default=24)
+    ap.add_argument('--latency-ms', type=float, default=0.0)
+    ap.add_argument('--latency-jitter', type=float, default=0.5)
+    ap.add_argument('--error-rate', type=float, default=0.0, help='500 的概率')
+    ap.add_argument('--rate-429', type=float, default=0.0, help='429 的概率')
+    ap.add_argument('--challenge-rate', type=float, default=0.0, help='Cloudflare 验证页的概率')
+    ap.add_argument('--retry-after', type=int, default=1)
+    ap.add_argument('--time-scale', type=float, default=1.0, help='站点时钟倍速')
+    ap.add_argument('--seed', type=int, default=0)
+
+def site_from_args(args) -> SyntheticSite:
+    return SyntheticSite(
+        videos_per_creator=args.videos_per_creator, mean_interval_hours=args.mean_interval_hours,
+        page_size=args.page_size, latency_ms=args.latency_ms, latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate, rate_429=args.rate_429, challenge_rate=args.challenge_rate,
+        retry_after=args.retry_after, time_scale=args.time_scale, seed=args.seed
+    )
+
+def main():
+    ap = argparse.ArgumentParser(description="合成创作者站点")
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    add_site_arguments(ap)
+    args = ap.parse_args()
+
+    site = site_from_args(args)
+    server, base_url = start_server(site, args.host, args.port)
+    print(f"合成站点已启动: {base_url}/user.htm?author=creator00001  （统计: {base_url}/__stats）")
+    try:
+        while True:
+            time.sleep(60)
+            print(json.dumps(site.get_stats(), ensure_ascii=False))
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
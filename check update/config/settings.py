@@ -1,5 +1,10 @@
 # 数据库设置
 DATABASE_FILE = 'video_updates.db'
+SQLITE_BUSY_TIMEOUT = 30          # 秒，写锁被占用时等待多久才报 database is locked
+SQLITE_CACHE_SIZE_KB = 20000      # 每个连接的页缓存
+SQLITE_MMAP_SIZE = 268435456      # 256MB 内存映射读
+SQLITE_POOL_SIZE = 10             # 连接池常驻连接数（检查线程 + 写入线程 + API）
+SQLITE_MAX_OVERFLOW = 20
 
 # 默认设置
 DEFAULT_CHECK_INTERVAL = 3600  # 1小时
@@ -24,6 +29,7 @@ LOG_DIR = 'logs'
 LOG_FILE = 'app.log'
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 LOG_LEVEL = 'INFO'
+LOG_DEBUG_SAMPLE_RATE = 1.0  # LOG_LEVEL为DEBUG时的采样比例，热点路径的调试日志可调低
 
 # 缓存设置
 CACHE_DIR = 'cache'
@@ -43,3 +49,53 @@ RELATIVE_TIME_PATTERNS = {
     'months': r'(\d+)\s*个?月前',
     'years': r'(\d+)\s*年前'
 } 
+
+# 解析选择器记忆（按域名持久化）
+SELECTOR_MEMO_FILE = 'cache/selector_memo.json'
+
+# 解析后端: 'auto' 已知站点布局走lxml快速路径 / 'lxml' 总是先试快速路径 / 'bs4' 只用BeautifulSoup
+PARSER_BACKEND = 'auto'
+FAST_PARSER_DOMAINS = ['hsex.men', 'hsex.icu']
+
+# 解析进程数（0 表示在检查线程中解析；页面多时可设为CPU核数以绕开GIL）
+PARSE_PROCESSES = 0
+# 进程池解析单个页面的最长等待（秒），超时的页面按检查失败处理
+PARSE_TIMEOUT = 30
+
+# 自适应轮询：按创作者的发布频率计算每个书签的下次检查时间，每次只检查到期的书签
+ADAPTIVE_POLLING = False
+ADAPTIVE_POLL_FRACTION = 0.5       # 检查间隔 = 估算发布间隔 × 该比例
+ADAPTIVE_MIN_INTERVAL_HOURS = 1    # 检查间隔下限
+ADAPTIVE_MAX_INTERVAL_HOURS = 72   # 检查间隔上限
+ADAPTIVE_JITTER = 0.2              # 检查间隔随机抖动 ±20%
+
+# 检查结果写入线程：攒够条数或等待超时即批量提交
+RESULT_WRITER_BATCH_SIZE = 50
+RESULT_WRITER_FLUSH_MS = 500
+# 批量提交失败（如 database is locked）时的重试次数和间隔（秒，逐次递增），
+# 仍失败时逐条提交，写不进去的记录没有检查点，续跑时会重新检查
+RESULT_WRITER_RETRIES = 3
+RESULT_WRITER_RETRY_DELAY = 0.5
+
+# 中断的检查在该时长内可续跑，超时的视为放弃、重新开始
+CHECK_RUN_RESUME_HOURS = 12
+
+# 流式检查结果的缓冲上限，调用方取得慢时调度器暂停派发
+STREAM_MAX_PENDING = 32
+
+# 翻页检查：第一页全是新视频时继续抓后续页面，最多抓几页
+MAX_PAGE_DEPTH = 5
+
+# 检查耗时追踪：每次检查导出一个 Chrome trace JSON（chrome://tracing 或 ui.perfetto.dev 打开）
+TRACE_CHECKS = False
+TRACE_DIR = 'logs/traces'
+
+# 检查记录：原始记录保留天数，之后汇总为按小时；按小时的汇总保留天数，之后汇总为按天
+CHECK_HISTORY_RAW_DAYS = 7
+CHECK_HISTORY_HOURLY_DAYS = 90
+CHECK_HISTORY_DAILY_DAYS = 730
+
+# 分片检查：书签租约时长、最多尝试次数，以及跨进程域名名额的占用上限
+WORK_LEASE_SECONDS = 300
+WORK_MAX_ATTEMPTS = 3
+SHARED_SLOT_TTL = 120
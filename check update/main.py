@@ -1,9 +1,8 @@
 import sys
 from PyQt6.QtWidgets import QApplication
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from models.database import Base, init_db
+from models.database import init_db
 from ui.qt_main_window import MainWindow
+from utils.log_setup import setup_logging
 import logging
 import os
 from datetime import datetime
@@ -12,27 +11,16 @@ from datetime import datetime
 log_dir = os.path.join(os.path.dirname(__file__), 'logs')
 os.makedirs(log_dir, exist_ok=True)
 
-# 配置日志
+# 配置日志（经队列由后台线程写出）
 log_file = os.path.join(log_dir, 'app.log')
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+setup_logging(log_file)
 
 logger = logging.getLogger(__name__)
 
 def main():
     try:
-        # 初始化数据库
-        engine = create_engine('sqlite:///database.sqlite')
-        Base.metadata.create_all(engine)
-        Session = sessionmaker(bind=engine)
-        session = Session()
-        init_db()
+        # 初始化数据库（建表、补列，会话使用进程内共享的引擎）
+        session = init_db('database.sqlite')
         
         # 创建Qt应用
         app = QApplication(sys.argv)
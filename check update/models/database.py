@@ -1,7 +1,14 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, ForeignKey, inspect, text
+from sqlalchemy import create_engine, event, text, Column, Integer, Float, String, DateTime, Boolean, ForeignKey, Index, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
 from datetime import datetime
+import os
+import threading
+from config.settings import (SQLITE_BUSY_TIMEOUT, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE,
+                             SQLITE_POOL_SIZE, SQLITE_MAX_OVERFLOW)
+from models.migrations import migrate
 
 Base = declarative_base()
 
@@ -19,8 +26,15 @@ class Bookmark(Base):
     last_video_id = Column(String)  # 最后一个视频ID（用于增量检查）
     update_frequency = Column(Integer, default=7)  # 更新频率（天），动态调整
     consecutive_no_update = Column(Integer, default=0)  # 连续无更新次数
+    next_check_at = Column(DateTime)  # 自适应轮询的下次检查时间
     videos = relationship("Video", back_populates="bookmark", cascade="all, delete-orphan")
 
+    # 已有数据库的索引由 models/migrations.py 建立，名称需一致
+    __table_args__ = (
+        Index('ix_bookmarks_last_check_time', 'last_check_time'),
+        Index('ix_bookmarks_next_check_at', 'next_check_at'),
+    )
+
 class Video(Base):
     __tablename__ = 'videos'
     
@@ -36,6 +50,96 @@ class Video(Base):
     created_at = Column(DateTime, default=datetime.now)
     bookmark = relationship("Bookmark", back_populates="videos")
 
+    __table_args__ = (
+        Index('ux_videos_bookmark_video', 'bookmark_id', 'video_id', unique=True),
+        Index('ix_videos_upload_time', 'upload_time'),
+        Index('ix_videos_video_id', 'video_id'),
+    )
+
+class CheckRun(Base):
+    """一次检查（用于中断后续跑）"""
+    __tablename__ = 'check_runs'
+    
+    id = Column(Integer, primary_key=True)
+    started_at = Column(DateTime, default=datetime.now)
+    finished_at = Column(DateTime)
+    status = Column(String, default='running')  # running/stopped/failed 可续跑，completed/abandoned 已结束
+    total = Column(Integer, default=0)  # 计划检查的书签数
+    update_range_days = Column(Integer)
+
+class CheckRunItem(Base):
+    """检查中已完成的书签（检查点）"""
+    __tablename__ = 'check_run_items'
+    
+    run_id = Column(Integer, ForeignKey('check_runs.id'), primary_key=True)
+    bookmark_id = Column(Integer, primary_key=True)
+    finished_at = Column(DateTime, default=datetime.now)
+    new_videos = Column(Integer, default=0)
+
+class CheckHistory(Base):
+    """每个书签每次检查的结果（只追加，旧记录由 services/check_history.py 汇总后删除）"""
+    __tablename__ = 'check_history'
+    
+    id = Column(Integer, primary_key=True)
+    bookmark_id = Column(Integer, nullable=False)
+    run_id = Column(Integer)
+    checked_at = Column(DateTime, nullable=False)
+    status = Column(String)  # update/no_change/error
+    http_status = Column(Integer)  # 最后一次响应的状态码
+    bytes = Column(Integer, default=0)  # 下载字节数（含翻页和重试）
+    latency_ms = Column(Float)  # 请求往返耗时合计
+    cache = Column(String)  # miss（完整下载）/304（未修改）
+    videos = Column(Integer, default=0)  # 新视频数
+    
+    __table_args__ = (
+        Index('ix_check_history_checked_at', 'checked_at'),
+        Index('ix_check_history_bookmark', 'bookmark_id', 'checked_at'),
+    )
+
+class CheckHistoryRollup(Base):
+    """检查记录的按小时/按天汇总"""
+    __tablename__ = 'check_history_rollups'
+    
+    bookmark_id = Column(Integer, primary_key=True)
+    period = Column(String, primary_key=True)  # hour/day
+    period_start = Column(String, primary_key=True)  # 'YYYY-MM-DD HH:00:00' / 'YYYY-MM-DD'
+    checks = Column(Integer, default=0)
+    errors = Column(Integer, default=0)
+    updates = Column(Integer, default=0)
+    not_modified = Column(Integer, default=0)
+    videos = Column(Integer, default=0)
+    bytes = Column(Integer, default=0)
+    latency_ms_total = Column(Float, default=0)
+    latency_ms_max = Column(Float, default=0)
+
+class WorkItem(Base):
+    """分片检查的工作队列：书签按租约分给各个检查进程"""
+    __tablename__ = 'work_queue'
+    
+    run_id = Column(Integer, ForeignKey('check_runs.id'), primary_key=True)
+    bookmark_id = Column(Integer, primary_key=True)
+    status = Column(String, default='pending')  # pending/leased/done/error
+    lease_owner = Column(String)
+    lease_expires_at = Column(Float)  # 租约到期时间（时间戳），过期后可被其他进程重新领取
+    attempts = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.now)
+
+class DomainLimit(Base):
+    """跨进程共享的域名请求间隔"""
+    __tablename__ = 'domain_limits'
+    
+    domain = Column(String, primary_key=True)
+    next_allowed_at = Column(Float, default=0)  # 下一次允许请求的时间（时间戳）
+
+class DomainSlot(Base):
+    """跨进程共享的域名并发名额"""
+    __tablename__ = 'domain_slots'
+    
+    domain = Column(String, primary_key=True)
+    slot = Column(Integer, primary_key=True)
+    holder = Column(String)  # 占用者（进程/线程标识），为空表示空闲
+    expires_at = Column(Float)  # 占用到期时间，持有进程崩溃后名额自动回收
+
 class Settings(Base):
     __tablename__ = 'settings'
     
@@ -46,37 +150,99 @@ class Settings(Base):
     last_check_time = Column(DateTime)
     browser_path = Column(String)  # 添加浏览器路径设置
 
+_engines = {}
+_engines_lock = threading.Lock()
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """每个新连接的 PRAGMA：WAL 让检查写入时 API 仍可读；synchronous=NORMAL 在 WAL 下不会损坏数据库"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f'PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}')
+        cursor.execute(f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+    finally:
+        cursor.close()
+
+def get_engine(db_path='database.sqlite'):
+    """
+    数据库引擎：同一进程内每个数据库文件共用一个
+    
+    连接设置 WAL 和调优的 PRAGMA，忙等待 SQLITE_BUSY_TIMEOUT 秒后才报 database is locked；
+    连接池按检查线程数留足连接
+    """
+    if db_path == ':memory:':
+        # 内存数据库只能在一个连接里存在
+        engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+        event.listen(engine, 'connect', _set_sqlite_pragmas)
+        return engine
+    key = os.path.abspath(db_path)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = create_engine(
+                f'sqlite:///{db_path}',
+                connect_args={'timeout': SQLITE_BUSY_TIMEOUT, 'check_same_thread': False},
+                pool_size=SQLITE_POOL_SIZE,
+                max_overflow=SQLITE_MAX_OVERFLOW
+            )
+            event.listen(engine, 'connect', _set_sqlite_pragmas)
+            _engines[key] = engine
+        return engine
+
 def init_db(db_path='database.sqlite'):
-    engine = create_engine(f'sqlite:///{db_path}')
+    """升级数据库到最新版本（已是最新时只查一次版本号），返回新会话"""
+    engine = get_engine(db_path)
+    migrate(engine, Base.metadata)
+    Session = sessionmaker(bind=engine)
+    return Session()
+
+def upsert_videos(connection, rows):
+    """
+    按 (bookmark_id, video_id) 批量插入或更新视频
+    
+    已存在的视频只刷新标题、缩略图和相对时间；上传时间保留首次记录的值
+    （相对时间换算出的上传时间每次检查都会漂移），已看状态不受影响
     
-    # 检查是否需要迁移
-    inspector = inspect(engine)
-    table_names = inspector.get_table_names()
-
-    if 'settings' in table_names:
-        # 检查是否需要添加browser_path列
-        columns = [col['name'] for col in inspector.get_columns('settings')]
-        if 'browser_path' not in columns:
-            with engine.begin() as connection:
-                connection.execute(text('ALTER TABLE settings ADD COLUMN browser_path VARCHAR'))
-
-    if 'bookmarks' in table_names:
-        # 检查并添加新列
-        columns = [col['name'] for col in inspector.get_columns('bookmarks')]
-        new_columns = {
-            'avatar_url': 'VARCHAR',
-            'last_check_time': 'DATETIME',
-            'check_count': 'INTEGER DEFAULT 0',
-            'last_video_id': 'VARCHAR',
-            'update_frequency': 'INTEGER DEFAULT 7',
-            'consecutive_no_update': 'INTEGER DEFAULT 0'
+    Args:
+        connection: 数据库连接或会话
+        rows: 视频字典列表，需包含 bookmark_id 和 video_id
+    """
+    rows = [row for row in rows if row.get('video_id')]
+    if not rows:
+        return 0
+    table = Video.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.bookmark_id, table.c.video_id],
+        set_={
+            'title': stmt.excluded.title,
+            'thumbnail_url': stmt.excluded.thumbnail_url,
+            'relative_time': stmt.excluded.relative_time,
+            'upload_time': func.coalesce(table.c.upload_time, stmt.excluded.upload_time)
         }
-        
-        with engine.begin() as connection:
-            for col_name, col_type in new_columns.items():
-                if col_name not in columns:
-                    connection.execute(text(f'ALTER TABLE bookmarks ADD COLUMN {col_name} {col_type}'))
+    )
+    connection.execute(stmt, rows)
+    return len(rows)
+
+def record_run_items(connection, rows):
+    """
+    记录检查点：书签在本次检查中已完成（重复记录忽略）
     
-    Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    return Session()
\ No newline at end of file
+    Args:
+        connection: 数据库连接或会话
+        rows: [{'run_id', 'bookmark_id', 'finished_at', 'new_videos'}, ...]
+    """
+    if not rows:
+        return
+    stmt = sqlite_insert(CheckRunItem.__table__).on_conflict_do_nothing(
+        index_elements=['run_id', 'bookmark_id']
+    )
+    connection.execute(stmt, rows)
+
+def get_data_version(connection, name):
+    """列表数据的版本号（见 models/migrations.py 的 data_versions），未知名称返回 0"""
+    return connection.execute(
+        text('SELECT version FROM data_versions WHERE name = :name'), {'name': name}
+    ).scalar() or 0
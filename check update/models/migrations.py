@@ -0,0 +1,178 @@
+"""
+数据库版本迁移
+schema_version 表记录当前版本，启动时只查一次版本号，已是最新就直接返回；
+否则先建出缺少的表，再按顺序执行比当前版本新的迁移，每步完成后记下版本号
+
+迁移必须可重复执行（IF NOT EXISTS、先查列再加列），多个进程同时启动时不会出错
+"""
+
+import logging
+from typing import Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+def _columns(connection, table: str) -> set:
+    return {row[1] for row in connection.execute(text(f'PRAGMA table_info({table})'))}
+
+def _add_columns(connection, table: str, columns: dict):
+    existing = _columns(connection, table)
+    for name, column_type in columns.items():
+        if name not in existing:
+            connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {name} {column_type}'))
+
+def _legacy_columns(connection):
+    """旧版本数据库缺少的列"""
+    _add_columns(connection, 'settings', {'browser_path': 'VARCHAR'})
+    _add_columns(connection, 'bookmarks', {
+        'avatar_url': 'VARCHAR',
+        'last_check_time': 'DATETIME',
+        'check_count': 'INTEGER DEFAULT 0',
+        'last_video_id': 'VARCHAR',
+        'update_frequency': 'INTEGER DEFAULT 7',
+        'consecutive_no_update': 'INTEGER DEFAULT 0',
+        'next_check_at': 'DATETIME'
+    })
+
+def _unique_videos(connection):
+    """去掉重复视频（保留最早的一条）后建立唯一索引"""
+    connection.execute(text(
+        'DELETE FROM videos WHERE id NOT IN '
+        '(SELECT MIN(id) FROM videos GROUP BY bookmark_id, video_id)'
+    ))
+    connection.execute(text(
+        'CREATE UNIQUE INDEX IF NOT EXISTS ux_videos_bookmark_video ON videos (bookmark_id, video_id)'
+    ))
+
+def _query_indexes(connection):
+    """
+    更新列表、导出和调度查询用的索引
+
+    按书签查视频走 ux_videos_bookmark_video 的前缀，不再单独建 bookmark_id 索引
+    """
+    for statement in (
+        'CREATE INDEX IF NOT EXISTS ix_videos_upload_time ON videos (upload_time)',
+        'CREATE INDEX IF NOT EXISTS ix_videos_video_id ON videos (video_id)',
+        'CREATE INDEX IF NOT EXISTS ix_bookmarks_last_check_time ON bookmarks (last_check_time)',
+        'CREATE INDEX IF NOT EXISTS ix_bookmarks_next_check_at ON bookmarks (next_check_at)',
+    ):
+        connection.execute(text(statement))
+    connection.execute(text('ANALYZE'))
+
+def _tables_only(connection):
+    """新增的表（连同索引）已由 migrate 中的 create_all 建出，这里只推进版本号"""
+
+# 视频标题和创作者名的全文索引：trigram 分词按三个字符切分，中日韩文本不依赖空格也能检索，
+# 且任意子串（含前缀）都能命中；rowid 与 videos.id 一致，由触发器随视频写入同步
+_VIDEO_SEARCH_STATEMENTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(title, creator, tokenize='trigram')",
+    # 新视频
+    """CREATE TRIGGER IF NOT EXISTS videos_fts_insert AFTER INSERT ON videos BEGIN
+        INSERT INTO videos_fts (rowid, title, creator)
+        VALUES (new.id, new.title, (SELECT name FROM bookmarks WHERE id = new.bookmark_id));
+    END""",
+    # upsert 每次都会带上标题，只有标题或所属书签真正变化时才重写索引
+    """CREATE TRIGGER IF NOT EXISTS videos_fts_update AFTER UPDATE OF title, bookmark_id ON videos
+    WHEN old.title IS NOT new.title OR old.bookmark_id IS NOT new.bookmark_id BEGIN
+        DELETE FROM videos_fts WHERE rowid = old.id;
+        INSERT INTO videos_fts (rowid, title, creator)
+        VALUES (new.id, new.title, (SELECT name FROM bookmarks WHERE id = new.bookmark_id));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS videos_fts_delete AFTER DELETE ON videos BEGIN
+        DELETE FROM videos_fts WHERE rowid = old.id;
+    END""",
+    # 创作者改名
+    """CREATE TRIGGER IF NOT EXISTS bookmarks_fts_rename AFTER UPDATE OF name ON bookmarks
+    WHEN old.name IS NOT new.name BEGIN
+        UPDATE videos_fts SET creator = new.name
+        WHERE rowid IN (SELECT id FROM videos WHERE bookmark_id = new.id);
+    END""",
+)
+
+def _video_search(connection):
+    """建立全文索引和同步触发器，并导入已有视频；SQLite 未编译 FTS5 时跳过（搜索退回 LIKE）"""
+    try:
+        for statement in _VIDEO_SEARCH_STATEMENTS:
+            connection.execute(text(statement))
+    except OperationalError as e:
+        logger.warning(f"SQLite 不支持 FTS5 trigram，跳过全文索引: {e}")
+        return
+    connection.execute(text('DELETE FROM videos_fts'))
+    connection.execute(text(
+        'INSERT INTO videos_fts (rowid, title, creator) '
+        'SELECT videos.id, videos.title, bookmarks.name FROM videos '
+        'LEFT JOIN bookmarks ON bookmarks.id = videos.bookmark_id'
+    ))
+
+def _data_versions(connection):
+    """
+    列表数据的版本号：书签增删或列表字段（名称、地址、头像）变化时由触发器加一，
+    接口用它生成 ETag，未变化时只读一行即可回 304（检查时间等字段的更新不影响版本）
+    """
+    connection.execute(text(
+        'CREATE TABLE IF NOT EXISTS data_versions (name VARCHAR PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)'
+    ))
+    connection.execute(text("INSERT OR IGNORE INTO data_versions (name, version) VALUES ('bookmarks', 0)"))
+    bump = "UPDATE data_versions SET version = version + 1 WHERE name = 'bookmarks';"
+    for statement in (
+        f'CREATE TRIGGER IF NOT EXISTS bookmarks_version_insert AFTER INSERT ON bookmarks BEGIN {bump} END',
+        f'CREATE TRIGGER IF NOT EXISTS bookmarks_version_delete AFTER DELETE ON bookmarks BEGIN {bump} END',
+        f'''CREATE TRIGGER IF NOT EXISTS bookmarks_version_update AFTER UPDATE OF name, url, avatar_url ON bookmarks
+        WHEN old.name IS NOT new.name OR old.url IS NOT new.url OR old.avatar_url IS NOT new.avatar_url
+        BEGIN {bump} END''',
+    ):
+        connection.execute(text(statement))
+
+# (版本号, 说明, 迁移函数)，只能在末尾追加
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, '补齐旧版本缺少的列', _legacy_columns),
+    (2, '视频去重并建立唯一索引', _unique_videos),
+    (3, '查询索引', _query_indexes),
+    (4, '检查记录与汇总表', _tables_only),
+    (5, '视频全文索引', _video_search),
+    (6, '列表数据版本号', _data_versions),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_version(connection) -> int:
+    """当前版本号，没有版本表时为 0"""
+    try:
+        return connection.execute(text('SELECT version FROM schema_version')).scalar() or 0
+    except OperationalError:
+        return 0
+
+def migrate(engine, metadata) -> int:
+    """
+    升级到最新版本
+
+    Args:
+        engine: 数据库引擎
+        metadata: 模型的 MetaData，用于建出缺少的表
+
+    Returns:
+        升级后的版本号
+    """
+    with engine.connect() as connection:
+        version = get_version(connection)
+    if version >= LATEST_VERSION:
+        return version
+
+    with engine.begin() as connection:
+        connection.execute(text('CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)'))
+        # 其他进程可能已经升级过
+        version = get_version(connection)
+        if version >= LATEST_VERSION:
+            return version
+        metadata.create_all(connection)
+        for number, description, apply in MIGRATIONS:
+            if number <= version:
+                continue
+            logger.info(f"数据库迁移 {number}: {description}")
+            apply(connection)
+            version = number
+        connection.execute(text('DELETE FROM schema_version'))
+        connection.execute(text('INSERT INTO schema_version (version) VALUES (:version)'), {'version': version})
+    return version
@@ -0,0 +1,150 @@
+"""
+检查记录
+每个书签每次检查追加一条 check_history（随检查结果由写入线程批量提交）；
+汇总任务把超过保留期的原始记录并入按小时的汇总，再把旧的小时汇总并入按天的汇总，
+表的大小只与书签数和保留期有关，不随检查次数无限增长
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from models.database import CheckHistory
+from config.settings import CHECK_HISTORY_RAW_DAYS, CHECK_HISTORY_HOURLY_DAYS, CHECK_HISTORY_DAILY_DAYS
+
+logger = logging.getLogger(__name__)
+
+_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def insert_history(connection, rows: List[Dict]):
+    """
+    批量追加检查记录
+
+    Args:
+        connection: 数据库连接或会话
+        rows: [{'bookmark_id', 'run_id', 'checked_at', 'status', 'http_status', 'bytes',
+                'latency_ms', 'cache', 'videos'}, ...]
+    """
+    if rows:
+        connection.execute(CheckHistory.__table__.insert(), rows)
+
+# 原始记录 -> 按小时
+_ROLLUP_RAW = '''
+INSERT INTO check_history_rollups (bookmark_id, period, period_start, checks, errors, updates,
+                                   not_modified, videos, bytes, latency_ms_total, latency_ms_max)
+SELECT bookmark_id, 'hour', strftime('%Y-%m-%d %H:00:00', checked_at), COUNT(*),
+       SUM(status IS 'error'), SUM(status IS 'update'), SUM(cache IS '304'),
+       COALESCE(SUM(videos), 0), COALESCE(SUM(bytes), 0),
+       COALESCE(SUM(latency_ms), 0), COALESCE(MAX(latency_ms), 0)
+FROM check_history WHERE checked_at < :cutoff
+GROUP BY bookmark_id, strftime('%Y-%m-%d %H:00:00', checked_at)
+ON CONFLICT (bookmark_id, period, period_start) DO UPDATE SET
+    checks = checks + excluded.checks,
+    errors = errors + excluded.errors,
+    updates = updates + excluded.updates,
+    not_modified = not_modified + excluded.not_modified,
+    videos = videos + excluded.videos,
+    bytes = bytes + excluded.bytes,
+    latency_ms_total = latency_ms_total + excluded.latency_ms_total,
+    latency_ms_max = MAX(latency_ms_max, excluded.latency_ms_max)
+'''
+
+# 按小时 -> 按天
+_ROLLUP_HOURLY = '''
+INSERT INTO check_history_rollups (bookmark_id, period, period_start, checks, errors, updates,
+                                   not_modified, videos, bytes, latency_ms_total, latency_ms_max)
+SELECT bookmark_id, 'day', substr(period_start, 1, 10), SUM(checks), SUM(errors), SUM(updates),
+       SUM(not_modified), SUM(videos), SUM(bytes), SUM(latency_ms_total), MAX(latency_ms_max)
+FROM check_history_rollups WHERE period = 'hour' AND period_start < :cutoff
+GROUP BY bookmark_id, substr(period_start, 1, 10)
+ON CONFLICT (bookmark_id, period, period_start) DO UPDATE SET
+    checks = checks + excluded.checks,
+    errors = errors + excluded.errors,
+    updates = updates + excluded.updates,
+    not_modified = not_modified + excluded.not_modified,
+    videos = videos + excluded.videos,
+    bytes = bytes + excluded.bytes,
+    latency_ms_total = latency_ms_total + excluded.latency_ms_total,
+    latency_ms_max = MAX(latency_ms_max, excluded.latency_ms_max)
+'''
+
+def rollup_check_history(engine, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    汇总并清理检查记录（可重复执行，每一步在同一事务内先汇总再删除）
+
+    Returns:
+        各步处理的行数 {'raw': ..., 'hourly': ..., 'daily_expired': ...}
+    """
+    now = now or datetime.now()
+    # 按整点/整天截断，同一小时（天）的记录一次汇总完
+    raw_cutoff = (now - timedelta(days=CHECK_HISTORY_RAW_DAYS)).replace(minute=0, second=0, microsecond=0)
+    hourly_cutoff = (now - timedelta(days=CHECK_HISTORY_HOURLY_DAYS)).replace(hour=0, minute=0, second=0, microsecond=0)
+    daily_cutoff = (now - timedelta(days=CHECK_HISTORY_DAILY_DAYS)).strftime('%Y-%m-%d')
+
+    counts = {}
+    with engine.begin() as conn:
+        conn.execute(text(_ROLLUP_RAW), {'cutoff': raw_cutoff.strftime(_TIME_FORMAT)})
+        counts['raw'] = conn.execute(text('DELETE FROM check_history WHERE checked_at < :cutoff'),
+                                     {'cutoff': raw_cutoff.strftime(_TIME_FORMAT)}).rowcount
+    with engine.begin() as conn:
+        conn.execute(text(_ROLLUP_HOURLY), {'cutoff': hourly_cutoff.strftime(_TIME_FORMAT)})
+        counts['hourly'] = conn.execute(text(
+            "DELETE FROM check_history_rollups WHERE period = 'hour' AND period_start < :cutoff"
+        ), {'cutoff': hourly_cutoff.strftime(_TIME_FORMAT)}).rowcount
+        counts['daily_expired'] = conn.execute(text(
+            "DELETE FROM check_history_rollups WHERE period = 'day' AND period_start < :cutoff"
+        ), {'cutoff': daily_cutoff}).rowcount
+    if any(counts.values()):
+        logger.info(f"检查记录汇总: {counts}")
+    return counts
+
+def creator_reliability(connection, days: int = 30, bookmark_id: Optional[int] = None) -> List[Dict]:
+    """
+    每个创作者最近 days 天的检查可靠性（原始记录与汇总合并计算）
+
+    Returns:
+        [{'bookmark_id', 'checks', 'errors', 'error_rate', 'updates', 'not_modified',
+          'videos', 'bytes', 'avg_latency_ms', 'max_latency_ms'}, ...]，按错误率从高到低
+    """
+    since = datetime.now() - timedelta(days=days)
+    params = {'since': since.strftime(_TIME_FORMAT), 'since_day': since.strftime('%Y-%m-%d')}
+    bookmark_filter = ''
+    if bookmark_id is not None:
+        bookmark_filter = 'AND bookmark_id = :bookmark_id'
+        params['bookmark_id'] = bookmark_id
+    rows = connection.execute(text(f'''
+        SELECT bookmark_id, SUM(checks), SUM(errors), SUM(updates), SUM(not_modified), SUM(videos),
+               SUM(bytes), SUM(latency_ms_total), MAX(latency_ms_max)
+        FROM (
+            SELECT bookmark_id, COUNT(*) AS checks, SUM(status IS 'error') AS errors,
+                   SUM(status IS 'update') AS updates, SUM(cache IS '304') AS not_modified,
+                   COALESCE(SUM(videos), 0) AS videos, COALESCE(SUM(bytes), 0) AS bytes,
+                   COALESCE(SUM(latency_ms), 0) AS latency_ms_total, COALESCE(MAX(latency_ms), 0) AS latency_ms_max
+            FROM check_history WHERE checked_at >= :since {bookmark_filter} GROUP BY bookmark_id
+            UNION ALL
+            SELECT bookmark_id, checks, errors, updates, not_modified, videos, bytes, latency_ms_total, latency_ms_max
+            FROM check_history_rollups
+            WHERE ((period = 'hour' AND period_start >= :since) OR (period = 'day' AND period_start >= :since_day))
+                  {bookmark_filter}
+        )
+        GROUP BY bookmark_id
+    '''), params).fetchall()
+
+    result = []
+    for bookmark, checks, errors, updates, not_modified, videos, size, latency_total, latency_max in rows:
+        result.append({
+            'bookmark_id': bookmark,
+            'checks': checks,
+            'errors': errors,
+            'error_rate': errors / checks if checks else 0.0,
+            'updates': updates,
+            'not_modified': not_modified,
+            'videos': videos,
+            'bytes': size,
+            'avg_latency_ms': latency_total / checks if checks else 0.0,
+            'max_latency_ms': latency_max
+        })
+    result.sort(key=lambda r: r['error_rate'], reverse=True)
+    return result
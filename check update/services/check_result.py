@@ -0,0 +1,45 @@
+"""
+检查结果记录
+每个书签检查完成后产生一条，按完成顺序流式交给调用方
+"""
+
+from typing import Dict, List, Optional
+
+# 结果类型
+UPDATE = 'update'          # 发现新视频
+NO_CHANGE = 'no_change'    # 没有新视频
+ERROR = 'error'            # 获取或解析失败
+SKIPPED = 'skipped'        # 检查被停止，未执行
+
+class CheckResult:
+    """单个书签的检查结果"""
+
+    __slots__ = ('kind', 'bookmark', 'videos', 'error', 'elapsed', 'completed', 'total')
+
+    def __init__(self, kind: str, bookmark, videos: Optional[List] = None,
+                 error: Optional[str] = None, elapsed: float = 0.0):
+        """
+        Args:
+            kind: 结果类型 UPDATE/NO_CHANGE/ERROR/SKIPPED
+            bookmark: 书签
+            videos: 新视频（Video对象）
+            error: 错误信息
+            elapsed: 检查耗时（秒）
+        """
+        self.kind = kind
+        self.bookmark = bookmark
+        self.videos = videos or []
+        self.error = error
+        self.elapsed = elapsed
+        # 由调度器在产出时填写：已完成数 / 本次检查总数
+        self.completed = 0
+        self.total = 0
+
+    @property
+    def updates(self) -> List[Dict]:
+        """兼容旧接口的更新记录 [{'bookmark': ..., 'video': ...}]"""
+        return [{'bookmark': self.bookmark, 'video': video} for video in self.videos]
+
+    def __repr__(self):
+        name = getattr(self.bookmark, 'name', None)
+        return f"<CheckResult {self.kind} {name!r} videos={len(self.videos)}>"
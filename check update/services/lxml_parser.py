@@ -0,0 +1,99 @@
+"""
+已知站点布局的快速解析器
+直接用 lxml.html + 预编译 XPath 提取 hsex 页面字段，跳过 BeautifulSoup 建树和 CSS 选择
+只负责取出原始字段，ID/时间的清洗仍由 WebScraper 统一处理，保证两条路径输出一致
+"""
+
+import re
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+from lxml import etree, html as lxml_html
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+class HsexLayoutParser:
+    """hsex 卡片布局（.col-xs-6.col-md-3 / .title h5 a / .info p）的 XPath 提取器"""
+
+    _background = re.compile(r'background-image:\s*url\(["\']?([^"\']+)["\']?\)')
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        
+        # 与 WebScraper 中的 CSS 选择器一一对应
+        self._containers = etree.XPath(f"//*[{_has_class('col-xs-6')} and {_has_class('col-md-3')}]")
+        self._video_link = etree.XPath(".//a[contains(@href, 'video')]")
+        self._title = etree.XPath(f".//*[{_has_class('title')}]//h5//a")
+        self._time = etree.XPath(f".//*[{_has_class('info')}]//p")
+        self._img = etree.XPath(".//img[@src]")
+        self._image_div = etree.XPath(f".//*[{_has_class('image')}]")
+
+    def extract(self, html: str) -> Optional[List[Tuple[str, str, str, str]]]:
+        """
+        提取原始字段
+
+        Returns:
+            [(视频链接href, 标题, 缩略图原始地址, 时间原始文本), ...]
+            页面不符合已知布局时返回None（调用方应回退到BeautifulSoup）
+        """
+        try:
+            doc = lxml_html.fromstring(html)
+        except (etree.ParserError, ValueError) as e:
+            self.logger.debug("快速解析器无法建树: %s", e)
+            return None
+
+        containers = self._containers(doc)
+        if not containers:
+            return None
+
+        items = []
+        for container in containers:
+            links = self._video_link(container)
+            titles = self._title(container)
+            times = self._time(container)
+            if not links or not titles or not times:
+                return None
+
+            title = self._title_from(titles[0])
+            if not title:
+                return None
+
+            items.append((
+                links[0].get('href', ''),
+                title,
+                self._thumbnail_from(container),
+                times[0].text_content().strip()
+            ))
+        return items
+
+    @staticmethod
+    def _title_from(elem) -> str:
+        for attr in ('title', 'alt', 'data-title'):
+            value = elem.get(attr)
+            if value is not None:
+                value = value.strip()
+                if value:
+                    return value
+        return elem.text_content().strip()
+
+    def _thumbnail_from(self, container) -> str:
+        imgs = self._img(container)
+        if imgs:
+            return imgs[0].get('src', '')
+        divs = self._image_div(container)
+        if divs:
+            match = self._background.search(divs[0].get('style', ''))
+            if match:
+                return match.group(1)
+        return ''
+
+_local = threading.local()
+
+def get_hsex_layout_parser() -> HsexLayoutParser:
+    """获取当前线程的解析器（编译后的XPath对象不在线程间共享）"""
+    parser = getattr(_local, 'hsex_parser', None)
+    if parser is None:
+        parser = _local.hsex_parser = HsexLayoutParser()
+    return parser
@@ -0,0 +1,168 @@
+"""
+进程池解析
+把 HTML 解析（BeautifulSoup/lxml/正则）放到子进程里执行，绕开GIL，
+多个页面同时到达时可以用满所有CPU核心
+"""
+
+import time
+import atexit
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import PARSE_TIMEOUT
+from utils.cancellation import CancelToken
+
+# 子进程返回的视频元组字段顺序
+VIDEO_FIELDS = ('video_id', 'title', 'thumbnail_url', 'relative_time', 'upload_time')
+
+_worker_scraper = None
+
+def _init_worker():
+    """子进程初始化：只创建一次解析器；选择器记忆不在子进程里写文件（多个进程会争用同一个文件）"""
+    global _worker_scraper
+    from services.web_scraper import WebScraper
+    from utils.selector_memo import selector_memo
+    logging.getLogger('services.web_scraper').setLevel(logging.WARNING)
+    selector_memo.persist = False
+    _worker_scraper = WebScraper()
+
+def parse_html(html_bytes: bytes, base_url: str, run_timestamp: Optional[datetime] = None,
+               cutoff_time: Optional[datetime] = None, stop_video_id: Optional[str] = None) -> Tuple[List[Tuple], Dict]:
+    """
+    在子进程中解析页面
+
+    Args:
+        html_bytes: 原始HTML（UTF-8）
+        base_url: 页面地址
+        run_timestamp: 相对时间的基准时间
+        cutoff_time: 遇到第一个不晚于该时间的视频后停止（该视频仍返回，便于调用方判断）
+        stop_video_id: 遇到该视频（上次检查的最后一个视频）后停止，同样仍返回
+
+    Returns:
+        (按页面顺序的视频元组列表（字段见 VIDEO_FIELDS）, 选择器记忆的变化（见 SelectorMemo.take_changes）)
+    """
+    from utils.selector_memo import selector_memo
+    if _worker_scraper is None:
+        _init_worker()
+    _worker_scraper.run_timestamp = run_timestamp
+
+    html = html_bytes.decode('utf-8', errors='replace')
+    videos = []
+    for video in _worker_scraper.parse_video_info_iter(html, base_url):
+        videos.append(tuple(video[field] for field in VIDEO_FIELDS))
+        if stop_video_id and video['video_id'] == stop_video_id:
+            break
+        upload_time = video['upload_time']
+        if cutoff_time is not None and (not upload_time or upload_time <= cutoff_time):
+            break
+    return videos, selector_memo.take_changes()
+
+def video_from_tuple(values: Tuple) -> Dict:
+    return dict(zip(VIDEO_FIELDS, values))
+
+class ParsePool:
+    """解析进程池（跨检查复用）"""
+
+    def __init__(self, processes: int):
+        self.processes = processes
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.recycled = 0
+        self._executor = self._new_executor()
+        self.logger.info(f"解析进程池已启动: {processes} 个进程")
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # 使用spawn，避免在多线程进程中fork
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker
+        )
+
+    def _recycle(self, executor: ProcessPoolExecutor):
+        """
+        换一组新的子进程并结束旧的：已在运行的解析无法取消，不结束进程的话会一直占着名额
+
+        旧进程池里其他线程的解析会失败（BrokenProcessPool），由调用方改为线程内解析
+        """
+        with self._lock:
+            if self._executor is not executor:
+                # 其他线程已经换过
+                return
+            self._executor = self._new_executor()
+            self.recycled += 1
+        processes = list((getattr(executor, '_processes', None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        self.logger.warning(f"解析超时，已重建解析进程池（结束 {len(processes)} 个进程）")
+
+    def parse(self, html: str, base_url: str, run_timestamp: Optional[datetime] = None,
+              cutoff_time: Optional[datetime] = None, stop_video_id: Optional[str] = None,
+              cancel_token: Optional[CancelToken] = None, timeout: Optional[float] = None) -> List[Dict]:
+        """
+        提交到进程池解析并等待结果（在检查线程中调用）
+
+        等待期间每隔一小段时间检查一次取消令牌，被取消时不再等待、抛出 CheckCancelled：
+        还在排队的任务不再执行，已在子进程中运行的任务会继续跑完（结果丢弃）。
+        超过 timeout（默认 PARSE_TIMEOUT）秒时重建进程池（结束卡住的子进程）并抛出 TimeoutError
+        """
+        from utils.selector_memo import selector_memo
+        executor = self._executor
+        future = executor.submit(
+            parse_html, html.encode('utf-8'), base_url, run_timestamp, cutoff_time, stop_video_id
+        )
+        deadline = time.monotonic() + (timeout or PARSE_TIMEOUT)
+        while True:
+            if cancel_token is not None and cancel_token.cancelled:
+                future.cancel()
+                cancel_token.raise_if_cancelled()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if not future.cancel():
+                    self._recycle(executor)
+                raise TimeoutError(f"解析超时: {base_url}")
+            try:
+                videos, memo_changes = future.result(timeout=min(remaining, 0.2))
+                break
+            except FutureTimeout:
+                continue
+        selector_memo.merge_changes(memo_changes)
+        return [video_from_tuple(values) for values in videos]
+
+    def shutdown(self):
+        with self._lock:
+            executor = self._executor
+        executor.shutdown(wait=False, cancel_futures=True)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_parse_pool(processes: int) -> ParsePool:
+    """
+    获取共享的解析进程池，大小变化时重建
+
+    Args:
+        processes: 进程数
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.processes != processes:
+            _pool.shutdown()
+            _pool = None
+        if _pool is None:
+            _pool = ParsePool(processes)
+        return _pool
+
+def shutdown_parse_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+atexit.register(shutdown_parse_pool)
@@ -10,6 +10,7 @@ from collections import deque
 from datetime import datetime, timedelta
 import random
 from config.settings import DOMAIN_MAX_CONCURRENCY
+from utils.cancellation import CancelToken, sleep as cancellable_sleep
 
 class RequestManager:
     """全局请求管理器 - 单例模式"""
@@ -53,6 +54,9 @@ class RequestManager:
         self.total_blocks = 0
         self.domain_current_concurrency = {}
         self.domain_max_concurrency = DOMAIN_MAX_CONCURRENCY
+        
+        # 分片检查时由多个进程共享的域名限速（见 services/shared_limiter.py），为None时只做进程内限速
+        self.shared_limiter = None
     
     def should_wait(self, domain: str) -> float:
         """
@@ -87,23 +91,60 @@ class RequestManager:
         
         return 0
     
-    def wait_if_needed(self, domain: str):
-        """如果需要，等待适当的时间"""
+    def ready_in(self, domain: str) -> float:
+        """
+        不等待、不记录日志地估算域名还需多久可以发起请求（秒，无抖动）
+        供调度器判断域名是否就绪
+        """
+        now = time.time()
+        
+        blocked = self.blocked_until.get(domain)
+        if blocked and now < blocked:
+            return blocked - now
+        
+        recent_requests = [t for t in self.request_history if now - t < 60]
+        if len(recent_requests) >= self.global_rate_limit:
+            return 60 - (now - min(recent_requests))
+        
+        last = self.domain_last_request.get(domain)
+        if last is not None and now - last < self.domain_min_interval:
+            return self.domain_min_interval - (now - last)
+        
+        return 0
+
+    def wait_if_needed(self, domain: str, cancel_token: CancelToken = None):
+        """如果需要，等待适当的时间（传入取消令牌时可被立即打断，抛出 CheckCancelled）"""
         wait_time = self.should_wait(domain)
         if wait_time > 0:
-            self.logger.info(f"等待 {wait_time:.1f} 秒后再请求 {domain}")
-            time.sleep(wait_time)
+            self.logger.info("等待 %.1f 秒后再请求 %s", wait_time, domain)
+            cancellable_sleep(wait_time, cancel_token)
 
-    def enter_request(self, domain: str):
+    def set_shared_limiter(self, limiter):
+        """启用跨进程共享的域名限速"""
+        self.shared_limiter = limiter
+
+    def enter_request(self, domain: str, cancel_token: CancelToken = None):
         while True:
             with self.queue_lock:
                 current = self.domain_current_concurrency.get(domain, 0)
                 if current < self.domain_max_concurrency:
                     self.domain_current_concurrency[domain] = current + 1
-                    return
-            time.sleep(0.2)
+                    break
+            cancellable_sleep(0.2, cancel_token)
+        
+        if self.shared_limiter is not None:
+            try:
+                self.shared_limiter.acquire(domain, cancel_token)
+            except BaseException:
+                self._release_local(domain)
+                raise
 
     def exit_request(self, domain: str):
+        if self.shared_limiter is not None:
+            self.shared_limiter.release(domain)
+        self._release_local(domain)
+
+    def _release_local(self, domain: str):
         with self.queue_lock:
             current = self.domain_current_concurrency.get(domain, 0)
             if current > 0:
@@ -0,0 +1,217 @@
+"""
+检查结果写入线程
+检查线程只把结果放进队列，由单独的写入线程按批合并成一个事务提交，
+避免每个书签一个事务、多个线程争抢SQLite写锁
+"""
+
+import queue
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, func, update
+
+from models.database import Bookmark, upsert_videos, record_run_items
+from services.check_history import insert_history
+from services.work_queue import complete_work_items
+from config.settings import (RESULT_WRITER_BATCH_SIZE, RESULT_WRITER_FLUSH_MS, RESULT_WRITER_RETRIES,
+                             RESULT_WRITER_RETRY_DELAY)
+from utils.tracing import tracer
+
+_STOP = object()
+
+class ResultWriter:
+    """
+    批量写入检查结果
+
+    记录格式:
+        {
+            'bookmark_id': 书签ID,
+            'checked_at': 检查时间,
+            'last_video_id': 页面第一个视频ID,
+            'next_check_at': 下次检查时间,
+            'videos': [视频字典, ...],  # 本次发现的新视频
+            'run_id': 检查ID（可选，有则同一事务内写入检查点）,
+            'work_item': 工作队列的完成行（可选，见 WorkQueue.item，同一事务内完成书签）
+        }
+
+    或只含检查记录（任何结果都有，包括失败）: {'history': check_history 行}
+    或只含工作队列的完成行（检查失败的书签）: {'work_item': ...}
+    """
+
+    def __init__(self, engine, batch_size: int = None, flush_ms: int = None, retries: int = None,
+                 retry_delay: float = None):
+        """
+        Args:
+            engine: 数据库引擎
+            batch_size: 攒够多少条记录提交一次
+            flush_ms: 最早一条记录最多等待多少毫秒就提交
+            retries: 批量提交失败后的重试次数
+            retry_delay: 第一次重试前的等待（秒），之后逐次递增
+        """
+        self.engine = engine
+        self.batch_size = batch_size or RESULT_WRITER_BATCH_SIZE
+        self.flush_interval = (flush_ms or RESULT_WRITER_FLUSH_MS) / 1000
+        self.retries = RESULT_WRITER_RETRIES if retries is None else retries
+        self.retry_delay = RESULT_WRITER_RETRY_DELAY if retry_delay is None else retry_delay
+        self.logger = logging.getLogger(__name__)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.records = 0
+        self.videos = 0
+        self.history = 0
+        self.errors = 0
+        self.retried = 0
+        self.dropped = 0
+        self.max_batch_size = 0
+        self.commit_seconds = 0.0
+        self.max_commit_seconds = 0.0
+
+        self._update_bookmark = (
+            update(Bookmark.__table__)
+            .where(Bookmark.__table__.c.id == bindparam('b_id'))
+            .values(
+                last_check_time=bindparam('b_checked_at'),
+                check_count=func.coalesce(Bookmark.__table__.c.check_count, 0) + 1,
+                last_video_id=func.coalesce(bindparam('b_last_video_id'), Bookmark.__table__.c.last_video_id),
+                next_check_at=bindparam('b_next_check_at')
+            )
+        )
+
+    def start(self) -> 'ResultWriter':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='ResultWriter', daemon=True)
+            self._thread.start()
+        return self
+
+    def put(self, record: Dict):
+        """提交一条检查结果（检查线程调用，不阻塞）"""
+        self._queue.put(record)
+
+    def close(self, timeout: Optional[float] = None):
+        """写完队列中剩余的记录后停止线程"""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch.append(item)
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: List[Dict]):
+        """
+        提交一批记录：失败时隔一段时间重试，重试仍失败则逐条提交，只丢弃写不进去的那几条
+
+        丢弃的记录连同其检查点一起丢弃，续跑时这些书签会被重新检查
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                self._commit_batch(batch)
+                return
+            except Exception as e:
+                with self._stats_lock:
+                    self.errors += 1
+                if attempt < self.retries:
+                    self.logger.warning(f"批量写入检查结果失败({len(batch)}条)，第{attempt + 1}次重试: {str(e)}")
+                    with self._stats_lock:
+                        self.retried += 1
+                    time.sleep(self.retry_delay * (attempt + 1))
+                    continue
+                self.logger.error(f"批量写入检查结果失败({len(batch)}条): {str(e)}")
+        if len(batch) == 1:
+            with self._stats_lock:
+                self.dropped += 1
+            return
+        # 找出写不进去的记录，其余的照常提交
+        for record in batch:
+            try:
+                self._commit_batch([record])
+            except Exception as e:
+                with self._stats_lock:
+                    self.dropped += 1
+                self.logger.error(f"写入检查结果失败，已丢弃(书签 {record.get('bookmark_id')}): {str(e)}")
+
+    def _commit_batch(self, batch: List[Dict]):
+        """一个事务内批量更新书签、写入新视频（按书签+视频ID去重）、检查记录和工作队列完成状态"""
+        history_rows = [r['history'] for r in batch if 'history' in r]
+        work_items = [r['work_item'] for r in batch if 'work_item' in r]
+        batch = [r for r in batch if 'bookmark_id' in r]
+        bookmark_rows = [{
+            'b_id': r['bookmark_id'],
+            'b_checked_at': r['checked_at'],
+            'b_last_video_id': r['last_video_id'],
+            'b_next_check_at': r.get('next_check_at')
+        } for r in batch]
+        video_rows = [
+            dict(video, bookmark_id=r['bookmark_id'])
+            for r in batch for video in r.get('videos', ())
+        ]
+
+        run_items = [{
+            'run_id': r['run_id'],
+            'bookmark_id': r['bookmark_id'],
+            'finished_at': r['checked_at'],
+            'new_videos': len(r.get('videos', ()))
+        } for r in batch if r.get('run_id')]
+
+        start = time.perf_counter()
+        with tracer.span('db.write', 'db', records=len(batch), videos=len(video_rows)), \
+                self.engine.begin() as conn:
+            if bookmark_rows:
+                conn.execute(self._update_bookmark, bookmark_rows)
+            written = upsert_videos(conn, video_rows)
+            record_run_items(conn, run_items)
+            insert_history(conn, history_rows)
+            # 结果写入后才完成书签：提交前进程崩溃时租约到期，书签会被重新检查
+            complete_work_items(conn, work_items)
+        elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            self.batches += 1
+            self.records += len(batch)
+            self.videos += written
+            self.history += len(history_rows)
+            self.max_batch_size = max(self.max_batch_size, len(batch))
+            self.commit_seconds += elapsed
+            self.max_commit_seconds = max(self.max_commit_seconds, elapsed)
+        self.logger.debug("写入 %s 条检查结果，耗时 %.1fms", len(batch), elapsed * 1000)
+
+    def get_stats(self) -> dict:
+        """获取写入统计"""
+        with self._stats_lock:
+            return {
+                'batches': self.batches,
+                'records': self.records,
+                'videos': self.videos,
+                'history': self.history,
+                'errors': self.errors,
+                'retried': self.retried,
+                'dropped': self.dropped,
+                'avg_batch_size': self.records / self.batches if self.batches else 0.0,
+                'max_batch_size': self.max_batch_size,
+                'avg_commit_ms': self.commit_seconds * 1000 / self.batches if self.batches else 0.0,
+                'max_commit_ms': self.max_commit_seconds * 1000
+            }
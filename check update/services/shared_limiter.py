@@ -0,0 +1,114 @@
+"""
+跨进程共享的域名限速
+分片检查时多个进程各自的请求管理器互不知情，域名的最小请求间隔和并发上限
+改由数据库中的 domain_limits / domain_slots 表统一裁决
+"""
+
+import time
+import logging
+import threading
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models.database import DomainLimit, DomainSlot
+from config.settings import SHARED_SLOT_TTL
+from utils.cancellation import CancelToken, sleep as cancellable_sleep
+
+class SharedDomainLimiter:
+    """基于数据库的域名间隔与并发名额（多进程、多机器共享同一数据库时生效）"""
+
+    def __init__(self, engine, owner: str, min_interval: float, max_concurrency: int,
+                 slot_ttl: float = None, poll_interval: float = 0.2):
+        """
+        Args:
+            engine: 数据库引擎
+            owner: 进程标识
+            min_interval: 同一域名两次请求的最小间隔（秒）
+            max_concurrency: 同一域名同时进行的请求数上限
+            slot_ttl: 名额最长占用时间，持有者崩溃后到期自动回收
+            poll_interval: 名额不足时的重试间隔
+        """
+        self.engine = engine
+        self.owner = owner
+        self.min_interval = min_interval
+        self.max_concurrency = max_concurrency
+        self.slot_ttl = slot_ttl or SHARED_SLOT_TTL
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+        self._known_domains = set()
+        self._local = threading.local()
+
+    def _ensure_domain(self, domain: str):
+        if domain in self._known_domains:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(sqlite_insert(DomainLimit.__table__).on_conflict_do_nothing(),
+                         [{'domain': domain, 'next_allowed_at': 0}])
+            conn.execute(sqlite_insert(DomainSlot.__table__).on_conflict_do_nothing(),
+                         [{'domain': domain, 'slot': slot} for slot in range(self.max_concurrency)])
+        self._known_domains.add(domain)
+
+    def try_acquire(self, domain: str) -> Optional[int]:
+        """
+        尝试占用一个名额并消耗一次请求间隔
+
+        同一事务内先占名额再推进 next_allowed_at，任一条件不满足则整体回滚
+
+        Returns:
+            占到的名额编号，未占到返回 None
+        """
+        self._ensure_domain(domain)
+        now = time.time()
+        holder = f"{self.owner}:{threading.get_ident()}"
+        with self.engine.connect() as conn:
+            with conn.begin() as trans:
+                slot = conn.execute(text(
+                    "UPDATE domain_slots SET holder = :holder, expires_at = :expires "
+                    "WHERE rowid = ("
+                    "  SELECT rowid FROM domain_slots WHERE domain = :domain AND slot < :max_concurrency "
+                    "  AND (holder IS NULL OR expires_at < :now) ORDER BY slot LIMIT 1"
+                    ") RETURNING slot"
+                ), {'holder': holder, 'expires': now + self.slot_ttl, 'domain': domain,
+                    'max_concurrency': self.max_concurrency, 'now': now}).scalar()
+                if slot is None:
+                    trans.rollback()
+                    return None
+                paced = conn.execute(text(
+                    "UPDATE domain_limits SET next_allowed_at = :next "
+                    "WHERE domain = :domain AND next_allowed_at <= :now"
+                ), {'next': now + self.min_interval, 'domain': domain, 'now': now}).rowcount
+                if not paced:
+                    trans.rollback()
+                    return None
+        return slot
+
+    def acquire(self, domain: str, cancel_token: CancelToken = None):
+        """阻塞直到占到名额（可被取消），名额记在当前线程上，由 release 归还"""
+        while True:
+            slot = self.try_acquire(domain)
+            if slot is not None:
+                held = getattr(self._local, 'held', None)
+                if held is None:
+                    held = self._local.held = {}
+                held.setdefault(domain, []).append(slot)
+                return
+            cancellable_sleep(self.poll_interval, cancel_token)
+
+    def release(self, domain: str):
+        """归还当前线程最近占用的该域名名额"""
+        held = getattr(self._local, 'held', {}).get(domain)
+        if not held:
+            return
+        slot = held.pop()
+        holder = f"{self.owner}:{threading.get_ident()}"
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    "UPDATE domain_slots SET holder = NULL, expires_at = NULL "
+                    "WHERE domain = :domain AND slot = :slot AND holder = :holder"
+                ), {'domain': domain, 'slot': slot, 'holder': holder})
+        except Exception as e:
+            # 归还失败时名额到期后也会自动回收
+            self.logger.warning(f"归还域名名额失败 {domain}#{slot}: {str(e)}")
@@ -1,37 +1,177 @@
 from datetime import datetime, timedelta
 import logging
-from typing import List, Dict, Optional
-from models.database import Bookmark, Video, Settings
+from typing import List, Dict, Iterator, Optional
+from models.database import Bookmark, Video, Settings, CheckRun, CheckRunItem, upsert_videos, record_run_items
 from services.web_scraper import WebScraper
-from config.settings import MAX_WORKERS
+from services.parse_pool import get_parse_pool
+from config.settings import (MAX_WORKERS, PARSE_PROCESSES, ADAPTIVE_POLLING, ADAPTIVE_POLL_FRACTION,
+                             ADAPTIVE_MIN_INTERVAL_HOURS, ADAPTIVE_MAX_INTERVAL_HOURS, ADAPTIVE_JITTER,
+                             CHECK_RUN_RESUME_HOURS, STREAM_MAX_PENDING, MAX_PAGE_DEPTH,
+                             TRACE_CHECKS, TRACE_DIR)
+from sqlalchemy import or_
+import os
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import heapq
+from collections import deque
+import queue
+import random
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
 import threading
+from services.request_manager import request_manager
+from services.result_writer import ResultWriter
+from utils.cancellation import CancelToken, CheckCancelled
+from utils.tracing import tracer
+from services.check_result import CheckResult, UPDATE, NO_CHANGE, ERROR, SKIPPED
+from services.check_history import insert_history
+
+class _DueQueue:
+    """
+    检查调度队列：按书签到期时间排序的优先队列，派发时再看域名是否就绪
+    
+    域名就绪 = 请求管理器不要求等待、距该域名上次派发已过最小间隔、且该域名并发未满，
+    这样派发出去的任务拿到线程后第一个请求不必等待。域名未就绪时，取出的书签按到期顺序
+    放进该域名的等待列表，不再放回堆里；之后只看各等待列表的队首，每个书签只出堆一次。
+    任务抓完第一页就归还域名名额（finish），解析和写入期间同域名的下一个书签即可派发；
+    翻页和重试的请求由请求管理器按请求限制并发，退避仍在检查线程内等待（可被取消令牌打断）
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._heap = []
+        self._seq = 0
+        self._size = 0
+        self._blocked = {}            # 域名 -> 等待域名就绪的书签 deque[(到期时间, 序号, 书签)]
+        self._domain_next = {}        # 域名 -> 下次可派发时间
+        self._domain_in_flight = {}   # 域名 -> 进行中任务数
+        self._wakeup_at = None
+
+    def __len__(self):
+        return self._size
+
+    def push(self, due_time: float, bookmark, domain: str):
+        self._seq += 1
+        self._size += 1
+        heapq.heappush(self._heap, (due_time, self._seq, bookmark, domain))
+
+    def _domain_ready_at(self, domain: str, now: float) -> Optional[float]:
+        """域名可派发的时间；并发已满时返回None（等任务完成再看）"""
+        if self._domain_in_flight.get(domain, 0) >= request_manager.domain_max_concurrency:
+            return None
+        return max(now + request_manager.ready_in(domain), self._domain_next.get(domain, 0))
+
+    def _take(self, domain: str, now: float) -> bool:
+        """域名已就绪时占用一次派发名额并返回 True，否则记下醒来时间并返回 False"""
+        ready_at = self._domain_ready_at(domain, now)
+        if ready_at is None or ready_at > now:
+            if ready_at is not None:
+                self._note_wakeup(ready_at)
+            return False
+        self._domain_next[domain] = now + request_manager.domain_min_interval
+        self._domain_in_flight[domain] = self._domain_in_flight.get(domain, 0) + 1
+        self._size -= 1
+        return True
+
+    def pop_ready(self, in_flight: int) -> list:
+        """取出所有可以立即派发的书签，同时记录下一次需要醒来的时间"""
+        now = time.time()
+        ready = []
+        capacity = self.max_workers - in_flight
+        self._wakeup_at = None
+        # 等待列表里的书签比堆里的更早到期，先派发
+        for domain in list(self._blocked):
+            items = self._blocked[domain]
+            while items and len(ready) < capacity and self._take(domain, now):
+                ready.append((items.popleft()[2], domain))
+            if not items:
+                del self._blocked[domain]
+        while self._heap and len(ready) < capacity:
+            due_time, seq, bookmark, domain = self._heap[0]
+            if due_time > now:
+                self._note_wakeup(due_time)
+                break
+            heapq.heappop(self._heap)
+            if domain in self._blocked:
+                self._blocked[domain].append((due_time, seq, bookmark))
+            elif self._take(domain, now):
+                ready.append((bookmark, domain))
+            else:
+                self._blocked[domain] = deque([(due_time, seq, bookmark)])
+        return ready
+
+    def drain(self) -> list:
+        """取出所有尚未派发的书签"""
+        items = [item[:3] for item in self._heap]
+        for blocked in self._blocked.values():
+            items.extend(blocked)
+        self._heap.clear()
+        self._blocked.clear()
+        self._size = 0
+        return [item[2] for item in sorted(items, key=lambda item: item[:2])]
+
+    def finish(self, domain: str):
+        self._domain_in_flight[domain] = max(0, self._domain_in_flight.get(domain, 0) - 1)
+
+    def _note_wakeup(self, at: float):
+        if self._wakeup_at is None or at < self._wakeup_at:
+            self._wakeup_at = at
+
+    def next_wakeup(self) -> Optional[float]:
+        """距下一个书签到期/域名就绪的秒数；None 表示只需等待进行中的任务"""
+        if self._wakeup_at is None:
+            return None
+        return max(0.0, self._wakeup_at - time.time())
 
 class UpdateChecker:
-    def __init__(self, session, max_workers=None):
+    def __init__(self, session, max_workers=None, parse_processes=None, adaptive=None, trace=None):
+        """
+        Args:
+            session: 数据库会话
+            max_workers: 检查线程数
+            parse_processes: 解析进程数，0 表示在检查线程中直接解析
+            adaptive: 自适应轮询，只检查已到 next_check_at 的书签，默认取配置
+            trace: 记录每个书签的耗时区间并导出 Chrome trace，默认取配置
+        """
         self.session = session
         self.scraper = WebScraper()
         self.logger = logging.getLogger(__name__)
         self.max_workers = max_workers or MAX_WORKERS
+        self.parse_processes = PARSE_PROCESSES if parse_processes is None else parse_processes
+        self.adaptive = ADAPTIVE_POLLING if adaptive is None else adaptive
+        self._parse_pool = None
         self._lock = threading.Lock()
         self._progress_callback = None
         self._item_callback = None
-        self._stop_flag = False  # 添加停止标志
+        self.cancel_token = CancelToken()  # stop() 后所有等待立即结束
+        self._writer = None
+        self._work = None  # 分片模式下的 (工作队列, 租约持有者)
+        self.last_writer_stats = None
+        self.run_id = None
+        self.trace = TRACE_CHECKS if trace is None else trace
+        self.trace_dir = TRACE_DIR
+        self.last_trace_path = None
         try:
-            from sqlalchemy.orm import sessionmaker
             bind = getattr(self.session, 'get_bind', None)
-            engine = bind() if callable(bind) else getattr(self.session, 'bind', None)
-            if engine is not None:
-                self._SessionFactory = sessionmaker(bind=engine)
-            else:
-                self._SessionFactory = None
+            self._engine = bind() if callable(bind) else getattr(self.session, 'bind', None)
         except Exception:
-            self._SessionFactory = None
+            self._engine = None
 
     def stop(self):
-        """停止检查"""
-        self._stop_flag = True
+        """停止检查：取消令牌会唤醒所有正在等待的检查线程；检查线程还没开始时，该次检查一开始就结束"""
+        self.cancel_token.cancel()
+
+    def _use_cancel_token(self):
+        """每次检查开始时调用：共用的抓取器使用当前令牌（开始前到达的 stop() 仍然有效）"""
+        self.scraper.cancel_token = self.cancel_token
+
+    def _reset_cancel_token(self):
+        """每次检查结束时调用：被停止过就换一个新令牌，停止只作用于当次检查"""
+        if self.cancel_token.cancelled:
+            self.cancel_token = CancelToken()
+            self.scraper.cancel_token = self.cancel_token
+
+    @property
+    def _stop_flag(self) -> bool:
+        return self.cancel_token.cancelled
 
     def set_progress_callback(self, callback):
         """设置进度回调函数"""
@@ -41,7 +181,56 @@ class UpdateChecker:
         self._item_callback = callback
 
     def check_all_bookmarks(self) -> List[Dict]:
-        """并发检查所有书签的更新"""
+        """并发检查所有书签的更新，全部完成后返回更新列表"""
+        all_updates = []
+        self._run_check(lambda result: all_updates.extend(result.updates))
+        return all_updates
+
+    def iter_check_results(self, max_pending: int = None) -> Iterator[CheckResult]:
+        """
+        流式检查：按完成顺序逐个产出每个书签的 CheckResult
+        
+        检查在后台线程中进行；未被取走的结果超过 max_pending 条时调度器暂停派发（背压），
+        内存占用与书签数量无关。提前关闭迭代器会停止检查
+        
+        Args:
+            max_pending: 缓冲的最大结果数，默认取配置
+        """
+        results = queue.Queue(maxsize=max_pending or STREAM_MAX_PENDING)
+        closed = threading.Event()
+        finished = object()
+        
+        def put(item):
+            while not closed.is_set():
+                try:
+                    results.put(item, timeout=0.2)
+                    return
+                except queue.Full:
+                    continue
+        
+        def run():
+            try:
+                self._run_check(put)
+            finally:
+                put(finished)
+        
+        worker = threading.Thread(target=run, name='UpdateCheckRun', daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = results.get()
+                if item is finished:
+                    break
+                yield item
+        finally:
+            closed.set()
+            if worker.is_alive():
+                self.stop()
+            worker.join()
+
+    def _run_check(self, emit):
+        """执行一次检查，每个书签完成时调用 emit(CheckResult)"""
+        self._use_cancel_token()
         try:
             settings = self.session.query(Settings).first()
             if not settings:
@@ -50,46 +239,47 @@ class UpdateChecker:
             else:
                 update_range_days = settings.update_range_days
 
-            bookmarks = self.session.query(Bookmark).all()
-            all_updates = []
+            query = self.session.query(Bookmark)
+            if self.adaptive:
+                # 只取已到期的书签，其余的按各自的发布频率留到以后的检查
+                query = query.filter(or_(Bookmark.next_check_at.is_(None),
+                                         Bookmark.next_check_at <= datetime.now()))
+            # 有未完成的检查时续跑，只检查其中尚未完成的书签；
+            # 先提交检查记录再加载书签，提交使已加载对象过期会导致派发时逐个重新查询
+            done_ids = self._begin_run(update_range_days, query.count())
+            bookmarks = query.all()
+            if self.adaptive:
+                self.logger.info("自适应轮询: 本次检查 %s 个到期书签", len(bookmarks))
+            if done_ids:
+                bookmarks = [b for b in bookmarks if b.id not in done_ids]
+                self.logger.info("续跑检查 #%s: 已完成 %s 个，剩余 %s 个", self.run_id, len(done_ids), len(bookmarks))
+            
+            # 本次检查内的相对时间统一以开始时间为基准
+            self.scraper.run_timestamp = datetime.now()
+            
+            # 解析进程池在多次检查间复用
+            if self.parse_processes and self.parse_processes > 0:
+                self._parse_pool = get_parse_pool(self.parse_processes)
             
             if not bookmarks:
-                return all_updates
-
-            # 使用线程池并发检查
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                # 提交所有任务
-                future_to_bookmark = {}
-                for i, bookmark in enumerate(bookmarks):
-                    if self._stop_flag:
-                        break
-                    future = executor.submit(self._check_bookmark_safe, bookmark, update_range_days, i, len(bookmarks))
-                    future_to_bookmark[future] = bookmark
-                
-                # 收集结果
-                completed = 0
-                for future in as_completed(future_to_bookmark):
-                    if self._stop_flag:
-                        executor.shutdown(wait=False)
-                        break
-                        
-                    bookmark = future_to_bookmark[future]
-                    completed += 1
-                    try:
-                        updates = future.result()
-                        if updates:
-                            if self._item_callback:
-                                for u in updates:
-                                    try:
-                                        self._item_callback(u)
-                                    except Exception:
-                                        pass
-                            all_updates.extend(updates)
-                        if self._progress_callback:
-                            self._progress_callback(completed, len(bookmarks), bookmark.name)
-                            
-                    except Exception as e:
-                        self.logger.error(f"检查书签 {bookmark.url} 失败: {str(e)}")
+                self._finish_run('completed')
+                return
+
+            # 按到期时间和域名就绪情况调度，线程池里只放马上能执行的任务
+            due_queue = _DueQueue(self.max_workers)
+            run_start = time.time()
+            for bookmark in bookmarks:
+                due_queue.push(self._due_time(bookmark, run_start), bookmark, self.scraper._get_domain(bookmark.url))
+            
+            self._start_trace()
+            self._start_writer()
+            try:
+                self._dispatch(due_queue, update_range_days, emit)
+            finally:
+                self._stop_writer()
+                self._finish_trace()
+
+            self._finish_run('stopped' if self._stop_flag else 'completed')
 
             # 更新最后检查时间
             if settings:
@@ -97,31 +287,327 @@ class UpdateChecker:
                     settings.last_check_time = datetime.now()
                     self.session.commit()
 
-            return all_updates
-
         except Exception as e:
             self.logger.error(f"检查更新失败: {str(e)}")
-            return []
-    
-    def _check_bookmark_safe(self, bookmark, update_range_days, index, total):
-        """线程安全的检查单个书签（带延迟避免触发速率限制）"""
-        if self._stop_flag:
-            return []
+            self._finish_run('failed')
+        finally:
+            self._reset_cancel_token()
+
+    def run_work_queue(self, work_queue, owner: str, batch_size: int = None) -> Dict[str, int]:
+        """
+        分片模式：从共享的工作队列按租约领取书签检查，直到队列处理完或被停止
+        
+        多个进程（或多台机器）可以对同一个队列同时调用；域名限速需另外通过
+        request_manager.set_shared_limiter 在进程间共享
+        
+        Args:
+            work_queue: services.work_queue.WorkQueue
+            owner: 本进程标识（租约持有者）
+            batch_size: 每次领取的书签数，默认线程数的两倍
             
+        Returns:
+            各结果类型的数量
+        """
+        self._use_cancel_token()
+        # 检查范围以入队时记在检查上的为准，所有进程一致
+        run = self.session.get(CheckRun, work_queue.run_id)
+        update_range_days = run.update_range_days if run and run.update_range_days else None
+        if update_range_days is None:
+            settings = self.session.query(Settings).first()
+            update_range_days = settings.update_range_days if settings else 7
+        self.run_id = work_queue.run_id
+        self.scraper.run_timestamp = datetime.now()
+        if self.parse_processes and self.parse_processes > 0:
+            self._parse_pool = get_parse_pool(self.parse_processes)
+        batch_size = batch_size or self.max_workers * 2
+        counts = {}
+        held = set()  # 已领取、尚未完成的书签，由续租线程定时延长租约
+        held_lock = threading.Lock()
+        
+        def emit(result):
+            counts[result.kind] = counts.get(result.kind, 0) + 1
+            bookmark_id = result.bookmark.id
+            with held_lock:
+                held.discard(bookmark_id)
+            if result.kind == SKIPPED:
+                work_queue.release(owner, bookmark_id)
+            elif result.kind == ERROR:
+                self._complete_work_item(work_queue.item(owner, bookmark_id, 'error'))
+            elif self._writer is None:
+                # 成功的结果有写入线程时已随检查结果一起提交（见 _save_check_result）
+                work_queue.complete(owner, bookmark_id, 'done')
+        
+        renewing = threading.Event()
+        
+        def renew_leases():
+            while not renewing.wait(work_queue.lease_seconds / 3):
+                with held_lock:
+                    bookmark_ids = list(held)
+                try:
+                    work_queue.extend(owner, bookmark_ids)
+                except Exception as e:
+                    self.logger.warning(f"续租失败: {str(e)}")
+        
+        renewer = threading.Thread(target=renew_leases, name='WorkLeaseRenewer', daemon=True)
+        renewer.start()
+        self._work = (work_queue, owner)
+        self._start_trace()
+        self._start_writer()
         try:
-            # 根据索引添加少量延迟，避免所有请求同时发出
-            delay = index * 0.2  # 每个书签间隔0.2秒（原0.5→0.2）
-            time.sleep(delay)
-            local_scraper = WebScraper()
-            return self._check_single_bookmark_with_scraper(local_scraper, bookmark, update_range_days)
+            while not self._stop_flag:
+                bookmark_ids = work_queue.lease(owner, batch_size)
+                if not bookmark_ids:
+                    if work_queue.is_finished():
+                        break
+                    # 其余书签在别的进程手里，等它们完成或租约过期
+                    self.cancel_token.sleep(1.0)
+                    continue
+                with held_lock:
+                    held.update(bookmark_ids)
+                bookmarks = self.session.query(Bookmark).filter(Bookmark.id.in_(bookmark_ids)).all()
+                due_queue = _DueQueue(self.max_workers)
+                run_start = time.time()
+                for bookmark in bookmarks:
+                    due_queue.push(self._due_time(bookmark, run_start), bookmark,
+                                   self.scraper._get_domain(bookmark.url))
+                self._dispatch(due_queue, update_range_days, emit)
+        finally:
+            self._stop_writer()
+            self._work = None
+            renewing.set()
+            renewer.join()
+            self._finish_trace(owner)
+            self.run_id = None
+            self._reset_cancel_token()
+        return counts
+
+    def _complete_work_item(self, item: Dict):
+        """完成工作队列中的书签：有写入线程时排在该书签的检查结果之后提交"""
+        if self._writer is not None:
+            self._writer.put({'work_item': item})
+            return
+        work_queue, _ = self._work
+        work_queue.complete(item['owner'], item['bookmark_id'], item['status'])
+
+    def _start_writer(self):
+        """检查结果由写入线程批量提交"""
+        if self._engine is not None:
+            self._writer = ResultWriter(self._engine).start()
+
+    def _stop_writer(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        self.last_writer_stats = self._writer.get_stats()
+        self._writer = None
+        self.logger.info(
+            "结果写入: %(records)s 条 / %(batches)s 批，平均批量 %(avg_batch_size).1f，"
+            "平均提交 %(avg_commit_ms).1fms，最长 %(max_commit_ms).1fms", self.last_writer_stats
+        )
+
+    def _start_trace(self):
+        if self.trace:
+            tracer.start()
+
+    def _finish_trace(self, owner: str = None):
+        """导出本次检查的 trace 到 trace_dir/check_<检查ID>.json"""
+        if not self.trace:
+            return
+        events = tracer.stop()
+        name = f"check_{self.run_id or datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        if owner:
+            name += '_' + owner.replace(':', '_')
+        path = os.path.join(self.trace_dir, name + '.json')
+        try:
+            tracer.save(tracer.to_chrome(events, {'run_id': self.run_id, 'owner': owner,
+                                                  'max_workers': self.max_workers}), path)
+            self.last_trace_path = path
+            self.logger.info("耗时追踪已导出: %s（%s 个区间）", path, len(events))
         except Exception as e:
-            self.logger.error(f"检查书签 {bookmark.url} 出错: {str(e)}")
-            return []
+            self.logger.error(f"导出耗时追踪失败: {str(e)}")
+
+    def _begin_run(self, update_range_days, total) -> set:
+        """
+        开始一次检查：续跑最近一次未完成的检查，或新建检查
+        
+        Returns:
+            续跑时已完成的书签ID集合，新建时为空
+        """
+        try:
+            with self._lock:
+                resume_after = datetime.now() - timedelta(hours=CHECK_RUN_RESUME_HOURS)
+                unfinished = (self.session.query(CheckRun)
+                              .filter(CheckRun.status.in_(('running', 'stopped', 'failed')))
+                              .order_by(CheckRun.id.desc()).all())
+                run = None
+                for candidate in unfinished:
+                    if run is None and candidate.started_at >= resume_after \
+                            and candidate.update_range_days == update_range_days:
+                        run = candidate
+                    else:
+                        candidate.status = 'abandoned'
+                        candidate.finished_at = candidate.finished_at or datetime.now()
+                
+                if run is None:
+                    run = CheckRun(update_range_days=update_range_days, total=total)
+                    self.session.add(run)
+                    done_ids = set()
+                else:
+                    run.status = 'running'
+                    run.finished_at = None
+                    done_ids = {bookmark_id for (bookmark_id,) in
+                                self.session.query(CheckRunItem.bookmark_id).filter_by(run_id=run.id)}
+                self.session.commit()
+                self.run_id = run.id
+                return done_ids
+        except Exception as e:
+            self.session.rollback()
+            self.run_id = None
+            self.logger.error(f"创建检查记录失败: {str(e)}")
+            return set()
+
+    def _finish_run(self, status):
+        """记录检查结束状态（stopped/failed 的检查下次可续跑）；之后的单个书签检查不再记到这次检查下"""
+        if self.run_id is None:
+            return
+        try:
+            with self._lock:
+                run = self.session.get(CheckRun, self.run_id)
+                if run:
+                    run.status = status
+                    run.finished_at = datetime.now()
+                    self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"更新检查记录失败: {str(e)}")
+        finally:
+            self.run_id = None
+    
+    def _dispatch(self, due_queue, update_range_days, emit):
+        """调度循环：按到期时间和域名就绪情况把书签派发到线程池，按完成顺序产出结果"""
+        total = len(due_queue)
+        completed = 0
+        
+        queued_at = tracer.now()
+        
+        def deliver(result):
+            nonlocal completed
+            completed += 1
+            result.completed = completed
+            result.total = total
+            with tracer.span('callback', bookmark=result.bookmark.name, kind=result.kind):
+                if self._item_callback:
+                    for u in result.updates:
+                        try:
+                            self._item_callback(u)
+                        except Exception:
+                            pass
+                if self._progress_callback:
+                    self._progress_callback(completed, total, result.bookmark.name)
+                # 调用方处理不过来时在这里阻塞，调度器随之暂停派发
+                emit(result)
+        
+        # 检查线程抓完第一页时归还域名名额，并唤醒调度循环（wake 完成即唤醒）
+        due_lock = threading.Lock()
+        wake = Future()
+        
+        def domain_release(domain):
+            released = False
+            
+            def release():
+                nonlocal released
+                with due_lock:
+                    if released:
+                        return
+                    released = True
+                    due_queue.finish(domain)
+                    if not wake.done():
+                        wake.set_result(None)
+            return release
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = {}
+            # 停止后不再派发，但收完进行中的任务（它们的等待已被取消，会很快返回）
+            while (due_queue and not self._stop_flag) or in_flight:
+                with due_lock:
+                    if wake.done():
+                        wake = Future()
+                    if not self._stop_flag:
+                        # 派发所有已到期且域名就绪的书签
+                        for bookmark, domain in due_queue.pop_ready(len(in_flight)):
+                            release = domain_release(domain)
+                            future = executor.submit(self._check_bookmark_safe, bookmark, update_range_days,
+                                                     queued_at, tracer.now(), release)
+                            in_flight[future] = (bookmark, release)
+                    timeout = due_queue.next_wakeup()
+                
+                if not in_flight:
+                    # 没有进行中的任务，等到下一个书签到期或域名就绪
+                    self.cancel_token.sleep(min(timeout if timeout is not None else 0.5, 0.5))
+                    continue
+
+                done, _ = wait(list(in_flight) + [wake], timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future is wake:
+                        continue
+                    bookmark, release = in_flight.pop(future)
+                    release()
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.logger.error(f"检查书签 {bookmark.url} 失败: {str(e)}")
+                        result = CheckResult(ERROR, bookmark, error=str(e))
+                    deliver(result)
+        
+        # 被停止时，未派发的书签记为跳过
+        for bookmark in due_queue.drain():
+            deliver(CheckResult(SKIPPED, bookmark, error='检查已停止'))
+
+    def _check_bookmark_safe(self, bookmark, update_range_days, queued_at=None, dispatched_at=None,
+                             fetched=None):
+        """
+        线程安全的检查单个书签（调度器已按域名节奏派发，这里不再等待）
+        
+        queued_at / dispatched_at 为入队和派发时间（tracer.now()），用于记录排队区间；
+        fetched 在第一页抓取结束时调用（归还调度器的域名名额）
+        """
+        if tracer.enabled and queued_at is not None:
+            # 排队 = 在调度队列里等到期/域名就绪 + 派发后等空闲线程
+            started = tracer.now()
+            tracer.add_async('queue_wait', queued_at, started, bookmark.id,
+                             args={'bookmark': bookmark.name,
+                                   'thread_wait_ms': (started - dispatched_at) / 1e6 if dispatched_at else None})
+        if self._stop_flag:
+            return CheckResult(SKIPPED, bookmark, error='检查已停止')
+            
+        with tracer.span('check', bookmark=bookmark.name, bookmark_id=bookmark.id) as span:
+            try:
+                local_scraper = WebScraper()
+                local_scraper.run_timestamp = self.scraper.run_timestamp
+                local_scraper.cancel_token = self.cancel_token
+                result = self._check_single_bookmark_with_scraper(local_scraper, bookmark, update_range_days,
+                                                                  fetched)
+            except Exception as e:
+                self.logger.error(f"检查书签 {bookmark.url} 出错: {str(e)}")
+                result = CheckResult(ERROR, bookmark, error=str(e))
+            span.set(kind=result.kind, videos=len(result.videos))
+            return result
+
+    def _due_time(self, bookmark, run_start: float) -> float:
+        """
+        书签的到期时间（时间戳）：自适应轮询算出的 next_check_at，没有时用上次检查时间，
+        从未检查过的最先；不晚于本次检查开始，本次要检查的书签都不必等待，只决定派发先后
+        """
+        due_at = bookmark.next_check_at or bookmark.last_check_time
+        if due_at is None:
+            return 0.0
+        return min(due_at.timestamp(), run_start)
 
     def check_single_bookmark(self, bookmark, update_range_days):
         """
         检查单个书签（修复版：确保不漏检）
         """
+        self._use_cancel_token()
         try:
             start_time = datetime.now()
             
@@ -130,41 +616,195 @@ class UpdateChecker:
             if not html:
                 return []
 
-            # 解析视频信息
-            videos = self.scraper.parse_video_info(html, bookmark.url)
-            if not videos:
+            # 解析视频信息，只扫描到上次看到的视频为止
+            cutoff_time = datetime.now() - timedelta(days=update_range_days)
+            first_video, new_videos, upload_times = self._collect_new_videos(
+                self.scraper, bookmark, html, cutoff_time
+            )
+            if first_video is None:
                 return []
 
-            # 获取时间范围内的最新视频（使用原始逻辑，确保不漏检）
-            cutoff_time = datetime.now() - timedelta(days=update_range_days)
-            latest_video = None
-            
-            for video in videos:
-                upload_time = video.get('upload_time')
-                if upload_time and upload_time > cutoff_time:
-                    if latest_video is None or video['upload_time'] > latest_video['upload_time']:
-                        latest_video = video
-
-            # 更新书签统计（简化版）
-            bookmark.last_check_time = datetime.now()
-            bookmark.check_count = (bookmark.check_count or 0) + 1
-            if videos:
-                bookmark.last_video_id = videos[0].get('video_id', '')
-            self.session.commit()
+            # 更新书签统计并保存新视频
+            self._save_check_result(bookmark, first_video, new_videos, self._next_check_at(upload_times, bookmark))
             
             # 返回结果
-            if latest_video:
-                elapsed = (datetime.now() - start_time).total_seconds()
-                self.logger.info(f"✓ {bookmark.name}: 发现新视频 ({elapsed:.1f}秒)")
-                return [{'bookmark': bookmark, 'video': Video(**latest_video)}]
-            else:
-                self.logger.info(f"○ {bookmark.name}: 无新视频")
-                return []
+            return self._report_new_videos(bookmark, new_videos, start_time)
 
         except Exception as e:
             self.logger.error(f"检查书签更新失败: {str(e)}")
             return []
+        finally:
+            self._reset_cancel_token()
     
+    def _iter_videos(self, html, url, cutoff_time, stop_video_id=None):
+        """解析页面：启用进程池时交给子进程，否则在当前线程中逐个产出"""
+        if self._parse_pool is not None:
+            try:
+                return iter(self._parse_pool.parse(html, url, self.scraper.run_timestamp,
+                                                   cutoff_time, stop_video_id, self.cancel_token))
+            except (CheckCancelled, TimeoutError):
+                # 停止检查或页面卡住：不再在线程里重新解析
+                raise
+            except Exception as e:
+                self.logger.warning(f"进程池解析失败，改为线程内解析: {str(e)}")
+        return self.scraper.parse_video_info_iter(html, url)
+
+    def _collect_new_videos(self, scraper, bookmark, html, cutoff_time):
+        """
+        扫描第一页，必要时继续翻页，返回 (第一页第一个视频, 新视频列表, 扫描到的上传时间)
+        
+        只有整页都比上次看到的视频新（没遇到 last_video_id 也没超出时间范围）才抓下一页，
+        下一页地址取自当前页的分页栏，最多 MAX_PAGE_DEPTH 页；不活跃的创作者只抓一页
+        """
+        last_video_id = bookmark.last_video_id
+        first_video, new_videos, upload_times, stopped = self._scan_videos(
+            self._iter_videos(html, bookmark.url, cutoff_time, last_video_id), cutoff_time, last_video_id
+        )
+        if first_video is None or not last_video_id:
+            return first_video, new_videos, upload_times
+        
+        seen = {video['video_id'] for video in new_videos}
+        page = 1
+        page_url, page_html = bookmark.url, html
+        while not stopped and page < MAX_PAGE_DEPTH:
+            page += 1
+            page_url = scraper.next_page_url(page_html, page_url)
+            if not page_url:
+                break
+            page_html = scraper.get_page_content(page_url, use_cache=False)
+            if not page_html:
+                break
+            page_first, page_videos, page_times, stopped = self._scan_videos(
+                self._iter_videos(page_html, page_url, cutoff_time, last_video_id), cutoff_time, last_video_id
+            )
+            if page_first is None:
+                break
+            # 翻页期间有新上传时，上一页末尾的视频会被挤到下一页
+            page_videos = [video for video in page_videos if video['video_id'] not in seen]
+            seen.update(video['video_id'] for video in page_videos)
+            new_videos.extend(page_videos)
+            upload_times.extend(page_times)
+            self.logger.debug("%s: 第%s页新增 %s 个视频", bookmark.name, page, len(page_videos))
+        return first_video, new_videos, upload_times
+
+    def _scan_videos(self, videos, cutoff_time, last_video_id=None):
+        """
+        增量扫描：按页面顺序扫描视频，返回 (页面第一个视频, 新视频列表, 扫描到的上传时间, 是否已停止)
+        
+        页面按上传时间倒序排列，遇到上次检查的最后一个视频或第一个超出范围的视频即停止，
+        后面的容器不再解析。新视频是两者之前、时间范围内的全部视频；
+        从未检查过（没有 last_video_id）时只报告范围内最新的一个。
+        扫完整页都没遇到停止条件时"是否已停止"为 False，说明下一页可能还有新视频
+        """
+        first_video = None
+        new_videos = []
+        upload_times = []
+        stopped = False
+        for video in videos:
+            if first_video is None:
+                first_video = video
+            upload_time = video.get('upload_time')
+            if upload_time:
+                upload_times.append(upload_time)
+            if last_video_id and video.get('video_id') == last_video_id:
+                self.logger.debug("到达上次检查位置: %s", last_video_id)
+                stopped = True
+                break
+            if not upload_time or upload_time <= cutoff_time:
+                stopped = True
+                break
+            new_videos.append(video)
+        
+        if not last_video_id and new_videos:
+            new_videos = [max(new_videos, key=lambda v: v['upload_time'])]
+        return first_video, new_videos, upload_times, stopped
+
+    def _save_check_result(self, bookmark, first_video, new_videos, next_check_at):
+        """保存一次检查的结果：有写入线程时放进队列批量提交，否则直接用当前会话提交"""
+        checked_at = datetime.now()
+        last_video_id = first_video.get('video_id', '') if first_video else None
+        if self._writer is not None:
+            record = {
+                'bookmark_id': bookmark.id,
+                'checked_at': checked_at,
+                'last_video_id': last_video_id,
+                'next_check_at': next_check_at,
+                'videos': new_videos,
+                'run_id': self.run_id
+            }
+            if self._work is not None:
+                # 分片模式：书签与检查结果在同一事务内完成
+                work_queue, owner = self._work
+                record['work_item'] = work_queue.item(owner, bookmark.id, 'done')
+            self._writer.put(record)
+            return
+        try:
+            with self._lock:
+                bookmark.last_check_time = checked_at
+                bookmark.check_count = (bookmark.check_count or 0) + 1
+                if last_video_id is not None:
+                    bookmark.last_video_id = last_video_id
+                bookmark.next_check_at = next_check_at
+                upsert_videos(self.session, [dict(video, bookmark_id=bookmark.id) for video in new_videos])
+                if self.run_id:
+                    record_run_items(self.session, [{
+                        'run_id': self.run_id,
+                        'bookmark_id': bookmark.id,
+                        'finished_at': checked_at,
+                        'new_videos': len(new_videos)
+                    }])
+                self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"更新书签统计失败: {str(e)}")
+
+    def _report_new_videos(self, bookmark, new_videos, start_time):
+        """把新视频转换为更新记录并输出日志"""
+        if not new_videos:
+            self.logger.info("○ %s: 无新视频", bookmark.name)
+            return []
+        elapsed = (datetime.now() - start_time).total_seconds()
+        self.logger.info("✓ %s: 发现 %s 个新视频 (%.1f秒)", bookmark.name, len(new_videos), elapsed)
+        return [{'bookmark': bookmark, 'video': Video(**video)} for video in new_videos]
+
+    def _estimate_post_interval(self, upload_times: List[datetime], now: datetime) -> float:
+        """
+        根据扫描到的上传时间估算平均发布间隔（小时）
+        
+        k+1 个上传时间中最早的一个到现在之间发生了 k 次发布；只有一个视频时，
+        距它上传的时长就是间隔的下限
+        """
+        if not upload_times:
+            return ADAPTIVE_MAX_INTERVAL_HOURS / ADAPTIVE_POLL_FRACTION
+        span_hours = max((now - min(upload_times)).total_seconds() / 3600, 0)
+        return span_hours / max(1, len(upload_times) - 1)
+
+    def _next_check_at(self, upload_times: List[datetime], bookmark=None) -> datetime:
+        """
+        按估算的发布间隔计算下次检查时间，加随机抖动避免书签扎堆到期
+
+        页面没解析出上传时间（解析失败或临时为空）时不据此推断不活跃，沿用上次的间隔
+        """
+        if not upload_times and bookmark is not None:
+            return self._repeat_interval(bookmark)
+        now = datetime.now()
+        interval_hours = self._estimate_post_interval(upload_times, now) * ADAPTIVE_POLL_FRACTION
+        interval_hours = min(max(interval_hours, ADAPTIVE_MIN_INTERVAL_HOURS), ADAPTIVE_MAX_INTERVAL_HOURS)
+        interval_hours *= random.uniform(1 - ADAPTIVE_JITTER, 1 + ADAPTIVE_JITTER)
+        return now + timedelta(hours=interval_hours)
+
+    def _repeat_interval(self, bookmark) -> datetime:
+        """
+        没有新的上传时间可用时的下次检查时间：沿用上次算出的间隔（next_check_at - last_check_time），
+        没有上次的间隔时用最短间隔
+        """
+        now = datetime.now()
+        if bookmark.next_check_at and bookmark.last_check_time and bookmark.next_check_at > bookmark.last_check_time:
+            interval = bookmark.next_check_at - bookmark.last_check_time
+        else:
+            interval = timedelta(hours=ADAPTIVE_MIN_INTERVAL_HOURS)
+        return now + min(interval, timedelta(hours=ADAPTIVE_MAX_INTERVAL_HOURS))
+
     def _should_check_now(self, bookmark) -> bool:
         """
         根据UP主活跃度判断是否应该现在检查
@@ -173,6 +813,10 @@ class UpdateChecker:
         if not bookmark.last_check_time:
             return True
         
+        # 已有自适应轮询算出的下次检查时间
+        if bookmark.next_check_at:
+            return datetime.now() >= bookmark.next_check_at
+        
         # 计算距上次检查的时间
         time_since_check = datetime.now() - bookmark.last_check_time
         hours_since_check = time_since_check.total_seconds() / 3600
@@ -183,29 +827,6 @@ class UpdateChecker:
         
         return hours_since_check >= check_interval_hours
     
-    def _get_new_videos(self, bookmark, videos, update_range_days):
-        """
-        增量检查：获取新视频（相比上次检查）
-        """
-        cutoff_time = datetime.now() - timedelta(days=update_range_days)
-        new_videos = []
-        last_video_id = bookmark.last_video_id
-        
-        for video in videos:
-            video_id = video.get('video_id', '')
-            upload_time = video.get('upload_time')
-            
-            # 如果遇到上次检查的最后一个视频，停止
-            if last_video_id and video_id == last_video_id:
-                self.logger.debug(f"到达上次检查位置: {video_id}")
-                break
-            
-            # 检查是否在时间范围内
-            if upload_time and upload_time > cutoff_time:
-                new_videos.append(video)
-        
-        return new_videos
-    
     def _update_bookmark_stats(self, bookmark, success: bool, new_videos_count: int):
         """
         更新书签统计信息并智能调整检查频率
@@ -219,7 +840,7 @@ class UpdateChecker:
                     # 发现新视频，降低更新频率（更频繁检查）
                     bookmark.consecutive_no_update = 0
                     bookmark.update_frequency = max(1, bookmark.update_frequency - 1)
-                    self.logger.debug(f"📈 {bookmark.name} 活跃，调整频率为 {bookmark.update_frequency} 天")
+                    self.logger.debug("📈 %s 活跃，调整频率为 %s 天", bookmark.name, bookmark.update_frequency)
                 else:
                     # 没有新视频，增加连续无更新次数
                     bookmark.consecutive_no_update += 1
@@ -227,7 +848,7 @@ class UpdateChecker:
                     # 连续多次无更新，降低检查频率
                     if bookmark.consecutive_no_update >= 3:
                         bookmark.update_frequency = min(30, bookmark.update_frequency + 2)
-                        self.logger.debug(f"📉 {bookmark.name} 不活跃，调整频率为 {bookmark.update_frequency} 天")
+                        self.logger.debug("📉 %s 不活跃，调整频率为 %s 天", bookmark.name, bookmark.update_frequency)
             
             self.session.commit()
             
@@ -243,17 +864,17 @@ class UpdateChecker:
             cutoff = datetime.now() - timedelta(days=days)
             
             # 添加调试日志
-            self.logger.debug(f"检查时间范围:")
-            self.logger.debug(f"上传时间: {upload_time}")
-            self.logger.debug(f"截止时间: {cutoff}")
-            self.logger.debug(f"范围天数: {days}")
+            self.logger.debug("检查时间范围:")
+            self.logger.debug("上传时间: %s", upload_time)
+            self.logger.debug("截止时间: %s", cutoff)
+            self.logger.debug("范围天数: %s", days)
             
             # 确保时间比较的时区一致
             if upload_time.tzinfo:
                 upload_time = upload_time.replace(tzinfo=None)
             
             is_within = upload_time >= cutoff
-            self.logger.debug(f"是否在范围内: {is_within}")
+            self.logger.debug("是否在范围内: %s", is_within)
             
             return is_within
             
@@ -261,54 +882,72 @@ class UpdateChecker:
             self.logger.error(f"检查时间范围失败: {str(e)}")
             return False
 
-    def _check_single_bookmark_with_scraper(self, scraper, bookmark, update_range_days):
+    def _check_single_bookmark_with_scraper(self, scraper, bookmark, update_range_days,
+                                            fetched=None) -> CheckResult:
+        result = self._check_bookmark_pages(scraper, bookmark, update_range_days, fetched)
+        if result.kind != SKIPPED:
+            self._record_history(result, scraper.fetch_stats)
+        return result
+
+    def _record_history(self, result: CheckResult, fetch_stats: Dict):
+        """追加一条检查记录：有写入线程时随检查结果批量提交，否则直接写入"""
+        row = {
+            'bookmark_id': result.bookmark.id,
+            'run_id': self.run_id,
+            'checked_at': datetime.now(),
+            'status': result.kind,
+            'http_status': fetch_stats['http_status'],
+            'bytes': fetch_stats['bytes'],
+            'latency_ms': round(fetch_stats['latency_ms'], 1),
+            'cache': fetch_stats['cache'],
+            'videos': len(result.videos)
+        }
+        if self._writer is not None:
+            self._writer.put({'history': row})
+            return
+        if self._engine is None:
+            return
         try:
-            start_time = datetime.now()
-            html = scraper.get_page_content(bookmark.url, use_cache=False)
+            with self._engine.begin() as conn:
+                insert_history(conn, [row])
+        except Exception as e:
+            self.logger.error(f"写入检查记录失败: {str(e)}")
+
+    def _check_bookmark_pages(self, scraper, bookmark, update_range_days, fetched=None) -> CheckResult:
+        """抓取并扫描书签页面，保存检查结果；第一页抓取结束（无论成败）时调用 fetched"""
+        start_time = datetime.now()
+        try:
+            try:
+                with tracer.span('fetch'):
+                    html = scraper.get_page_content(bookmark.url, use_cache=False)
+            finally:
+                if fetched is not None:
+                    fetched()
             if not html:
-                return []
-            videos = self.scraper.parse_video_info(html, bookmark.url)
-            if not videos:
-                return []
+                return CheckResult(ERROR, bookmark, error='获取页面失败',
+                                   elapsed=(datetime.now() - start_time).total_seconds())
             cutoff_time = datetime.now() - timedelta(days=update_range_days)
-            latest_video = None
-            for video in videos:
-                upload_time = video.get('upload_time')
-                if upload_time and upload_time > cutoff_time:
-                    if latest_video is None or video['upload_time'] > latest_video['upload_time']:
-                        latest_video = video
-            try:
-                if self._SessionFactory:
-                    local_sess = self._SessionFactory()
-                    try:
-                        from models.database import Bookmark as BM
-                        bm = local_sess.query(BM).filter_by(id=bookmark.id).first()
-                        if bm:
-                            bm.last_check_time = datetime.now()
-                            bm.check_count = (bm.check_count or 0) + 1
-                            if videos:
-                                bm.last_video_id = videos[0].get('video_id', '')
-                            local_sess.commit()
-                    finally:
-                        local_sess.close()
-                else:
-                    bookmark.last_check_time = datetime.now()
-                    bookmark.check_count = (bookmark.check_count or 0) + 1
-                    if videos:
-                        bookmark.last_video_id = videos[0].get('video_id', '')
-                    self.session.commit()
-            except Exception as e:
-                self.logger.error(f"更新书签统计失败(线程会话): {str(e)}")
-            if latest_video:
-                elapsed = (datetime.now() - start_time).total_seconds()
-                self.logger.info(f"✓ {bookmark.name}: 发现新视频 ({elapsed:.1f}秒)")
-                return [{'bookmark': bookmark, 'video': Video(**latest_video)}]
-            else:
-                self.logger.info(f"○ {bookmark.name}: 无新视频")
-                return []
+            # 翻页时后续页面的抓取嵌套在 parse 区间内
+            with tracer.span('parse') as span:
+                first_video, new_videos, upload_times = self._collect_new_videos(
+                    scraper, bookmark, html, cutoff_time
+                )
+                span.set(new_videos=len(new_videos))
+            next_check_at = self._next_check_at(upload_times, bookmark)
+            # 页面没有视频也算完成（记录检查点，下次续跑不再抓取）
+            with tracer.span('save', 'db', writer=self._writer is not None):
+                self._save_check_result(bookmark, first_video, new_videos, next_check_at)
+            updates = self._report_new_videos(bookmark, new_videos, start_time)
+            return CheckResult(UPDATE if updates else NO_CHANGE, bookmark,
+                               videos=[u['video'] for u in updates],
+                               elapsed=(datetime.now() - start_time).total_seconds())
+        except CheckCancelled:
+            self.logger.debug("检查已取消: %s", bookmark.name)
+            return CheckResult(SKIPPED, bookmark, error='检查已停止')
         except Exception as e:
             self.logger.error(f"检查书签更新失败: {str(e)}")
-            return []
+            return CheckResult(ERROR, bookmark, error=str(e),
+                               elapsed=(datetime.now() - start_time).total_seconds())
 
     def mark_as_watched(self, video_id: str) -> bool:
         """将视频标记为已看"""
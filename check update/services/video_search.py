@@ -0,0 +1,98 @@
+"""
+视频搜索
+在全部历史视频的标题和创作者名中检索（videos_fts，见 models/migrations.py 的迁移 5）。
+trigram 索引只能加速三个字符及以上的词；更短的词（如两个汉字）在索引表上逐行 LIKE，
+没有全文索引的数据库整体退回 videos/bookmarks 上的 LIKE
+"""
+
+import logging
+from typing import Dict, List
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# trigram 分词的最短可检索长度
+_MIN_MATCH_LENGTH = 3
+
+_COLUMNS = '''
+    videos.id, videos.video_id, videos.title, videos.thumbnail_url, videos.upload_time,
+    videos.relative_time, videos.is_watched, bookmarks.id, bookmarks.name, bookmarks.url, bookmarks.avatar_url
+'''
+
+def has_search_index(connection) -> bool:
+    return connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'videos_fts'"
+    )).first() is not None
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+def search_videos(connection, query: str, limit: int = 50) -> List[Dict]:
+    """
+    搜索视频：空格分隔的多个词需同时命中（标题或创作者名，不区分大小写），任意子串均可命中
+
+    Args:
+        connection: 数据库连接或会话
+        query: 搜索词
+        limit: 最多返回条数
+
+    Returns:
+        [{'bookmark': {...}, 'video': {...}}, ...]，最近入库的在前
+    """
+    terms = query.split()
+    if not terms:
+        return []
+
+    params = {'limit': limit}
+    indexed = has_search_index(connection)
+    if indexed:
+        source = 'videos_fts JOIN videos ON videos.id = videos_fts.rowid'
+        title, creator = 'videos_fts.title', 'videos_fts.creator'
+    else:
+        source, title, creator = 'videos', 'videos.title', 'bookmarks.name'
+    match_terms = []
+    conditions = []
+    for i, term in enumerate(terms):
+        if indexed and len(term) >= _MIN_MATCH_LENGTH:
+            # 每个词作为短语加引号，避免 AND/OR/NEAR 和标点被当成查询语法
+            match_terms.append('"' + term.replace('"', '""') + '"')
+        else:
+            params[f'term{i}'] = _like_pattern(term)
+            conditions.append(f"({title} LIKE :term{i} ESCAPE '\\' OR {creator} LIKE :term{i} ESCAPE '\\')")
+    if match_terms:
+        params['match'] = ' '.join(match_terms)
+        conditions.insert(0, 'videos_fts MATCH :match')
+    # 按入库顺序从新到旧：索引表按 rowid 倒序遍历，凑够 limit 条即停，常见词也不必给全部命中排序
+    order = 'videos_fts.rowid DESC' if indexed else 'videos.id DESC'
+
+    rows = connection.execute(text(f'''
+        SELECT {_COLUMNS}
+        FROM {source} LEFT JOIN bookmarks ON bookmarks.id = videos.bookmark_id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY {order}
+        LIMIT :limit
+    '''), params).fetchall()
+
+    result = []
+    for (id_, video_id, title_, thumbnail_url, upload_time, relative_time, is_watched,
+         bookmark_id, name, url, avatar_url) in rows:
+        result.append({
+            'bookmark': {
+                'id': bookmark_id,
+                'name': name or '',
+                'url': url or '',
+                'avatar_url': avatar_url or ''
+            },
+            'video': {
+                'id': id_,
+                'video_id': video_id,
+                'title': title_ or '',
+                'thumbnail_url': thumbnail_url or '',
+                'upload_time': str(upload_time) if upload_time else None,
+                'relative_time': relative_time or '',
+                'is_watched': bool(is_watched)
+            }
+        })
+    return result
@@ -1,8 +1,9 @@
 import requests
 from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+from datetime import datetime
 import re
-from typing import Dict, List, Optional
+from html import unescape
+from typing import Dict, Iterator, List, Optional
 import logging
 from urllib.parse import urljoin, urlparse
 import time
@@ -10,7 +11,6 @@ import random
 from collections import defaultdict
 import urllib3
 import uuid
-import hashlib
 
 # 禁用SSL警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -18,7 +18,13 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 # 导入请求管理器和缓存
 from services.request_manager import request_manager
 from utils.page_cache import page_cache
-from config.settings import PAGE_CACHE_TTL
+from utils.http_archive import http_archive
+from utils.selector_memo import selector_memo
+from utils.relative_time import relative_time_parser
+from services.lxml_parser import get_hsex_layout_parser
+from utils.cancellation import CheckCancelled, sleep as cancellable_sleep
+from utils.tracing import tracer
+from config.settings import PARSER_BACKEND, FAST_PARSER_DOMAINS
 
 # 导入配置
 try:
@@ -32,9 +38,77 @@ except ImportError:
         PROXY_POOL = [None]
         USER_AGENTS = ['Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36']
 
+# 时间文本中的观看次数
+VIEW_COUNT_PATTERN = re.compile(r'\d+.*?(次观看|views|播放|view|Views|次播放)', re.IGNORECASE)
+VIEW_PREFIX_PATTERN = re.compile(r'(\d+(?:\.\d+)?[kK]?次观看\s+)(.+)')
+
+# 分页栏 <ul class="pagination1"> 里的"下一页"链接
+PAGINATION_PATTERN = re.compile(r'<ul[^>]*class=["\']?pagination1\b[^>]*>(.*?)</ul>', re.IGNORECASE | re.DOTALL)
+PAGE_LINK_PATTERN = re.compile(r'<a\s([^>]*)>(.*?)</a>', re.IGNORECASE | re.DOTALL)
+HREF_PATTERN = re.compile(r'href\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+NEXT_PAGE_TEXTS = {'下一页', '下页', '»', '>', 'next', 'next »'}
+
 class WebScraper:
-    def __init__(self):
+    # 视频容器选择器（按优先级，基于实际页面结构）
+    CONTAINER_SELECTORS = [
+        '.col-xs-6.col-md-3',  # hsex.men主选择器
+        '.thumbnail',          # hsex.men内部容器
+        '.video-item',
+        '.item',
+        '.card',
+        '.video-card',
+        '.content-item',
+        'div[class*="video"]',
+        'div[class*="item"]',
+        '.gallery-item',
+        '.thumb-item'
+    ]
+    
+    # 基于hsex.men网站结构的标题选择器
+    TITLE_SELECTORS = [
+        '.title h5 a',           # hsex.men主标题选择器
+        '.title a',              # hsex.men备用标题选择器
+        '.video-title',
+        '.title',
+        'h3',
+        'a[title]',
+        '.item-title',
+        '.video-name',
+        '.name',
+        '.description',
+        'p',
+        'a'
+    ]
+    
+    TIME_SELECTORS = [
+        '.info p',               # hsex.men上传时间选择器
+        '.upload-time',
+        '.time',
+        'time',
+        '.date'
+    ]
+    
+    # img[src] 取src属性，其余取background-image样式
+    THUMBNAIL_SELECTORS = ['img[src]', '.image']
+
+    def __init__(self, parser_backend: str = None):
+        """
+        Args:
+            parser_backend: 解析后端 'auto'（已知站点走lxml快速路径）/'lxml'/'bs4'，默认取配置
+        """
         self.session = requests.Session()
+        # 录制/回放模式下挂上对应的适配器（见 utils/http_archive.py）
+        http_archive.mount(self.session)
+        self.parser_backend = parser_backend or PARSER_BACKEND
+        
+        # 相对时间的基准时间，一次检查内固定；为None时每次取当前时间
+        self.run_timestamp = None
+        
+        # 取消令牌：设置后所有等待都可被立即打断（抛出 CheckCancelled）
+        self.cancel_token = None
+        
+        # 本实例累计的请求统计；检查线程每个书签新建一个实例，即该书签本次检查的统计
+        self.fetch_stats = {'requests': 0, 'bytes': 0, 'latency_ms': 0.0, 'http_status': None, 'cache': None}
         
         # 使用配置文件中的参数
         self.session.headers.update(AntiBanConfig.HEADERS)
@@ -44,7 +118,6 @@ class WebScraper:
         self.current_proxy_index = 0
         
         self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(logging.DEBUG)
         
         self.domain_stats = defaultdict(lambda: {'last_request': 0, 'current_interval': 1, 'consecutive_failures': 0})
         self.max_interval = AntiBanConfig.MAX_INTERVAL
@@ -137,6 +210,31 @@ class WebScraper:
     def _get_domain(self, url: str) -> str:
         return urlparse(url).netloc
 
+    def _note_response(self, response, started_ns: int):
+        """累计请求统计：次数、字节、往返耗时，以及最后一次的状态码和缓存结果"""
+        fetch_stats = self.fetch_stats
+        fetch_stats['requests'] += 1
+        fetch_stats['bytes'] += len(response.content)
+        fetch_stats['latency_ms'] += (time.perf_counter_ns() - started_ns) / 1e6
+        fetch_stats['http_status'] = response.status_code
+        fetch_stats['cache'] = '304' if response.status_code == 304 else ('miss' if response.status_code == 200 else None)
+
+    def next_page_url(self, html: str, url: str) -> Optional[str]:
+        """
+        从页面自己的分页栏（<ul class="pagination1">）读出下一页地址，没有下一页时返回 None
+
+        只认分页栏里文字为"下一页"/»（或 rel="next"）的链接，不按地址格式猜页码
+        """
+        for block in PAGINATION_PATTERN.findall(html):
+            for attrs, text in PAGE_LINK_PATTERN.findall(block):
+                label = unescape(re.sub(r'<[^>]+>', '', text)).strip().lower()
+                if label not in NEXT_PAGE_TEXTS and not re.search(r'rel=["\']?next', attrs, re.IGNORECASE):
+                    continue
+                href = HREF_PATTERN.search(attrs)
+                if href and not href.group(1).startswith(('#', 'javascript:')):
+                    return urljoin(url, unescape(href.group(1)))
+        return None
+
     def _adjust_interval(self, domain: str, success: bool):
         stats = self.domain_stats[domain]
         if success:
@@ -206,7 +304,8 @@ class WebScraper:
         stats = self.domain_stats[domain]
         
         # 3. 使用请求管理器检查是否需要等待
-        request_manager.wait_if_needed(domain)
+        with tracer.span('rate_limit_wait', 'net'):
+            request_manager.wait_if_needed(domain, self.cancel_token)
         
         # Cloudflare检测模式
         cloudflare_detected = False
@@ -215,6 +314,9 @@ class WebScraper:
         force_no_cache = False
         for attempt in range(max_retries):
             try:
+                if self.cancel_token is not None:
+                    self.cancel_token.raise_if_cancelled()
+                
                 # 设置Cookie
                 self._setup_cookies()
                 
@@ -236,12 +338,14 @@ class WebScraper:
                     # 遇到Cloudflare时大幅增加等待时间
                     wait_time = request_manager.get_retry_delay(domain, attempt) * 2
                     self.logger.warning(f"Cloudflare检测到，等待{wait_time:.1f}秒...")
-                    time.sleep(wait_time)
+                    with tracer.span('retry_wait', 'net', reason='cloudflare'):
+                        cancellable_sleep(wait_time, self.cancel_token)
                 elif attempt > 0:
                     # 使用请求管理器的智能重试延迟
                     retry_delay = request_manager.get_retry_delay(domain, attempt)
-                    self.logger.info(f"重试 {attempt+1}/{max_retries}，等待 {retry_delay:.1f} 秒")
-                    time.sleep(retry_delay)
+                    self.logger.info("重试 %s/%s，等待 %.1f 秒", attempt+1, max_retries, retry_delay)
+                    with tracer.span('retry_wait', 'net', reason='retry'):
+                        cancellable_sleep(retry_delay, self.cancel_token)
                 
                 # 选择代理 - 优先使用直连
                 current_proxy = None if attempt == 0 else self.proxies[self.current_proxy_index % len(self.proxies)]
@@ -251,7 +355,9 @@ class WebScraper:
                         headers['If-None-Match'] = meta['etag']
                     if 'last_modified' in meta:
                         headers['If-Modified-Since'] = meta['last_modified']
-                request_manager.enter_request(domain)
+                with tracer.span('rate_limit_wait', 'net', slot=True):
+                    request_manager.enter_request(domain, self.cancel_token)
+                request_start = tracer.now()
                 response = self.session.get(
                     url,
                     headers=headers,
@@ -260,7 +366,16 @@ class WebScraper:
                     allow_redirects=True,
                     verify=False
                 )
+                if tracer.enabled:
+                    # elapsed 是发出请求到收完响应头（含建连），其余为下载正文
+                    request_end = tracer.now()
+                    headers_at = min(request_start + int(response.elapsed.total_seconds() * 1e9), request_end)
+                    tracer.add_span('http.connect_wait', request_start, headers_at, 'net',
+                                    {'url': url, 'status': response.status_code, 'attempt': attempt + 1})
+                    tracer.add_span('http.download', headers_at, request_end, 'net',
+                                    {'bytes': len(response.content)})
                 stats['last_request'] = time.time()
+                self._note_response(response, request_start)
                 if use_cache and response.status_code == 304 and cached_html:
                     request_manager.record_request(domain, True)
                     if use_cache:
@@ -268,7 +383,7 @@ class WebScraper:
                             'etag': response.headers.get('ETag', meta.get('etag', '')),
                             'last_modified': response.headers.get('Last-Modified', meta.get('last_modified', ''))
                         })
-                    self.logger.info(f"✓ 缓存未过期: {url[:50]}...")
+                    self.logger.info("✓ 缓存未过期: %.50s...", url)
                     request_manager.exit_request(domain)
                     return cached_html
                 
@@ -308,8 +423,9 @@ class WebScraper:
                     retry_after = min(int(response.headers.get('Retry-After', 10)), 30)
                     self.logger.warning(f"⏱️  遇到429限速，等待{retry_after}秒")
                     self._adjust_interval(domain, False)
-                    time.sleep(retry_after)
                     request_manager.exit_request(domain)
+                    with tracer.span('retry_wait', 'net', reason='429'):
+                        cancellable_sleep(retry_after, self.cancel_token)
                     continue
                 
                 # 处理403状态码（非Cloudflare）
@@ -317,16 +433,16 @@ class WebScraper:
                     self.logger.warning("🔒 访问被禁止，可能触发反爬机制")
                     self._adjust_interval(domain, False)
                     self.current_proxy_index += 1
-                    time.sleep(random.uniform(5, 10))
                     request_manager.exit_request(domain)
+                    cancellable_sleep(random.uniform(5, 10), self.cancel_token)
                     continue
                 
                 # 处理500+状态码
                 if response.status_code >= 500:
                     self.logger.warning(f"🔥 服务器错误 {response.status_code}，重试中...")
                     self._adjust_interval(domain, False)
-                    time.sleep(random.uniform(3, 8))
                     request_manager.exit_request(domain)
+                    cancellable_sleep(random.uniform(3, 8), self.cancel_token)
                     continue
                 
                 # 成功响应
@@ -341,7 +457,7 @@ class WebScraper:
                                 'etag': response.headers.get('ETag', ''),
                                 'last_modified': response.headers.get('Last-Modified', '')
                             })
-                        self.logger.info(f"✓ 成功获取: {url[:50]}...")
+                        self.logger.info("✓ 成功获取: %.50s...", url)
                         request_manager.exit_request(domain)
                         return html
                     if len(html) < min_len:
@@ -361,10 +477,15 @@ class WebScraper:
                             'etag': response.headers.get('ETag', ''),
                             'last_modified': response.headers.get('Last-Modified', '')
                         })
-                    self.logger.info(f"✓ 成功获取: {url[:50]}...")
+                    self.logger.info("✓ 成功获取: %.50s...", url)
                     request_manager.exit_request(domain)
                     return html
                     
+            except CheckCancelled:
+                # 取消只会发生在等待中，此时没有占用并发名额
+                self.logger.debug("已取消: %s", url)
+                raise
+                
             except requests.exceptions.ProxyError as e:
                 self.logger.warning(f"🌐 代理连接失败 (尝试 {attempt+1}/{max_retries}): {str(e)}")
                 self._adjust_interval(domain, False)
@@ -425,36 +546,42 @@ class WebScraper:
         return None
 
     def parse_video_info(self, html: str, base_url: str) -> List[Dict]:
+        return list(self.parse_video_info_iter(html, base_url))
+
+    def parse_video_info_iter(self, html: str, base_url: str) -> Iterator[Dict]:
+        """
+        按页面顺序逐个产出视频信息
+        
+        调用方可以在遇到超出时间范围或已见过的视频时停止迭代，
+        剩余容器的字段提取和时间解析不会执行
+        """
         try:
             self.logger.info("开始解析视频信息")
-            soup = BeautifulSoup(html, 'lxml')
-            videos = []
+            domain = self._get_domain(base_url)
             
-            # 查找所有视频容器 - 使用多种通用选择器
-            video_containers = []
+            # 已知布局优先走lxml快速路径，找不到时回退到BeautifulSoup
+            if self._use_fast_parser(domain):
+                items = self._extract_with_lxml(html)
+                selector_memo.record_fast_path(bool(items))
+                if items:
+                    count = 0
+                    for href, title, thumbnail, time_text in items:
+                        video_info = self._build_video_info(
+                            self._video_id_from_href(href),
+                            title,
+                            self._normalize_url(thumbnail, base_url),
+                            self._clean_time_text(time_text)
+                        )
+                        if video_info:
+                            count += 1
+                            yield video_info
+                    self.logger.info("成功解析 %s 个视频信息 (lxml)", count)
+                    return
             
-            # 优先选择器列表 - 基于实际页面结构
-            selectors = [
-                '.col-xs-6.col-md-3',  # hsex.men主选择器
-                '.thumbnail',          # hsex.men内部容器
-                '.video-item',
-                '.item',
-                '.card',
-                '.video-card',
-                '.content-item',
-                'div[class*="video"]',
-                'div[class*="item"]',
-                '.gallery-item',
-                '.thumb-item'
-            ]
+            soup = BeautifulSoup(html, 'lxml')
             
-            # 尝试每个选择器
-            for selector in selectors:
-                containers = soup.select(selector)
-                if containers:
-                    video_containers = containers
-                    self.logger.debug(f"使用选择器 '{selector}' 找到 {len(containers)} 个视频容器")
-                    break
+            # 查找所有视频容器（优先使用该域名上次成功的选择器）
+            video_containers = self._find_containers(soup, domain)
             
             # 如果没有找到，尝试通过视频链接查找容器
             if not video_containers:
@@ -465,51 +592,103 @@ class WebScraper:
                     if parent and parent not in containers:
                         containers.append(parent)
                 video_containers = containers
-                self.logger.debug(f"通过链接找到 {len(video_containers)} 个视频容器")
+                self.logger.debug("通过链接找到 %s 个视频容器", len(video_containers))
             
-            self.logger.debug(f"总共找到 {len(video_containers)} 个视频容器")
+            self.logger.debug("总共找到 %s 个视频容器", len(video_containers))
             
-            for container in video_containers:
-                try:
-                    # 使用通用方法提取信息
-                    video_id = self._extract_video_id(container)
-                    title = self._extract_title(container)
-                    thumbnail_url = self._extract_thumbnail(container, base_url)
-                    time_text = self._extract_time(container)
-                    
-                    # 清理时间文本，移除观看次数等信息
-                    if time_text:
-                        time_text = re.sub(r'\d+.*?(次观看|views|播放|view|Views|次播放)', '', time_text, flags=re.IGNORECASE).strip()
-                        if not time_text:
-                            time_text = '最近更新'
-                    else:
-                        time_text = '最近更新'
-                    
-                    video_info = {
-                        'video_id': video_id,
-                        'title': title,
-                        'thumbnail_url': thumbnail_url,
-                        'relative_time': time_text,
-                        'upload_time': self._parse_relative_time(time_text)
-                    }
-                    
-                    self.logger.debug(f"解析到视频信息: {video_info}")
+            count = 0
+            try:
+                for container in video_containers:
+                    try:
+                        # 使用通用方法提取信息
+                        video_info = self._build_video_info(
+                            self._extract_video_id(container),
+                            self._extract_title(container, domain),
+                            self._extract_thumbnail(container, base_url, domain),
+                            self._extract_time(container, domain)
+                        )
+                    except Exception as e:
+                        self.logger.error(f"解析单个视频项时出错: {str(e)}")
+                        continue
                     
                     # 只要有标题就认为是有效的（适配hsex.men可能不需要video_id）
-                    if title:
-                        videos.append(video_info)
-                        
-                except Exception as e:
-                    self.logger.error(f"解析单个视频项时出错: {str(e)}")
-                    continue
+                    if video_info:
+                        count += 1
+                        yield video_info
+            finally:
+                # 调用方提前停止时也保存已学到的选择器
+                selector_memo.save()
             
-            self.logger.info(f"成功解析 {len(videos)} 个视频信息")
-            return videos
+            self.logger.info("成功解析 %s 个视频信息", count)
             
         except Exception as e:
             self.logger.error(f"解析视频信息失败: {str(e)}", exc_info=True)
+            return
+
+    def _use_fast_parser(self, domain: str) -> bool:
+        if self.parser_backend == 'lxml':
+            return True
+        if self.parser_backend == 'auto':
+            return any(domain == d or domain.endswith('.' + d) for d in FAST_PARSER_DOMAINS)
+        return False
+
+    def _extract_with_lxml(self, html: str) -> list:
+        """lxml快速路径：按已知布局提取原始字段，布局不符时返回空列表"""
+        try:
+            return get_hsex_layout_parser().extract(html) or []
+        except Exception as e:
+            self.logger.warning(f"快速解析失败，回退到BeautifulSoup: {str(e)}")
             return []
 
+    def _build_video_info(self, video_id: str, title: str, thumbnail_url: str, time_text: str) -> Optional[Dict]:
+        """两种解析路径共用的字段清洗，无标题时返回None"""
+        # 清理时间文本，移除观看次数等信息
+        if time_text:
+            time_text = VIEW_COUNT_PATTERN.sub('', time_text).strip()
+            if not time_text:
+                time_text = '最近更新'
+        else:
+            time_text = '最近更新'
+        
+        video_info = {
+            'video_id': video_id,
+            'title': title,
+            'thumbnail_url': thumbnail_url,
+            'relative_time': time_text,
+            'upload_time': self._parse_relative_time(time_text)
+        }
+        
+        self.logger.debug("解析到视频信息: %s", video_info)
+        
+        return video_info if title else None
+
+    def _find_containers(self, soup, domain: str) -> list:
+        """查找视频容器，先试记忆的选择器，失效时再按优先级重新探测"""
+        remembered = selector_memo.get(domain, 'container')
+        if remembered:
+            containers = soup.select(remembered)
+            if containers:
+                selector_memo.record_hit('container')
+                self.logger.debug("记忆选择器 '%s' 找到 %s 个视频容器", remembered, len(containers))
+                return containers
+        
+        for selector in self.CONTAINER_SELECTORS:
+            if selector == remembered:
+                continue
+            containers = soup.select(selector)
+            if containers:
+                selector_memo.remember(domain, 'container', selector)
+                self.logger.debug("使用选择器 '%s' 找到 %s 个视频容器", selector, len(containers))
+                return containers
+        return []
+
+    @staticmethod
+    def _ordered_selectors(selectors: List[str], remembered: Optional[str]) -> List[str]:
+        """把记忆的选择器排到最前面"""
+        if remembered and remembered in selectors:
+            return [remembered] + [s for s in selectors if s != remembered]
+        return selectors
+
     def _extract_video_id(self, item) -> str:
         try:
             # 从视频链接中提取ID
@@ -521,76 +700,60 @@ class WebScraper:
                     break
             
             if video_link and 'href' in video_link.attrs:
-                href = video_link['href']
-                self.logger.debug(f"找到视频链接: {href}")
-                
-                # 尝试多种ID提取模式，适配hsex.men和通用格式
-                patterns = [
-                    r'video-(\d+)\.htm',           # hsex.men格式: video-12345.htm
-                    r'video/(\d+)',                # /video/12345
-                    r'watch\?(?:.*&)?v=(\w+)',     # watch?v=abc123
-                    r'play/(\d+)',                  # /play/12345
-                    r'movie/(\d+)',                 # /movie/12345
-                    r'id=(\d+)',                    # ?id=12345
-                    r'/(\d+)(?:/|$)',               # 纯数字ID
-                    r'[?&]v=([^&]+)',                # URL参数中的v值
-                    r'embed/(\w+)',                  # embed/abc123
-                    r'v/(\w+)',                      # /v/abc123
-                    r'view/(\d+)'                    # /view/12345
-                ]
-                
-                for pattern in patterns:
-                    match = re.search(pattern, href)
-                    if match:
-                        video_id = match.group(1)
-                        self.logger.debug(f"提取到视频ID: {video_id}")
-                        return video_id
-                        
-                # 如果URL是数字结尾，尝试提取
-                numeric_match = re.search(r'(\d+)(?:\.\w+)?$', href)
-                if numeric_match:
-                    video_id = numeric_match.group(1)
-                    self.logger.debug(f"提取到数字ID: {video_id}")
-                    return video_id
+                return self._video_id_from_href(video_link['href'])
                     
             return ''
         except Exception as e:
             self.logger.error(f"提取视频ID失败: {str(e)}")
             return ''
 
-    def _extract_title(self, item) -> str:
+    def _video_id_from_href(self, href: str) -> str:
+        self.logger.debug("找到视频链接: %s", href)
+        
+        # 尝试多种ID提取模式，适配hsex.men和通用格式
+        patterns = [
+            r'video-(\d+)\.htm',           # hsex.men格式: video-12345.htm
+            r'video/(\d+)',                # /video/12345
+            r'watch\?(?:.*&)?v=(\w+)',     # watch?v=abc123
+            r'play/(\d+)',                  # /play/12345
+            r'movie/(\d+)',                 # /movie/12345
+            r'id=(\d+)',                    # ?id=12345
+            r'/(\d+)(?:/|$)',               # 纯数字ID
+            r'[?&]v=([^&]+)',                # URL参数中的v值
+            r'embed/(\w+)',                  # embed/abc123
+            r'v/(\w+)',                      # /v/abc123
+            r'view/(\d+)'                    # /view/12345
+        ]
+        
+        for pattern in patterns:
+            match = re.search(pattern, href)
+            if match:
+                video_id = match.group(1)
+                self.logger.debug("提取到视频ID: %s", video_id)
+                return video_id
+                
+        # 如果URL是数字结尾，尝试提取
+        numeric_match = re.search(r'(\d+)(?:\.\w+)?$', href)
+        if numeric_match:
+            video_id = numeric_match.group(1)
+            self.logger.debug("提取到数字ID: %s", video_id)
+            return video_id
+        return ''
+
+    def _extract_title(self, item, domain: str = None) -> str:
         try:
-            # 基于hsex.men网站结构的标题选择器
-            selectors = [
-                '.title h5 a',           # hsex.men主标题选择器
-                '.title a',              # hsex.men备用标题选择器
-                '.video-title',
-                '.title',
-                'h3',
-                'a[title]',
-                '.item-title',
-                '.video-name',
-                '.name',
-                '.description',
-                'p',
-                'a'
-            ]
+            remembered = selector_memo.get(domain, 'title') if domain else None
             
-            for selector in selectors:
+            for selector in self._ordered_selectors(self.TITLE_SELECTORS, remembered):
                 title_elem = item.select_one(selector)
                 if title_elem:
-                    # 尝试不同的属性获取标题
-                    for attr in ['title', 'alt', 'data-title']:
-                        if attr in title_elem.attrs:
-                            title = title_elem[attr].strip()
-                            if title:
-                                self.logger.debug(f"从属性 {attr} 找到标题: {title}")
-                                return title
-                    
-                    # 获取文本内容
-                    title = title_elem.text.strip()
+                    title = self._title_from_element(title_elem)
                     if title:
-                        self.logger.debug(f"从文本找到标题: {title}")
+                        if domain:
+                            if selector == remembered:
+                                selector_memo.record_hit('title')
+                            else:
+                                selector_memo.remember(domain, 'title', selector)
                         return title
             
             return ''
@@ -598,174 +761,98 @@ class WebScraper:
             self.logger.error(f"提取标题失败: {str(e)}")
             return ''
 
-    def _extract_thumbnail(self, item, base_url: str) -> str:
+    def _title_from_element(self, title_elem) -> str:
+        # 尝试不同的属性获取标题
+        for attr in ['title', 'alt', 'data-title']:
+            if attr in title_elem.attrs:
+                title = title_elem[attr].strip()
+                if title:
+                    self.logger.debug("从属性 %s 找到标题: %s", attr, title)
+                    return title
+        
+        # 获取文本内容
+        title = title_elem.text.strip()
+        if title:
+            self.logger.debug("从文本找到标题: %s", title)
+        return title
+
+    def _extract_thumbnail(self, item, base_url: str, domain: str = None) -> str:
         try:
-            # 尝试从img标签提取
-            img = item.select_one('img[src]')
-            if img and 'src' in img.attrs:
-                src = img['src']
-                if src.startswith('//'):
-                    return f'https:{src}'
-                elif src.startswith('/'):
-                    return urljoin(base_url, src)
-                return src
+            remembered = selector_memo.get(domain, 'thumbnail') if domain else None
             
-            # 尝试从background-image样式提取
-            image_div = item.select_one('.image')
-            if image_div:
-                style = image_div.get('style', '')
-                match = re.search(r'background-image:\s*url\(["\']?([^"\']+)["\']?\)', style)
-                if match:
-                    url = match.group(1)
-                    if url.startswith('//'):
-                        return f'https:{url}'
-                    elif url.startswith('/'):
-                        return urljoin(base_url, url)
-                    return url
+            for selector in self._ordered_selectors(self.THUMBNAIL_SELECTORS, remembered):
+                url = self._thumbnail_from(item, selector)
+                if url is None:
+                    continue
+                if domain:
+                    if selector == remembered:
+                        selector_memo.record_hit('thumbnail')
+                    else:
+                        selector_memo.remember(domain, 'thumbnail', selector)
+                return self._normalize_url(url, base_url)
             
             return ''
         except Exception as e:
             self.logger.error(f"Error extracting thumbnail: {str(e)}")
             return ''
 
-    def _extract_time(self, item) -> str:
+    @staticmethod
+    def _normalize_url(url: str, base_url: str) -> str:
+        if url.startswith('//'):
+            return f'https:{url}'
+        elif url.startswith('/'):
+            return urljoin(base_url, url)
+        return url
+
+    def _thumbnail_from(self, item, selector: str) -> Optional[str]:
+        """按选择器取缩略图地址，取不到返回None"""
+        if selector == 'img[src]':
+            # 从img标签提取
+            img = item.select_one('img[src]')
+            if img and 'src' in img.attrs:
+                return img['src']
+            return None
+        
+        # 从background-image样式提取
+        image_div = item.select_one(selector)
+        if image_div:
+            style = image_div.get('style', '')
+            match = re.search(r'background-image:\s*url\(["\']?([^"\']+)["\']?\)', style)
+            if match:
+                return match.group(1)
+        return None
+
+    def _extract_time(self, item, domain: str = None) -> str:
         try:
+            remembered = selector_memo.get(domain, 'time') if domain else None
+            
             # 基于hsex.men网站结构的时间选择器
-            time_elem = (
-                item.select_one('.info p') or            # hsex.men上传时间选择器
-                item.select_one('.upload-time') or
-                item.select_one('.time') or
-                item.select_one('time') or
-                item.select_one('.date')
-            )
+            time_elem = None
+            for selector in self._ordered_selectors(self.TIME_SELECTORS, remembered):
+                time_elem = item.select_one(selector)
+                if time_elem:
+                    if domain:
+                        if selector == remembered:
+                            selector_memo.record_hit('time')
+                        else:
+                            selector_memo.remember(domain, 'time', selector)
+                    break
             
             if time_elem:
-                text = time_elem.text.strip()
-                # 提取时间信息（如"1月前"、"2月前"）
-                import re
-                time_match = re.search(r'(\d+(?:\.\d+)?[kK]?次观看\s+)(.+)', text)
-                if time_match:
-                    return time_match.group(2).strip()
-                return text
+                return self._clean_time_text(time_elem.text.strip())
             return ''
         except Exception as e:
             self.logger.error(f"Error extracting time: {str(e)}")
             return ''
 
-    def _parse_relative_time(self, time_str: str) -> datetime:
-        """将时间字符串转换为datetime对象"""
-        try:
-            if not time_str or time_str == '最近更新':
-                return datetime.now()
+    @staticmethod
+    def _clean_time_text(text: str) -> str:
+        # 提取时间信息（如"1月前"、"2月前"）
+        time_match = VIEW_PREFIX_PATTERN.search(text)
+        if time_match:
+            return time_match.group(2).strip()
+        return text
 
-            self.logger.debug(f"解析时间字符串: {time_str}")
-            
-            # 清理字符串，移除多余的空白字符和特殊字符
-            time_str = ' '.join(time_str.split())
-            time_str = re.sub(r'[^\w\s\-:]+', '', time_str).strip()
-            
-            # 首先尝试解析完整日期格式
-            date_patterns = [
-                r'(\d{4})-(\d{1,2})-(\d{1,2})',  # YYYY-MM-DD
-                r'(\d{1,2})-(\d{1,2})-(\d{4})',  # DD-MM-YYYY
-                r'(\d{1,2})/(\d{1,2})/(\d{4})',   # MM/DD/YYYY
-                r'(\d{4})/(\d{1,2})/(\d{1,2})'    # YYYY/MM/DD
-            ]
-            
-            for pattern in date_patterns:
-                match = re.search(pattern, time_str)
-                if match:
-                    groups = match.groups()
-                    if len(groups) == 3:
-                        # 根据格式确定年月日
-                        if pattern.startswith(r'(\d{4})'):
-                            year, month, day = int(groups[0]), int(groups[1]), int(groups[2])
-                        elif pattern.startswith(r'(\d{1,2})-(\d{1,2})-(\d{4})'):
-                            day, month, year = int(groups[0]), int(groups[1]), int(groups[2])
-                        else:
-                            month, day, year = int(groups[0]), int(groups[1]), int(groups[2])
-                        
-                        try:
-                            return datetime(year, month, day)
-                        except ValueError:
-                            continue
-
-            # 解析相对时间 - 英文格式
-            now = datetime.now()
-            
-            # 英文时间格式
-            patterns = [
-                (r'(\d+)\s*day[s]?\s*ago', 'days'),
-                (r'(\d+)\s*hour[s]?\s*ago', 'hours'),
-                (r'(\d+)\s*minute[s]?\s*ago', 'minutes'),
-                (r'(\d+)\s*week[s]?\s*ago', 'weeks'),
-                (r'(\d+)\s*month[s]?\s*ago', 'months'),
-                (r'(\d+)\s*year[s]?\s*ago', 'years'),
-                # 中文格式
-                (r'(\d+)\s*天前', 'days'),
-                (r'(\d+)\s*小时前', 'hours'),
-                (r'(\d+)\s*分钟前', 'minutes'),
-                (r'(\d+)\s*周前', 'weeks'),
-                (r'(\d+)\s*月前', 'months'),
-                (r'(\d+)\s*年前', 'years')
-            ]
-            
-            for pattern, unit in patterns:
-                match = re.search(pattern, time_str, re.IGNORECASE)
-                if match:
-                    value = int(match.group(1))
-                    if unit == 'days':
-                        return now - timedelta(days=value)
-                    elif unit == 'hours':
-                        return now - timedelta(hours=value)
-                    elif unit == 'minutes':
-                        return now - timedelta(minutes=value)
-                    elif unit == 'weeks':
-                        return now - timedelta(weeks=value)
-                    elif unit == 'months':
-                        return now - timedelta(days=30*value)
-                    elif unit == 'years':
-                        return now - timedelta(days=365*value)
-            
-            # 尝试解析英文月份格式
-            month_patterns = [
-                r'(\w+)\s+(\d{1,2}),?\s+(\d{4})',  # Month DD, YYYY
-                r'(\d{1,2})\s+(\w+)\s+(\d{4})',  # DD Month YYYY
-            ]
-            
-            month_map = {
-                'jan': 1, 'january': 1, 'feb': 2, 'february': 2, 'mar': 3, 'march': 3,
-                'apr': 4, 'april': 4, 'may': 5, 'jun': 6, 'june': 6,
-                'jul': 7, 'july': 7, 'aug': 8, 'august': 8,
-                'sep': 9, 'september': 9, 'oct': 10, 'october': 10,
-                'nov': 11, 'november': 11, 'dec': 12, 'december': 12
-            }
-            
-            for pattern in month_patterns:
-                match = re.search(pattern, time_str, re.IGNORECASE)
-                if match:
-                    groups = match.groups()
-                    if len(groups) == 3:
-                        # 解析月份
-                        month_str = groups[0].lower() if groups[0].isalpha() else groups[1].lower()
-                        month = month_map.get(month_str, 1)
-                        
-                        # 解析日和年
-                        if groups[0].isdigit():
-                            day = int(groups[0])
-                            year = int(groups[2])
-                        else:
-                            day = int(groups[1])
-                            year = int(groups[2])
-                        
-                        try:
-                            return datetime(year, month, day)
-                        except ValueError:
-                            continue
-            
-            self.logger.warning(f"无法解析的时间格式: {time_str}")
-            return datetime.now()
-            
-        except Exception as e:
-            self.logger.error(f"解析时间失败: {str(e)}")
-            return datetime.now()
+    def _parse_relative_time(self, time_str: str) -> datetime:
+        """将时间字符串转换为datetime对象（相对时间以本次检查的基准时间计算）"""
+        return relative_time_parser.parse(time_str, self.run_timestamp)
@@ -0,0 +1,155 @@
+"""
+分片检查的工作队列
+一次检查的书签写入 work_queue 表，任意数量的检查进程（同一台或共享数据库的多台机器）
+按租约领取、完成；租约过期的书签会被其他进程重新领取，进程崩溃不会丢任务
+"""
+
+import os
+import time
+import socket
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models.database import WorkItem
+from config.settings import WORK_LEASE_SECONDS, WORK_MAX_ATTEMPTS
+
+def make_owner_id() -> str:
+    """当前进程的标识：主机名:进程号"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def complete_work_items(connection, rows: List[Dict]):
+    """
+    在给定连接（事务）内完成书签，写入线程用它让完成状态与检查结果一起提交
+
+    Args:
+        connection: 数据库连接
+        rows: [{'run_id', 'bookmark_id', 'owner', 'status', 'max_attempts'}, ...]（见 WorkQueue.item）
+    """
+    if not rows:
+        return
+    updated = datetime.now()
+    connection.execute(text(
+        "UPDATE work_queue SET "
+        "status = CASE WHEN :status = 'error' AND attempts < :max_attempts THEN 'pending' ELSE :status END, "
+        "lease_owner = NULL, lease_expires_at = NULL, updated_at = :updated "
+        "WHERE run_id = :run_id AND bookmark_id = :bookmark_id AND lease_owner = :owner"
+    ), [dict(row, updated=updated) for row in rows])
+
+class WorkQueue:
+    """一次检查（run_id）的工作队列"""
+
+    def __init__(self, engine, run_id: int, lease_seconds: float = None, max_attempts: int = None):
+        """
+        Args:
+            engine: 数据库引擎
+            run_id: 检查ID（check_runs.id）
+            lease_seconds: 租约时长
+            max_attempts: 每个书签最多领取次数，超过后不再分配
+        """
+        self.engine = engine
+        self.run_id = run_id
+        self.lease_seconds = lease_seconds or WORK_LEASE_SECONDS
+        self.max_attempts = max_attempts or WORK_MAX_ATTEMPTS
+        self.logger = logging.getLogger(__name__)
+
+    def enqueue(self, bookmark_ids: Iterable[int]) -> int:
+        """加入书签（已在队列中的忽略）"""
+        rows = [{'run_id': self.run_id, 'bookmark_id': bookmark_id, 'status': 'pending',
+                 'attempts': 0, 'updated_at': datetime.now()} for bookmark_id in bookmark_ids]
+        if not rows:
+            return 0
+        stmt = sqlite_insert(WorkItem.__table__).on_conflict_do_nothing(
+            index_elements=['run_id', 'bookmark_id']
+        )
+        with self.engine.begin() as conn:
+            conn.execute(stmt, rows)
+        return len(rows)
+
+    def lease(self, owner: str, limit: int) -> List[int]:
+        """
+        领取最多 limit 个书签：待处理的，或租约已过期的
+
+        单条 UPDATE ... RETURNING 完成选取和占用，多个进程同时领取也不会拿到同一个书签
+        """
+        now = time.time()
+        with self.engine.begin() as conn:
+            rows = conn.execute(text(
+                "UPDATE work_queue SET status = 'leased', lease_owner = :owner, "
+                "lease_expires_at = :expires, attempts = attempts + 1, updated_at = :updated "
+                "WHERE rowid IN ("
+                "  SELECT rowid FROM work_queue WHERE run_id = :run_id AND attempts < :max_attempts "
+                "  AND (status = 'pending' OR (status = 'leased' AND lease_expires_at < :now)) "
+                "  ORDER BY attempts, bookmark_id LIMIT :limit"
+                ") RETURNING bookmark_id"
+            ), {
+                'owner': owner, 'expires': now + self.lease_seconds, 'updated': datetime.now(),
+                'run_id': self.run_id, 'max_attempts': self.max_attempts, 'now': now, 'limit': limit
+            }).fetchall()
+        return [row[0] for row in rows]
+
+    def complete(self, owner: str, bookmark_id: int, status: str = 'done'):
+        """
+        完成书签（status 为 done 或 error）；error 的书签在未超过尝试次数时放回队列
+
+        只有租约持有者能完成，租约被别的进程接手后旧持有者的结果不再改状态
+        """
+        with self.engine.begin() as conn:
+            complete_work_items(conn, [self.item(owner, bookmark_id, status)])
+
+    def item(self, owner: str, bookmark_id: int, status: str = 'done') -> Dict:
+        """complete_work_items 的一行（交给写入线程，与检查结果同一事务完成）"""
+        return {'run_id': self.run_id, 'bookmark_id': bookmark_id, 'owner': owner,
+                'status': status, 'max_attempts': self.max_attempts}
+
+    def extend(self, owner: str, bookmark_ids: Iterable[int]) -> int:
+        """
+        续租：把仍由 owner 持有的书签的租约延长到 lease_seconds 之后
+
+        检查进程在书签处理期间定时调用，慢书签（多页、重试）不会因租约过期被别的进程重复检查
+
+        Returns:
+            续租成功的书签数
+        """
+        rows = [{'run_id': self.run_id, 'bookmark_id': bookmark_id, 'owner': owner,
+                 'expires': time.time() + self.lease_seconds} for bookmark_id in bookmark_ids]
+        if not rows:
+            return 0
+        with self.engine.begin() as conn:
+            result = conn.execute(text(
+                "UPDATE work_queue SET lease_expires_at = :expires "
+                "WHERE run_id = :run_id AND bookmark_id = :bookmark_id "
+                "AND status = 'leased' AND lease_owner = :owner"
+            ), rows)
+        return result.rowcount
+
+    def release(self, owner: str, bookmark_id: int):
+        """归还未处理的书签（检查被停止），不计入尝试次数"""
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "UPDATE work_queue SET status = 'pending', lease_owner = NULL, lease_expires_at = NULL, "
+                "attempts = MAX(attempts - 1, 0), updated_at = :updated "
+                "WHERE run_id = :run_id AND bookmark_id = :bookmark_id AND lease_owner = :owner"
+            ), {'updated': datetime.now(), 'run_id': self.run_id, 'bookmark_id': bookmark_id, 'owner': owner})
+
+    def counts(self) -> Dict[str, int]:
+        """各状态的书签数"""
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(
+                "SELECT status, COUNT(*) FROM work_queue WHERE run_id = :run_id GROUP BY status"
+            ), {'run_id': self.run_id}).fetchall()
+        return {status: count for status, count in rows}
+
+    def is_finished(self) -> bool:
+        """没有还能领取的书签，也没有其他进程正在处理的书签"""
+        with self.engine.connect() as conn:
+            remaining = conn.execute(text(
+                "SELECT COUNT(*) FROM work_queue WHERE run_id = :run_id AND ("
+                "  (status = 'pending' AND attempts < :max_attempts) OR "
+                "  (status = 'leased' AND (lease_expires_at >= :now OR attempts < :max_attempts))"
+                ")"
+            ), {'run_id': self.run_id, 'max_attempts': self.max_attempts, 'now': time.time()}).scalar()
+        return remaining == 0
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试自适应轮询的下次检查时间
+按发布间隔计算并限制在上下限之间、抖动范围、页面没有上传时间时沿用上次的间隔
+"""
+
+import sys
+import os
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.update_checker import UpdateChecker
+from config.settings import (ADAPTIVE_POLL_FRACTION, ADAPTIVE_MIN_INTERVAL_HOURS, ADAPTIVE_MAX_INTERVAL_HOURS,
+                             ADAPTIVE_JITTER)
+
+def _hours_from_now(moment, before):
+    return (moment - before).total_seconds() / 3600
+
+def _interval(checker, upload_times, bookmark=None):
+    before = datetime.now()
+    return _hours_from_now(checker._next_check_at(upload_times, bookmark), before)
+
+def test_interval_follows_post_rate():
+    """每天发一个视频：间隔 = 24 小时 × ADAPTIVE_POLL_FRACTION（抖动范围内）"""
+    checker = UpdateChecker(None)
+    now = datetime.now()
+    upload_times = [now - timedelta(days=days) for days in range(1, 6)]
+    expected = 24 * 5 / 4 * ADAPTIVE_POLL_FRACTION
+    for _ in range(50):
+        hours = _interval(checker, upload_times)
+        assert expected * (1 - ADAPTIVE_JITTER) - 0.01 <= hours <= expected * (1 + ADAPTIVE_JITTER) + 0.01
+
+def test_interval_clamped(monkeypatch):
+    """很活跃的创作者不低于下限，很久不更新的不高于上限（抖动取两端）"""
+    checker = UpdateChecker(None)
+    now = datetime.now()
+    busy = [now - timedelta(minutes=minutes) for minutes in range(1, 30)]
+    quiet = [now - timedelta(days=365)]
+
+    monkeypatch.setattr(random, 'uniform', lambda low, high: low)
+    assert abs(_interval(checker, busy) - ADAPTIVE_MIN_INTERVAL_HOURS * (1 - ADAPTIVE_JITTER)) < 0.01
+    monkeypatch.setattr(random, 'uniform', lambda low, high: high)
+    assert abs(_interval(checker, quiet) - ADAPTIVE_MAX_INTERVAL_HOURS * (1 + ADAPTIVE_JITTER)) < 0.01
+    # 没有书签可参考又没有上传时间：按最长间隔
+    assert abs(_interval(checker, []) - ADAPTIVE_MAX_INTERVAL_HOURS * (1 + ADAPTIVE_JITTER)) < 0.01
+
+def test_empty_upload_times_keep_previous_interval():
+    """页面没有上传时间时沿用上次的间隔（不加抖动、不超过上限），没有上次的间隔时用下限"""
+    checker = UpdateChecker(None)
+    last = datetime(2026, 1, 1, 12, 0, 0)
+    previous = SimpleNamespace(last_check_time=last, next_check_at=last + timedelta(hours=10))
+    assert abs(_interval(checker, [], previous) - 10) < 0.01
+
+    too_long = SimpleNamespace(last_check_time=last, next_check_at=last + timedelta(days=30))
+    assert abs(_interval(checker, [], too_long) - ADAPTIVE_MAX_INTERVAL_HOURS) < 0.01
+
+    never = SimpleNamespace(last_check_time=None, next_check_at=None)
+    assert abs(_interval(checker, [], never) - ADAPTIVE_MIN_INTERVAL_HOURS) < 0.01
+    assert abs(_hours_from_now(checker._repeat_interval(never), datetime.now()) - ADAPTIVE_MIN_INTERVAL_HOURS) < 0.01
+
+if __name__ == "__main__":
+    test_interval_follows_post_rate()
+    test_empty_upload_times_keep_previous_interval()
+    print("✅ 全部通过")
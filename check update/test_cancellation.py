@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试停止检查
+stop() 唤醒正在重试等待的抓取、让进行中的检查提前结束；检查开始前的 stop() 不会丢，
+停止只作用于当次检查
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+from datetime import timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+import requests
+
+from models.database import init_db, Bookmark, Settings
+from services.update_checker import UpdateChecker
+from services.check_result import SKIPPED
+from services.request_manager import request_manager
+from services.web_scraper import WebScraper
+from utils.cancellation import CancelToken, CheckCancelled
+
+@pytest.fixture
+def no_rate_limit(monkeypatch):
+    monkeypatch.setattr(request_manager, 'domain_min_interval', 0.0)
+    monkeypatch.setattr(request_manager, 'domain_max_concurrency', 10)
+    monkeypatch.setattr(request_manager, 'ready_in', lambda domain: 0.0)
+    return monkeypatch
+
+def _rate_limited_response(url):
+    response = requests.Response()
+    response.status_code = 429
+    response.headers['Retry-After'] = '30'
+    response._content = b'slow down'
+    response.url = url
+    response.elapsed = timedelta(milliseconds=1)
+    return response
+
+def _stop_after(checker, seconds):
+    timer = threading.Timer(seconds, checker.stop)
+    timer.start()
+    return timer
+
+def test_stop_wakes_retry_backoff(no_rate_limit):
+    """429 后要等 30 秒再重试，stop() 立即唤醒并抛出 CheckCancelled"""
+    scraper = WebScraper()
+    scraper.cancel_token = CancelToken()
+    scraper.session.get = lambda url, **kwargs: _rate_limited_response(url)
+    timer = threading.Timer(0.3, scraper.cancel_token.cancel)
+    timer.start()
+    started = time.monotonic()
+    with pytest.raises(CheckCancelled):
+        scraper.get_page_content('http://example.test/user.htm?author=a', use_cache=False)
+    assert time.monotonic() - started < 2
+    timer.join()
+
+def _make_checker(count):
+    path = os.path.join(tempfile.mkdtemp(prefix='test_cancellation_'), 'cancel.sqlite')
+    session = init_db(path)
+    session.add(Settings(update_range_days=7))
+    session.add_all([Bookmark(id=i, url=f'http://example.test/user.htm?author=a{i}', name=f'a{i}')
+                     for i in range(1, count + 1)])
+    session.commit()
+    return UpdateChecker(session, max_workers=2, parse_processes=0, adaptive=False)
+
+def test_stop_ends_check_early(no_rate_limit):
+    """所有抓取都卡在 429 的等待里：stop() 后检查很快结束，未完成的书签记为跳过"""
+    no_rate_limit.setattr(requests.Session, 'get', lambda self, url, **kwargs: _rate_limited_response(url))
+    checker = _make_checker(6)
+    timer = _stop_after(checker, 0.5)
+    started = time.monotonic()
+    results = list(checker.iter_check_results())
+    assert time.monotonic() - started < 3
+    assert len(results) == 6
+    assert all(result.kind == SKIPPED for result in results)
+    timer.join()
+    # 停止只作用于这一次检查
+    assert not checker.cancel_token.cancelled
+
+def test_stop_before_run_starts_is_kept(no_rate_limit):
+    """检查线程开始前到达的 stop() 不被丢掉：该次检查不发请求直接结束，下一次检查正常进行"""
+    calls = []
+
+    def fetch(self, url, **kwargs):
+        calls.append(url)
+        self.cancel_token.raise_if_cancelled()
+        return None
+
+    no_rate_limit.setattr(WebScraper, 'get_page_content', fetch)
+    checker = _make_checker(3)
+    checker.stop()
+    results = list(checker.iter_check_results())
+    assert calls == []
+    assert [result.kind for result in results] == [SKIPPED] * 3
+
+    results = list(checker.iter_check_results())
+    assert len(calls) == 3
+    assert not any(result.kind == SKIPPED for result in results)
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-q'])
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试检查记录的汇总与可靠性统计
+超过保留期的原始记录并入小时汇总、旧的小时汇总并入天汇总、过期的天汇总删除；
+可靠性统计把原始记录和汇总合并计算
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+
+from models.database import init_db, get_engine, Bookmark
+from services.check_history import insert_history, rollup_check_history, creator_reliability
+
+def _row(bookmark_id, checked_at, status='no_change', cache='miss', latency_ms=50.0, videos=0):
+    return {'bookmark_id': bookmark_id, 'run_id': None, 'checked_at': checked_at, 'status': status,
+            'http_status': 500 if status == 'error' else 200, 'bytes': 1000, 'latency_ms': latency_ms,
+            'cache': cache, 'videos': videos}
+
+def _make_db(now):
+    path = os.path.join(tempfile.mkdtemp(prefix='test_check_history_'), 'history.sqlite')
+    session = init_db(path)
+    session.add_all([Bookmark(id=i, url=f'https://example.test/u/{i}', name=f'u{i}') for i in (1, 2, 3)])
+    session.commit()
+    session.close()
+    engine = get_engine(path)
+    recent = now - timedelta(days=1)
+    old_hour = (now - timedelta(days=10)).replace(minute=10, second=0, microsecond=0)
+    with engine.begin() as conn:
+        insert_history(conn, [
+            # 保留期内的原始记录
+            _row(1, recent, 'update', latency_ms=100.0, videos=2),
+            _row(1, recent + timedelta(minutes=1), cache='304'),
+            _row(1, recent + timedelta(minutes=2), 'error', cache=None, latency_ms=300.0),
+            # 10 天前同一小时的两条：并入一条小时汇总
+            _row(1, old_hour, cache='304', latency_ms=40.0),
+            _row(1, old_hour + timedelta(minutes=5), 'update', latency_ms=60.0, videos=1),
+            # 100 天前：经小时汇总并入天汇总
+            _row(2, now - timedelta(days=100), 'error', cache=None),
+            # 800 天前：超过天汇总的保留期，删除
+            _row(3, now - timedelta(days=800)),
+        ])
+    return engine
+
+def _rollups(conn):
+    return conn.execute(text(
+        'SELECT bookmark_id, period, checks, errors, updates, not_modified, videos, latency_ms_total, latency_ms_max '
+        'FROM check_history_rollups ORDER BY bookmark_id'
+    )).fetchall()
+
+def test_rollup_moves_old_rows_into_hours_and_days():
+    now = datetime.now()
+    engine = _make_db(now)
+    assert rollup_check_history(engine, now) == {'raw': 4, 'hourly': 2, 'daily_expired': 1}
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT COUNT(*) FROM check_history')).scalar() == 3
+        assert [tuple(row) for row in _rollups(conn)] == [
+            (1, 'hour', 2, 0, 1, 1, 1, 100.0, 60.0),
+            (2, 'day', 1, 1, 0, 0, 0, 50.0, 50.0),
+        ]
+    # 可重复执行：没有新的过期记录时什么也不做
+    assert rollup_check_history(engine, now) == {'raw': 0, 'hourly': 0, 'daily_expired': 0}
+
+def test_reliability_merges_raw_and_rollups():
+    now = datetime.now()
+    engine = _make_db(now)
+    with engine.connect() as conn:
+        before = creator_reliability(conn, days=30)
+    rollup_check_history(engine, now)
+    with engine.connect() as conn:
+        after = creator_reliability(conn, days=30)
+        # 汇总前后统计一致
+        assert after == before
+        assert [row['bookmark_id'] for row in after] == [1]
+        row = after[0]
+        assert (row['checks'], row['errors'], row['updates'], row['not_modified'], row['videos']) == (5, 1, 2, 2, 3)
+        assert row['error_rate'] == 0.2
+        assert row['avg_latency_ms'] == (100 + 50 + 300 + 40 + 60) / 5
+        assert row['max_latency_ms'] == 300
+
+        # 更长的时间范围包含天汇总，按错误率从高到低
+        year = creator_reliability(conn, days=365)
+        assert [(row['bookmark_id'], row['error_rate']) for row in year] == [(2, 1.0), (1, 0.2)]
+        assert [row['bookmark_id'] for row in creator_reliability(conn, days=365, bookmark_id=1)] == [1]
+
+if __name__ == "__main__":
+    test_rollup_moves_old_rows_into_hours_and_days()
+    test_reliability_merges_raw_and_rollups()
+    print("✅ 全部通过")
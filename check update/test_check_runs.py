@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试检查记录
+检查结束后不再持有检查ID，之后的单个书签检查不会记到已结束的检查下
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.database import init_db, Bookmark, CheckRun, CheckRunItem
+from services.update_checker import UpdateChecker
+from benchmarks.synthetic import make_videos, render_creator_page
+
+def _make_session():
+    path = os.path.join(tempfile.mkdtemp(prefix='test_check_runs_'), 'runs.sqlite')
+    session = init_db(path)
+    session.add(Bookmark(id=1, url='http://example.test/user.htm?author=a', name='a'))
+    session.commit()
+    return session
+
+def test_single_check_after_run_not_recorded_in_run():
+    """_finish_run 清掉 run_id：之后的 check_single_bookmark 不写 CheckRunItem"""
+    session = _make_session()
+    checker = UpdateChecker(session)
+    html = render_creator_page('a', make_videos(3, 5, now=datetime.now()))
+    checker.scraper.get_page_content = lambda url, use_cache=True, **kwargs: html
+
+    checker._begin_run(7, 1)
+    run_id = checker.run_id
+    assert run_id is not None
+    checker._finish_run('completed')
+    assert checker.run_id is None
+    assert session.get(CheckRun, run_id).status == 'completed'
+
+    bookmark = session.get(Bookmark, 1)
+    updates = checker.check_single_bookmark(bookmark, 7)
+    assert len(updates) == 1
+    assert session.query(CheckRunItem).count() == 0
+
+if __name__ == "__main__":
+    test_single_check_after_run_not_recorded_in_run()
+    print("✅ 全部通过")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试流式检查
+结果没被取走时调度器暂停派发（背压）；提前关闭迭代器停止检查，剩下的书签不再抓取
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from models.database import init_db, Bookmark, Settings, CheckRun
+from services.update_checker import UpdateChecker
+from services.request_manager import request_manager
+from services.web_scraper import WebScraper
+from benchmarks.synthetic import make_videos, render_creator_page
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """不限速，抓取直接返回合成页面；返回抓取过的地址列表"""
+    monkeypatch.setattr(request_manager, 'domain_min_interval', 0.0)
+    monkeypatch.setattr(request_manager, 'domain_max_concurrency', 10)
+    monkeypatch.setattr(request_manager, 'ready_in', lambda domain: 0.0)
+    html = render_creator_page('a', make_videos(5, 3, now=datetime.now()))
+    calls = []
+    lock = threading.Lock()
+
+    def fetch(self, url, **kwargs):
+        with lock:
+            calls.append(url)
+        return html
+
+    monkeypatch.setattr(WebScraper, 'get_page_content', fetch)
+    return calls
+
+def _make_checker(count, max_workers=2):
+    path = os.path.join(tempfile.mkdtemp(prefix='test_check_stream_'), 'stream.sqlite')
+    session = init_db(path)
+    session.add(Settings(update_range_days=7))
+    session.add_all([Bookmark(id=i, url=f'http://example.test/user.htm?author=a{i}', name=f'a{i}')
+                     for i in range(1, count + 1)])
+    session.commit()
+    return UpdateChecker(session, max_workers=max_workers, parse_processes=0, adaptive=False)
+
+def test_slow_consumer_pauses_dispatch(fetches):
+    """max_pending=2：消费者不取结果时，派发的书签数停在 缓冲 + 线程数 + 正在交付的一个 以内"""
+    checker = _make_checker(20)
+    results = checker.iter_check_results(max_pending=2)
+    first = next(results)
+    time.sleep(0.5)
+    assert len(fetches) <= 1 + 2 + checker.max_workers + 1
+    rest = list(results)
+    assert len(rest) == 19 and len(fetches) == 20
+    assert first.total == 20 and rest[-1].completed == 20
+
+def test_close_stops_dispatch(fetches):
+    """取了两个结果后关闭迭代器：检查停止，之后不再抓取，检查记录为 stopped 可续跑"""
+    checker = _make_checker(20)
+    results = checker.iter_check_results(max_pending=2)
+    next(results)
+    next(results)
+    results.close()
+    dispatched = len(fetches)
+    assert dispatched < 20
+    time.sleep(0.3)
+    assert len(fetches) == dispatched
+    run = checker.session.query(CheckRun).one()
+    assert run.status == 'stopped'
+    assert not checker.cancel_token.cancelled
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-q'])
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试 HTTP 录制与回放
+录制的响应（状态码、响应头、正文）回放时原样返回且不连网；同一地址按录制顺序返回，
+归档里没有的请求和录制时失败的请求回放为连接错误
+"""
+
+import sys
+import os
+import tempfile
+from datetime import timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.http_archive import HttpArchiveManager, load_archive, http_archive
+from services.request_manager import request_manager
+from services.web_scraper import WebScraper
+from benchmarks.synthetic import make_videos, render_creator_page
+
+PAGE_URL = 'http://example.test/user.htm?author=a'
+PAGE_HTML = render_creator_page('a', make_videos(21, 5))
+
+def _stub_response(request, status, body, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.reason = 'OK' if status == 200 else 'Error'
+    response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    response._content = body
+    response.url = request.url
+    response.request = request
+    response.elapsed = timedelta(milliseconds=5)
+    return response
+
+@pytest.fixture
+def archive_path(monkeypatch):
+    """录制时由桩代替网络：第一次 500、之后 200；图片返回二进制；/down 连接失败"""
+    calls = []
+
+    def send(self, request, **kwargs):
+        calls.append(request.url)
+        if request.url.endswith('/down'):
+            raise requests.exceptions.ConnectionError('refused', request=request)
+        if request.url.endswith('.webp'):
+            return _stub_response(request, 200, b'\x89\xff\x00binary', {'Content-Type': 'image/webp'})
+        status = 500 if calls.count(request.url) == 1 else 200
+        return _stub_response(request, status, PAGE_HTML.encode('utf-8'), {
+            'Content-Type': 'text/html; charset=utf-8', 'ETag': f'"v{len(calls)}"',
+            'Content-Encoding': 'gzip', 'Set-Cookie': 'sid=1'
+        })
+
+    monkeypatch.setattr(HTTPAdapter, 'send', send)
+    path = os.path.join(tempfile.mkdtemp(prefix='test_http_archive_'), 'check.jsonl.gz')
+    manager = HttpArchiveManager()
+    manager.record(path)
+    session = requests.Session()
+    manager.mount(session)
+    assert session.get(PAGE_URL).status_code == 500
+    assert session.get(PAGE_URL).status_code == 200
+    assert session.get('http://example.test/thumb/1.webp').content == b'\x89\xff\x00binary'
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get('http://example.test/down')
+    manager.stop()
+    assert manager.recorded == 4
+
+    def offline(self, request, **kwargs):
+        raise AssertionError(f'回放时不应连网: {request.url}')
+
+    monkeypatch.setattr(HTTPAdapter, 'send', offline)
+    return path
+
+def test_archive_entries(archive_path):
+    """归档按请求顺序保存；二进制正文用 base64，与解码后正文不符的头不保存"""
+    entries = load_archive(archive_path)
+    assert [(entry['url'], entry.get('status')) for entry in entries] == [
+        (PAGE_URL, 500), (PAGE_URL, 200), ('http://example.test/thumb/1.webp', 200), ('http://example.test/down', None)
+    ]
+    assert entries[1]['body'] == PAGE_HTML
+    assert 'body_b64' in entries[2]
+    assert entries[3]['error'] == 'ConnectionError'
+    headers = {key.lower() for key in entries[1]['headers']}
+    assert 'etag' in headers and 'content-encoding' not in headers and 'set-cookie' not in headers
+
+def test_replay_offline(archive_path):
+    """回放：同一地址按录制顺序返回、用完后重复最后一个；没录过的地址算未命中"""
+    manager = HttpArchiveManager()
+    manager.replay(archive_path, latency_scale=0)
+    session = requests.Session()
+    manager.mount(session)
+    first = session.get(PAGE_URL)
+    assert first.status_code == 500
+    second = session.get(PAGE_URL)
+    assert second.status_code == 200 and second.text == PAGE_HTML
+    assert second.headers['ETag'] == '"v2"' and 'Content-Encoding' not in second.headers
+    assert session.get(PAGE_URL).headers['ETag'] == '"v2"'
+    assert session.get('http://example.test/thumb/1.webp').content == b'\x89\xff\x00binary'
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get('http://example.test/down')
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get('http://example.test/user.htm?author=unknown')
+    stats = manager.get_stats()
+    assert stats['mode'] == 'replay' and stats['misses'] == 1 and stats['served'] == 5
+    manager.stop()
+    assert manager.get_stats()['mode'] is None
+
+def test_scraper_replays_check(archive_path, monkeypatch):
+    """回放模式下新建的 WebScraper 离线拿到录制的页面：第一次 500 按录制重试一次后成功"""
+    monkeypatch.setattr(request_manager, 'domain_min_interval', 0.0)
+    monkeypatch.setattr(request_manager, 'ready_in', lambda domain: 0.0)
+    monkeypatch.setattr('services.web_scraper.cancellable_sleep', lambda seconds, token=None: None)
+    http_archive.replay(archive_path, latency_scale=0)
+    try:
+        scraper = WebScraper()
+        assert scraper.get_page_content(PAGE_URL, use_cache=False) == PAGE_HTML
+        assert http_archive.get_stats()['served'] == 2
+    finally:
+        http_archive.stop()
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-q'])
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试增量扫描
+遇到上次检查的最后一个视频或超出时间范围即停止；从未检查过时只报告最新的一个；
+翻页按页面自己的分页链接进行，最多 MAX_PAGE_DEPTH 页，被挤到下一页的视频不重复
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.update_checker import UpdateChecker
+from services.web_scraper import WebScraper
+from benchmarks.synthetic import make_videos, render_creator_page
+from config.settings import MAX_PAGE_DEPTH
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+CUTOFF = NOW - timedelta(days=7)
+
+def _videos(count, step_hours=12):
+    """按上传时间倒序的视频，v0 最新"""
+    return [{'video_id': f'v{i}', 'upload_time': NOW - timedelta(hours=step_hours * (i + 1))} for i in range(count)]
+
+def _ids(videos):
+    return [video['video_id'] for video in videos]
+
+def test_stops_at_last_video_id():
+    """上次检查的视频在页面中间：之前的都是新视频，之后的不再扫描"""
+    checker = UpdateChecker(None)
+    videos = _videos(10)
+    first, new_videos, upload_times, stopped = checker._scan_videos(iter(videos), CUTOFF, 'v4')
+    assert first['video_id'] == 'v0'
+    assert _ids(new_videos) == ['v0', 'v1', 'v2', 'v3']
+    assert len(upload_times) == 5
+    assert stopped
+
+def test_last_video_id_absent_uses_cutoff():
+    """上次检查的视频已不在页面上：扫到第一个超出范围的视频为止"""
+    checker = UpdateChecker(None)
+    videos = _videos(24)  # 每 12 小时一个，7 天内有 13 个
+    first, new_videos, upload_times, stopped = checker._scan_videos(iter(videos), CUTOFF, 'gone')
+    assert first['video_id'] == 'v0'
+    assert _ids(new_videos) == [f'v{i}' for i in range(13)]
+    assert all(video['upload_time'] > CUTOFF for video in new_videos)
+    assert stopped
+    # 整页都在范围内：没有停止，下一页可能还有新视频
+    _, new_videos, _, stopped = checker._scan_videos(iter(_videos(5)), CUTOFF, 'gone')
+    assert len(new_videos) == 5 and not stopped
+
+def test_never_checked_reports_newest():
+    """没有 last_video_id：只报告范围内最新的一个"""
+    checker = UpdateChecker(None)
+    videos = _videos(20)
+    # 页面顺序不一定严格按时间，取上传时间最新的
+    videos[0], videos[1] = videos[1], videos[0]
+    first, new_videos, _, stopped = checker._scan_videos(iter(videos), CUTOFF, None)
+    assert first['video_id'] == 'v1'
+    assert _ids(new_videos) == ['v0']
+    assert stopped
+
+def test_last_video_first_on_page():
+    """上次检查的视频仍在第一位：没有新视频"""
+    checker = UpdateChecker(None)
+    first, new_videos, upload_times, stopped = checker._scan_videos(iter(_videos(10)), CUTOFF, 'v0')
+    assert first['video_id'] == 'v0'
+    assert new_videos == []
+    assert len(upload_times) == 1
+    assert stopped
+
+BOOKMARK_URL = 'http://example.test/user.htm?author=a'
+PAGE_SIZE = 24
+
+class _PagedSite:
+    """按页提供合成页面的抓取器；第 N 页的分页栏链接到 /videos/a?page=N+1"""
+
+    def __init__(self, videos, now, shift=None):
+        self.videos = videos
+        self.now = now
+        self.shift = shift or {}  # 页码 -> 该页开头往前挪的视频数（抓取期间有新上传）
+        self.fetched = []
+        self.scraper = WebScraper()
+        self.scraper.run_timestamp = now
+        self.scraper.get_page_content = self.get_page_content
+
+    @staticmethod
+    def url(page):
+        return BOOKMARK_URL if page == 1 else f'http://example.test/videos/a?page={page}&sort=new'
+
+    def render(self, page):
+        start = max(0, (page - 1) * PAGE_SIZE - self.shift.get(page, 0))
+        page_videos = self.videos[start:start + PAGE_SIZE]
+        has_next = start + PAGE_SIZE < len(self.videos)
+        return render_creator_page('a', page_videos, now=self.now,
+                                   next_page_url=f'/videos/a?page={page + 1}&sort=new' if has_next else None)
+
+    def get_page_content(self, url, use_cache=True, **kwargs):
+        page = next(page for page in range(1, 100) if self.url(page) == url)
+        self.fetched.append(page)
+        return self.render(page)
+
+def _collect(site, last_video_id, cutoff):
+    checker = UpdateChecker(None)
+    checker.scraper.run_timestamp = site.now
+    bookmark = SimpleNamespace(url=BOOKMARK_URL, name='a', last_video_id=last_video_id)
+    return checker._collect_new_videos(site.scraper, bookmark, site.render(1), cutoff)
+
+def test_pages_follow_pagination_links():
+    """下一页地址取自页面的分页栏，最后一页没有链接"""
+    site = _PagedSite(make_videos(11, 30), datetime.now())
+    assert site.scraper.next_page_url(site.render(1), BOOKMARK_URL) == site.url(2)
+    assert site.scraper.next_page_url(site.render(2), site.url(2)) is None
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'user_page.html'), encoding='utf-8') as f:
+        assert site.scraper.next_page_url(f.read(), BOOKMARK_URL) is None
+
+def test_collect_stops_at_last_video_on_later_page():
+    """上次检查的视频在第 3 页：前两页和第 3 页之前的视频都是新视频，不再抓第 4 页"""
+    now = datetime.now()
+    videos = make_videos(12, 200, now=now, mean_interval_hours=2)
+    site = _PagedSite(videos, now)
+    first, new_videos, _ = _collect(site, videos[55]['video_id'], now - timedelta(days=365))
+    assert first['video_id'] == videos[0]['video_id']
+    assert _ids(new_videos) == [video['video_id'] for video in videos[:55]]
+    assert site.fetched == [2, 3]
+
+def test_collect_respects_cutoff():
+    """上次检查的视频已不在页面上：翻到超出时间范围的那一页为止"""
+    now = datetime.now()
+    videos = make_videos(13, 200, now=now, mean_interval_hours=2)
+    site = _PagedSite(videos, now)
+    cutoff = now - timedelta(days=3)
+    _, new_videos, _ = _collect(site, 'gone', cutoff)
+    assert all(video['upload_time'] > cutoff for video in new_videos)
+    expected = sum(1 for video in videos if now - video['uploaded'] < timedelta(days=3))
+    assert PAGE_SIZE < len(new_videos) <= expected
+    assert site.fetched[-1] == (len(new_videos) // PAGE_SIZE) + 1
+    assert len(site.fetched) < 5
+
+def test_collect_capped_at_max_page_depth():
+    """每一页都是新视频时最多抓 MAX_PAGE_DEPTH 页"""
+    now = datetime.now()
+    videos = make_videos(14, PAGE_SIZE * (MAX_PAGE_DEPTH + 3), now=now, mean_interval_hours=1)
+    site = _PagedSite(videos, now)
+    _, new_videos, _ = _collect(site, 'gone', now - timedelta(days=365))
+    assert site.fetched == list(range(2, MAX_PAGE_DEPTH + 1))
+    assert len(new_videos) == PAGE_SIZE * MAX_PAGE_DEPTH
+
+def test_collect_dedupes_shifted_pages():
+    """翻页期间有新上传，第 2 页开头重复第 1 页末尾的视频：新视频不重复"""
+    now = datetime.now()
+    videos = make_videos(15, 100, now=now, mean_interval_hours=2)
+    site = _PagedSite(videos, now, shift={2: 3})
+    _, new_videos, _ = _collect(site, videos[30]['video_id'], now - timedelta(days=365))
+    assert _ids(new_videos) == [video['video_id'] for video in videos[:30]]
+    assert site.fetched == [2]
+
+if __name__ == "__main__":
+    test_stops_at_last_video_id()
+    test_last_video_id_absent_uses_cutoff()
+    test_never_checked_reports_newest()
+    test_last_video_first_on_page()
+    test_pages_follow_pagination_links()
+    test_collect_stops_at_last_video_on_later_page()
+    test_collect_respects_cutoff()
+    test_collect_capped_at_max_page_depth()
+    test_collect_dedupes_shifted_pages()
+    print("✅ 全部通过")
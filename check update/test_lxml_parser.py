@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+lxml快速解析路径的差分测试
+同一页面分别用 lxml 和 BeautifulSoup 后端解析，输出必须一致
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime
+
+from benchmarks.synthetic import make_videos, render_creator_page
+from services.web_scraper import WebScraper
+from utils.selector_memo import selector_memo
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _load(name):
+    with open(os.path.join(BASE_DIR, name), 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+def _comparable(videos):
+    # upload_time 按解析时刻计算，两次解析之间会有微小差异，只比较到分钟
+    return [
+        dict(v, upload_time=v['upload_time'].replace(second=0, microsecond=0))
+        for v in videos
+    ]
+
+def test_lxml_matches_bs4():
+    """保存的页面在两种后端下输出一致"""
+    fast = WebScraper(parser_backend='lxml')
+    slow = WebScraper(parser_backend='bs4')
+
+    # debug_page.html 保存的是未解压的响应体，两种后端都解析出 0 个视频，不作为对照
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    pages = {
+        'user_page.html': _load('user_page.html'),
+        'synthetic': render_creator_page('作者', make_videos(7, 24, now=now), now=now),
+    }
+    for name, html in pages.items():
+        fast_videos = fast.parse_video_info(html, "https://hsex.men")
+        slow_videos = slow.parse_video_info(html, "https://hsex.men")
+        print(f"📄 {name}: lxml={len(fast_videos)} bs4={len(slow_videos)}")
+        assert fast_videos, name
+        assert _comparable(fast_videos) == _comparable(slow_videos)
+
+def test_fast_path_used_for_known_layout():
+    """已知布局由快速路径直接给出结果"""
+    scraper = WebScraper(parser_backend='lxml')
+    assert len(scraper._extract_with_lxml(_load('user_page.html'))) == 15
+    pages = selector_memo.get_stats()['fast_path']['pages']
+    videos = scraper.parse_video_info(_load('user_page.html'), "https://hsex.men")
+    assert selector_memo.get_stats()['fast_path']['pages'] == pages + 1
+    assert len(videos) == 15
+    assert videos[0]['video_id'] == '1110786'
+    assert videos[0]['thumbnail_url'] == 'https://img.ml0987.com/thumb/1110786.webp'
+    assert videos[0]['relative_time'] == '1月前'
+
+def test_unknown_layout_falls_back():
+    """快速路径找不到时回退到BeautifulSoup"""
+    html = """
+    <html><body>
+      <div class="video-item">
+        <a href="/watch?v=abc123"><img src="/thumbs/abc123.jpg"></a>
+        <h3>Some title</h3>
+        <span class="time">3 days ago</span>
+      </div>
+    </body></html>
+    """
+    scraper = WebScraper(parser_backend='lxml')
+    assert scraper._extract_with_lxml(html) == []
+
+    fallbacks = selector_memo.get_stats()['fast_path']['fallbacks']
+    videos = scraper.parse_video_info(html, "https://example.com/u/1")
+    assert selector_memo.get_stats()['fast_path']['fallbacks'] == fallbacks + 1
+    assert len(videos) == 1
+    assert videos[0]['video_id'] == 'abc123'
+    assert videos[0]['title'] == 'Some title'
+    assert videos[0]['thumbnail_url'] == 'https://example.com/thumbs/abc123.jpg'
+
+if __name__ == "__main__":
+    test_lxml_matches_bs4()
+    test_fast_path_used_for_known_layout()
+    test_unknown_layout_falls_back()
+    print("✅ 全部通过")
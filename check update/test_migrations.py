@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试数据库版本迁移
+旧版本数据库（无版本表、缺列、有重复视频）升级到最新版本，数据保留，重复启动不再迁移
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+
+from models.database import init_db, get_engine
+from models.migrations import LATEST_VERSION, get_version, _legacy_columns
+
+# 早期版本建出的表结构
+_OLD_SCHEMA = '''
+CREATE TABLE bookmarks (
+    id INTEGER PRIMARY KEY, url VARCHAR NOT NULL UNIQUE, name VARCHAR,
+    created_at DATETIME, updated_at DATETIME
+);
+CREATE TABLE videos (
+    id INTEGER PRIMARY KEY, video_id VARCHAR NOT NULL, title VARCHAR, thumbnail_url VARCHAR,
+    upload_time DATETIME, relative_time VARCHAR, is_watched BOOLEAN, watched_at DATETIME,
+    bookmark_id INTEGER REFERENCES bookmarks (id), created_at DATETIME
+);
+CREATE TABLE settings (
+    id INTEGER PRIMARY KEY, check_interval INTEGER, update_range_days INTEGER,
+    auto_check BOOLEAN, last_check_time DATETIME
+);
+INSERT INTO bookmarks (id, url, name) VALUES (1, 'https://example.test/u/1', '旧创作者');
+INSERT INTO videos (id, video_id, title, bookmark_id) VALUES (1, 'a', '第一集 Pilot', 1);
+INSERT INTO videos (id, video_id, title, bookmark_id) VALUES (2, 'a', '第一集 Pilot', 1);
+INSERT INTO videos (id, video_id, title, bookmark_id) VALUES (3, 'b', '第二集 Finale', 1);
+INSERT INTO settings (id, check_interval, update_range_days, auto_check) VALUES (1, 3600, 7, 1);
+'''
+
+def _old_db():
+    path = os.path.join(tempfile.mkdtemp(prefix='test_migrations_'), 'old.sqlite')
+    connection = sqlite3.connect(path)
+    connection.executescript(_OLD_SCHEMA)
+    connection.close()
+    return path
+
+def _names(conn, kind):
+    return {row[0] for row in conn.execute(text('SELECT name FROM sqlite_master WHERE type = :t'), {'t': kind})}
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(text(f'PRAGMA table_info({table})'))}
+
+def test_old_database_upgraded():
+    """无版本表的旧数据库按顺序执行全部迁移"""
+    path = _old_db()
+    init_db(path).close()
+    with get_engine(path).connect() as conn:
+        assert get_version(conn) == LATEST_VERSION
+        assert {'browser_path'} <= _columns(conn, 'settings')
+        assert {'avatar_url', 'next_check_at'} <= _columns(conn, 'bookmarks')
+        # 重复视频只留最早的一条
+        assert [row[0] for row in conn.execute(text('SELECT id FROM videos ORDER BY id'))] == [1, 3]
+        indexes = _names(conn, 'index')
+        assert {'ux_videos_bookmark_video', 'ix_videos_upload_time', 'ix_videos_video_id',
+                'ix_bookmarks_last_check_time', 'ix_bookmarks_next_check_at'} <= indexes
+        tables = _names(conn, 'table')
+        assert {'check_runs', 'check_history', 'work_queue', 'data_versions', 'videos_fts'} <= tables
+        # 已有视频导入全文索引
+        assert conn.execute(text('SELECT COUNT(*) FROM videos_fts')).scalar() == 2
+        assert conn.execute(text(
+            "SELECT creator FROM videos_fts WHERE videos_fts MATCH '\"Finale\"'"
+        )).scalar() == '旧创作者'
+        assert conn.execute(text("SELECT version FROM data_versions WHERE name = 'bookmarks'")).scalar() == 0
+
+def test_partial_upgrade_and_rerun():
+    """停在中间版本的数据库只执行之后的迁移；已是最新时再次启动不做任何改动"""
+    path = _old_db()
+    engine = get_engine(path)
+    with engine.begin() as conn:
+        _legacy_columns(conn)
+        conn.execute(text('CREATE TABLE schema_version (version INTEGER NOT NULL)'))
+        conn.execute(text('INSERT INTO schema_version (version) VALUES (4)'))
+    init_db(path).close()
+    with engine.connect() as conn:
+        assert get_version(conn) == LATEST_VERSION
+        # 迁移 2 没有再执行：重复视频原样保留
+        assert conn.execute(text('SELECT COUNT(*) FROM videos')).scalar() == 3
+        assert 'next_check_at' in _columns(conn, 'bookmarks')
+        assert 'videos_fts' in _names(conn, 'table')
+
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE bookmarks SET name = '新名字'"))
+    init_db(path).close()
+    with engine.connect() as conn:
+        assert get_version(conn) == LATEST_VERSION
+        assert conn.execute(text("SELECT version FROM data_versions WHERE name = 'bookmarks'")).scalar() == 1
+        assert conn.execute(text("SELECT DISTINCT creator FROM videos_fts")).scalar() == '新名字'
+
+if __name__ == "__main__":
+    test_old_database_upgraded()
+    test_partial_upgrade_and_rerun()
+    print("✅ 全部通过")
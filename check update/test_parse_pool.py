@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试进程池解析
+子进程不写选择器记忆文件，命中统计和新记住的选择器随结果交给父进程；等待可被取消、有超时
+"""
+
+import sys
+import os
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from benchmarks.synthetic import make_videos, render_creator_page
+from services.parse_pool import ParsePool
+from utils.cancellation import CancelToken, CheckCancelled
+from utils.selector_memo import SelectorMemo, selector_memo
+
+def test_memo_changes_merged_not_saved():
+    """关闭持久化的记忆不写文件，取出的变化合并到另一个实例后由它保存"""
+    work_dir = tempfile.mkdtemp(prefix='test_parse_pool_')
+    child = SelectorMemo(memo_file=os.path.join(work_dir, 'child.json'))
+    child.persist = False
+    child.remember('example.test', 'title', '.title')
+    child.record_hit('container')
+    child.save()
+    assert not os.path.exists(child.memo_file)
+
+    parent = SelectorMemo(memo_file=os.path.join(work_dir, 'parent.json'))
+    parent.merge_changes(child.take_changes())
+    assert parent.get('example.test', 'title') == '.title'
+    assert parent.get_stats()['hits']['container'] == 1
+    assert parent.get_stats()['misses']['title'] == 1
+    assert os.path.exists(parent.memo_file)
+    # 取出后清零，不会重复合并
+    assert sum(child.take_changes()['misses'].values()) == 0
+
+def test_pool_parse_cancel_and_timeout():
+    """解析结果与命中统计回到父进程；已取消的令牌和超时都会中断等待，超时后进程池重建"""
+    html = render_creator_page('author', make_videos(1, 20))
+    url = 'http://example.test/user/author'
+    pool = ParsePool(1)
+    try:
+        before = sum(selector_memo.get_stats()['hits'].values()) + sum(selector_memo.get_stats()['misses'].values())
+        videos = pool.parse(html, url)
+        assert len(videos) == 20
+        after = sum(selector_memo.get_stats()['hits'].values()) + sum(selector_memo.get_stats()['misses'].values())
+        assert after > before
+
+        token = CancelToken()
+        token.cancel()
+        with pytest.raises(CheckCancelled):
+            pool.parse(html, url, cancel_token=token)
+        # 超时时卡住的子进程被结束，进程池换新后马上可以继续解析
+        with pytest.raises(TimeoutError):
+            pool.parse(html * 200, url, timeout=0.3)
+        assert pool.recycled == 1
+        started = time.monotonic()
+        assert len(pool.parse(html, url)) == 20
+        assert time.monotonic() - started < 10
+    finally:
+        pool.shutdown()
+
+if __name__ == "__main__":
+    test_memo_changes_merged_not_saved()
+    test_pool_parse_cancel_and_timeout()
+    print("✅ 全部通过")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试相对时间解析
+新解析器在基准语料上必须与原实现逐条一致
+"""
+
+import sys
+import os
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from datetime import datetime, timedelta
+from utils.relative_time import RelativeTimeParser
+from bench_relative_time import legacy_parse_relative_time, load_corpus
+
+def test_matches_legacy():
+    """与原 _parse_relative_time 结果一致"""
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    parser = RelativeTimeParser()
+    for text in set(load_corpus()):
+        assert parser.parse(text, now) == legacy_parse_relative_time(text, now), text
+
+def test_memo_applies_to_given_timestamp():
+    """记忆的是偏移量，基准时间不同结果随之变化"""
+    parser = RelativeTimeParser()
+    first = datetime(2026, 1, 1)
+    second = datetime(2026, 2, 1)
+    assert parser.parse('3天前', first) == first - timedelta(days=3)
+    assert parser.parse('3天前', second) == second - timedelta(days=3)
+    assert parser.get_stats()['misses'] == 1
+    assert parser.get_stats()['hits'] == 1
+
+def test_memo_keyed_by_normalized_text():
+    """只差空白或大小写的写法共用一条记忆"""
+    parser = RelativeTimeParser()
+    now = datetime(2026, 1, 1)
+    for text in ['3 days ago', ' 3  days ago ', '3 Days Ago', '3 DAYS AGO\n']:
+        assert parser.parse(text, now) == now - timedelta(days=3)
+    stats = parser.get_stats()
+    assert stats['memo_size'] == 1
+    assert stats['misses'] == 1 and stats['hits'] == 3
+
+def test_counters_under_threads():
+    """多个检查线程同时解析时命中/未命中计数不丢"""
+    parser = RelativeTimeParser()
+    now = datetime(2026, 1, 1)
+    texts = [f'{n}天前' for n in range(50)]
+
+    def work():
+        for _ in range(20):
+            for text in texts:
+                parser.parse(text, now)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = parser.get_stats()
+    assert stats['hits'] + stats['misses'] == 8 * 20 * len(texts)
+    assert stats['memo_size'] == len(texts)
+
+if __name__ == "__main__":
+    test_matches_legacy()
+    test_memo_applies_to_given_timestamp()
+    test_memo_keyed_by_normalized_text()
+    test_counters_under_threads()
+    print("✅ 全部通过")
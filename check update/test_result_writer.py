@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试检查结果写入线程
+按批提交、视频去重、检查点；写不进去的记录重试后单独丢弃，同批其余记录照常提交
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+from models.database import init_db, get_engine, Bookmark, CheckRun
+from services.result_writer import ResultWriter
+
+def _make_db(count):
+    path = os.path.join(tempfile.mkdtemp(prefix='test_result_writer_'), 'writer.sqlite')
+    session = init_db(path)
+    session.add_all([Bookmark(url=f'https://example.test/u/{i}', name=f'u{i}') for i in range(count)])
+    run = CheckRun(total=count)
+    session.add(run)
+    session.commit()
+    ids = [row[0] for row in session.query(Bookmark.id).order_by(Bookmark.id)]
+    run_id = run.id
+    session.close()
+    return get_engine(path), ids, run_id
+
+def _record(bookmark_id, run_id, checked_at, videos):
+    return {
+        'bookmark_id': bookmark_id,
+        'checked_at': checked_at,
+        'last_video_id': videos[0]['video_id'] if videos else None,
+        'next_check_at': checked_at + timedelta(hours=6),
+        'videos': videos,
+        'run_id': run_id
+    }
+
+def test_batches_and_checkpoints():
+    """多条记录合并成少量事务；同一视频重复写入只留一行，检查点逐条记录"""
+    engine, ids, run_id = _make_db(30)
+    checked_at = datetime(2026, 1, 1, 12, 0, 0)
+    writer = ResultWriter(engine, batch_size=10, flush_ms=50).start()
+    for bookmark_id in ids:
+        videos = [{'video_id': f'v{bookmark_id}-{n}', 'title': f't{n}'} for n in range(3)]
+        writer.put(_record(bookmark_id, run_id, checked_at, videos))
+    # 同一批视频再写一次：只刷新，不新增
+    writer.put(_record(ids[0], run_id, checked_at, [{'video_id': f'v{ids[0]}-0', 'title': 'renamed'}]))
+    writer.close()
+
+    stats = writer.get_stats()
+    assert stats['records'] == 31
+    assert stats['batches'] <= 5
+    assert stats['max_batch_size'] <= 10
+    assert stats['errors'] == 0 and stats['dropped'] == 0
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT COUNT(*) FROM videos')).scalar() == 90
+        assert conn.execute(text('SELECT COUNT(*) FROM check_run_items WHERE run_id = :r'),
+                            {'r': run_id}).scalar() == 30
+        assert conn.execute(text("SELECT title FROM videos WHERE video_id = :v"),
+                            {'v': f'v{ids[0]}-0'}).scalar() == 'renamed'
+        assert conn.execute(text('SELECT MIN(check_count) FROM bookmarks')).scalar() >= 1
+
+def test_bad_record_dropped_alone():
+    """一条违反约束的记录：整批重试后逐条提交，只丢这一条，其余结果和检查点都写入"""
+    engine, ids, run_id = _make_db(5)
+    checked_at = datetime(2026, 1, 1, 12, 0, 0)
+    writer = ResultWriter(engine, batch_size=100, flush_ms=200, retries=1, retry_delay=0).start()
+    for bookmark_id in ids:
+        writer.put(_record(bookmark_id, run_id, checked_at, [{'video_id': f'v{bookmark_id}'}]))
+    # check_history.bookmark_id 不可为空
+    writer.put({'history': {'bookmark_id': None, 'checked_at': checked_at, 'status': 'error'}})
+    writer.close()
+
+    stats = writer.get_stats()
+    assert stats['dropped'] == 1
+    assert stats['retried'] == 1
+    assert stats['errors'] == 2
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT COUNT(*) FROM videos')).scalar() == 5
+        assert conn.execute(text('SELECT COUNT(*) FROM check_run_items')).scalar() == 5
+        assert conn.execute(text('SELECT COUNT(*) FROM check_history')).scalar() == 0
+
+if __name__ == "__main__":
+    test_batches_and_checkpoints()
+    test_bad_record_dropped_alone()
+    print("✅ 全部通过")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试检查调度
+按到期时间派发、域名未就绪的书签放进等待列表、域名最小间隔和醒来时间、
+抓完第一页即归还域名名额
+"""
+
+import sys
+import os
+import time
+import threading
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from services.update_checker import UpdateChecker, _DueQueue
+from services.check_result import CheckResult, NO_CHANGE
+from services.request_manager import request_manager
+
+@pytest.fixture
+def limits(monkeypatch):
+    """默认：不限间隔、每个域名一个名额、请求管理器不要求等待"""
+    monkeypatch.setattr(request_manager, 'domain_min_interval', 0.0)
+    monkeypatch.setattr(request_manager, 'domain_max_concurrency', 1)
+    monkeypatch.setattr(request_manager, 'ready_in', lambda domain: 0.0)
+    return monkeypatch
+
+def _names(ready):
+    return [bookmark for bookmark, _ in ready]
+
+def test_dispatch_in_due_order(limits):
+    """已到期的书签按到期时间派发，未到期的留在队列并决定醒来时间"""
+    now = time.time()
+    queue = _DueQueue(max_workers=10)
+    queue.push(now - 10, 'c', 'c.test')
+    queue.push(now - 30, 'a', 'a.test')
+    queue.push(now - 20, 'b', 'b.test')
+    queue.push(now + 60, 'later', 'd.test')
+    assert _names(queue.pop_ready(0)) == ['a', 'b', 'c']
+    assert len(queue) == 1
+    assert 59 < queue.next_wakeup() <= 60
+
+def test_capacity_limits_dispatch(limits):
+    """空闲线程数决定一次最多派发几个"""
+    queue = _DueQueue(max_workers=2)
+    for name in 'abc':
+        queue.push(0, name, f'{name}.test')
+    assert _names(queue.pop_ready(0)) == ['a', 'b']
+    assert queue.pop_ready(2) == []
+    assert _names(queue.pop_ready(1)) == ['c']
+
+def test_blocked_domain_parked(limits):
+    """域名名额用完时书签进等待列表，不挡住其他域名；归还名额后按原顺序派发"""
+    queue = _DueQueue(max_workers=10)
+    queue.push(1, 'a1', 'a.test')
+    queue.push(2, 'a2', 'a.test')
+    queue.push(3, 'b1', 'b.test')
+    queue.push(4, 'a3', 'a.test')
+    assert _names(queue.pop_ready(0)) == ['a1', 'b1']
+    # 等待列表里的书签不再回到堆里
+    assert queue._heap == []
+    assert [item[2] for item in queue._blocked['a.test']] == ['a2', 'a3']
+    assert len(queue) == 2
+    # 名额满时不需要定时醒来，等任务完成
+    assert queue.next_wakeup() is None
+    assert queue.pop_ready(2) == []
+
+    queue.finish('a.test')
+    assert _names(queue.pop_ready(1)) == ['a2']
+    queue.finish('a.test')
+    assert _names(queue.pop_ready(1)) == ['a3']
+    assert len(queue) == 0 and 'a.test' not in queue._blocked
+
+def test_min_interval_sets_wakeup(limits):
+    """同一域名两次派发之间至少隔 domain_min_interval；请求管理器要求等待时按它醒来"""
+    limits.setattr(request_manager, 'domain_min_interval', 5.0)
+    limits.setattr(request_manager, 'domain_max_concurrency', 2)
+    limits.setattr(request_manager, 'ready_in', lambda domain: 3.0 if domain == 'slow.test' else 0.0)
+    queue = _DueQueue(max_workers=10)
+    queue.push(0, 'a1', 'a.test')
+    queue.push(0, 'a2', 'a.test')
+    queue.push(0, 's1', 'slow.test')
+    assert _names(queue.pop_ready(0)) == ['a1']
+    assert 2.9 < queue.next_wakeup() <= 3.0
+
+    limits.setattr(request_manager, 'ready_in', lambda domain: 0.0)
+    assert _names(queue.pop_ready(1)) == ['s1']
+    assert 4.0 < queue.next_wakeup() <= 5.0
+    assert queue.drain() == ['a2']
+
+def test_domain_slot_released_after_fetch(limits):
+    """检查线程抓完第一页就归还域名名额，同一域名的解析和写入可以并行"""
+    limits.setattr(request_manager, 'domain_max_concurrency', 1)
+    checker = UpdateChecker(None, max_workers=4)
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def check(bookmark, update_range_days, queued_at=None, dispatched_at=None, fetched=None):
+        nonlocal active, peak
+        fetched()
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.2)  # 解析和写入
+        with lock:
+            active -= 1
+        return CheckResult(NO_CHANGE, bookmark)
+
+    checker._check_bookmark_safe = check
+    queue = _DueQueue(checker.max_workers)
+    bookmarks = [SimpleNamespace(id=i, name=f'b{i}', url=f'https://a.test/u/{i}') for i in range(4)]
+    for bookmark in bookmarks:
+        queue.push(0, bookmark, 'a.test')
+    results = []
+    started = time.monotonic()
+    checker._dispatch(queue, 7, results.append)
+    assert len(results) == 4
+    assert peak == 4
+    assert time.monotonic() - started < 0.6
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试检查耗时追踪
+检查一个书签导出的 Chrome trace：各阶段为带 ts/dur 的 X 事件并按时间嵌套，排队为成对的 b/e 事件
+"""
+
+import sys
+import os
+import json
+import tempfile
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from models.database import init_db, Bookmark, Settings
+from services.update_checker import UpdateChecker
+from services.request_manager import request_manager
+from utils.tracing import tracer
+from benchmarks.synthetic import make_videos, render_creator_page
+
+@pytest.fixture
+def site(monkeypatch):
+    """不限速，请求由桩直接返回合成页面"""
+    monkeypatch.setattr(request_manager, 'domain_min_interval', 0.0)
+    monkeypatch.setattr(request_manager, 'ready_in', lambda domain: 0.0)
+    html = render_creator_page('a', make_videos(31, 6, now=datetime.now())).encode('utf-8')
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = requests.structures.CaseInsensitiveDict({'Content-Type': 'text/html; charset=utf-8'})
+        response._content = html
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(milliseconds=2)
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, 'send', send)
+
+def _inside(inner, outer):
+    return outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur'] + 0.001
+
+def test_trace_of_one_bookmark_check(site):
+    work_dir = tempfile.mkdtemp(prefix='test_tracing_')
+    session = init_db(os.path.join(work_dir, 'trace.sqlite'))
+    session.add(Settings(update_range_days=7))
+    session.add(Bookmark(id=1, url='http://example.test/user.htm?author=a', name='a'))
+    session.commit()
+    checker = UpdateChecker(session, max_workers=1, parse_processes=0, adaptive=False, trace=True)
+    checker.trace_dir = work_dir
+    kinds = [result.kind for result in checker.iter_check_results()]
+    assert kinds == ['update']
+    assert not tracer.enabled
+
+    with open(checker.last_trace_path, encoding='utf-8') as f:
+        trace = json.load(f)
+    assert trace['metadata']['run_id'] is not None
+    events = trace['traceEvents']
+    spans = {}
+    for event in events:
+        if event['ph'] == 'X':
+            assert event['ts'] >= 0 and event['dur'] >= 0
+            spans.setdefault(event['name'], event)
+    assert {'check', 'fetch', 'http.connect_wait', 'http.download', 'parse', 'save'} <= set(spans)
+
+    check = spans['check']
+    assert check['args']['bookmark_id'] == 1 and check['args']['kind'] == 'update'
+    for name in ('fetch', 'http.connect_wait', 'http.download', 'parse', 'save'):
+        assert spans[name]['tid'] == check['tid']
+        assert _inside(spans[name], check), name
+    assert _inside(spans['http.connect_wait'], spans['fetch'])
+    assert spans['fetch']['ts'] + spans['fetch']['dur'] <= spans['parse']['ts'] + 0.001
+    assert spans['parse']['args']['new_videos'] == 1
+
+    # 排队区间：同一 id 的 b/e 事件，结束不早于开始，且在检查开始之前
+    begin = [event for event in events if event['ph'] == 'b' and event['name'] == 'queue_wait']
+    end = [event for event in events if event['ph'] == 'e' and event['name'] == 'queue_wait']
+    assert len(begin) == len(end) == 1
+    assert begin[0]['id'] == end[0]['id'] == 1
+    assert begin[0]['ts'] <= end[0]['ts'] <= check['ts'] + 0.001
+
+    names = {event['tid']: event['args']['name'] for event in events if event['ph'] == 'M'}
+    assert check['tid'] in names
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-q'])
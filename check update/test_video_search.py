@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试视频搜索
+全文索引随视频写入、标题更新、删除和创作者改名同步；短词、多词和带查询语法字符的搜索词
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+
+from models.database import init_db, get_engine, upsert_videos, Bookmark
+from services.video_search import search_videos, has_search_index
+
+def _make_db():
+    path = os.path.join(tempfile.mkdtemp(prefix='test_video_search_'), 'search.sqlite')
+    session = init_db(path)
+    session.add_all([
+        Bookmark(id=1, url='https://example.test/u/1', name='小明的频道'),
+        Bookmark(id=2, url='https://example.test/u/2', name='Cooking Lab'),
+    ])
+    session.commit()
+    session.close()
+    engine = get_engine(path)
+    with engine.begin() as conn:
+        upsert_videos(conn, [
+            {'bookmark_id': 1, 'video_id': 'a1', 'title': '周末旅行 Vlog 第一集'},
+            {'bookmark_id': 1, 'video_id': 'a2', 'title': '周末旅行 Vlog 第二集'},
+            {'bookmark_id': 2, 'video_id': 'b1', 'title': 'Pasta "AND" Sauce: NEAR perfect'},
+            {'bookmark_id': 2, 'video_id': 'b2', 'title': '100% 手工面包'},
+        ])
+    return engine
+
+def _video_ids(conn, query, **kwargs):
+    return [row['video']['video_id'] for row in search_videos(conn, query, **kwargs)]
+
+def test_search_terms():
+    """子串、多词同时命中、创作者名、不区分大小写，最近入库的在前"""
+    engine = _make_db()
+    with engine.connect() as conn:
+        assert has_search_index(conn)
+        assert _video_ids(conn, '旅行 vlog') == ['a2', 'a1']
+        assert _video_ids(conn, '第二集') == ['a2']
+        assert _video_ids(conn, 'cooking') == ['b2', 'b1']
+        assert _video_ids(conn, '小明 第一') == ['a1']
+        assert _video_ids(conn, '旅行', limit=1) == ['a2']
+        assert _video_ids(conn, '   ') == []
+
+def test_short_and_special_terms():
+    """少于三个字符的词退回 LIKE；引号、AND/NEAR、% 按字面匹配"""
+    engine = _make_db()
+    with engine.connect() as conn:
+        assert _video_ids(conn, '面包') == ['b2']
+        assert _video_ids(conn, '"AND"') == ['b1']
+        assert _video_ids(conn, 'NEAR') == ['b1']
+        assert _video_ids(conn, 'Sauce:') == ['b1']
+        assert _video_ids(conn, '100%') == ['b2']
+        assert _video_ids(conn, '0%') == ['b2']
+        assert _video_ids(conn, '_') == []
+
+def test_index_follows_writes():
+    """标题更新、删除视频、创作者改名后搜索结果随之变化"""
+    engine = _make_db()
+    with engine.begin() as conn:
+        upsert_videos(conn, [{'bookmark_id': 1, 'video_id': 'a1', 'title': '山间露营'}])
+        conn.execute(text("DELETE FROM videos WHERE video_id = 'b2'"))
+        conn.execute(text("UPDATE bookmarks SET name = 'Baking Lab' WHERE id = 2"))
+    with engine.connect() as conn:
+        assert _video_ids(conn, '第一集') == []
+        assert _video_ids(conn, '露营') == ['a1']
+        assert _video_ids(conn, '面包') == []
+        assert _video_ids(conn, 'cooking') == []
+        assert _video_ids(conn, 'baking') == ['b1']
+        assert conn.execute(text('SELECT COUNT(*) FROM videos_fts')).scalar() == 3
+
+if __name__ == "__main__":
+    test_search_terms()
+    test_short_and_special_terms()
+    test_index_follows_writes()
+    print("✅ 全部通过")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Web 后端接口测试
+用临时数据库（CHECKER_DB_PATH）启动 web-platform/backend/app.py，不碰仓库里的数据库
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from sqlalchemy import text
+
+pytest.importorskip('fastapi')
+pytest.importorskip('httpx')
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'web-platform', 'backend')
+
+@pytest.fixture(scope='module')
+def api():
+    work_dir = tempfile.mkdtemp(prefix='test_web_api_')
+    os.environ['CHECKER_DB_PATH'] = os.path.join(work_dir, 'api.sqlite')
+    sys.path.append(os.path.normpath(BACKEND_DIR))
+    import app as backend
+    from fastapi.testclient import TestClient
+    try:
+        yield backend, TestClient(backend.app)
+    finally:
+        os.environ.pop('CHECKER_DB_PATH', None)
+
+def test_stats_exposes_selector_counters(api):
+    """GET /api/stats 返回在线状态和选择器命中统计，HEAD 仍可用于在线检测"""
+    _, client = api
+    response = client.get('/api/stats')
+    assert response.status_code == 200
+    data = response.json()
+    assert data['status'] == 'online'
+    assert {'hits', 'misses', 'fast_path'} <= set(data['selectors'])
+    assert 'request' in data and 'cache' in data
+    assert client.head('/api/stats').status_code == 200
+
+def _add_bookmarks(backend, count):
+    from models.database import Bookmark
+    with backend.engine.begin() as conn:
+        conn.execute(Bookmark.__table__.delete())
+        conn.execute(Bookmark.__table__.insert(),
+                     [{'url': f'https://example.test/u/{i}', 'name': f'u{i}'} for i in range(count)])
+
+def test_bookmarks_keyset_pages(api):
+    """不带参数返回全部书签；带 limit 时按 next_cursor 逐页取完，不重不漏"""
+    backend, client = api
+    _add_bookmarks(backend, 25)
+    everything = client.get('/api/bookmarks').json()
+    assert len(everything['data']) == 25 and not everything['has_more']
+
+    seen, after = [], None
+    while True:
+        params = {'limit': 10} if after is None else {'limit': 10, 'after': after}
+        page = client.get('/api/bookmarks', params=params).json()
+        seen += [item['id'] for item in page['data']]
+        after = page['next_cursor']
+        if not page['has_more']:
+            break
+    assert seen == [item['id'] for item in everything['data']]
+
+def test_bookmarks_etag(api):
+    """ETag 相同回 304；改名后 ETag 变化，检查时间更新不影响"""
+    backend, client = api
+    _add_bookmarks(backend, 3)
+    first = client.get('/api/bookmarks')
+    etag = first.headers['etag']
+    assert client.get('/api/bookmarks', headers={'If-None-Match': etag}).status_code == 304
+
+    with backend.engine.begin() as conn:
+        conn.execute(text("UPDATE bookmarks SET last_check_time = CURRENT_TIMESTAMP"))
+    assert client.get('/api/bookmarks', headers={'If-None-Match': etag}).status_code == 304
+
+    with backend.engine.begin() as conn:
+        conn.execute(text("UPDATE bookmarks SET name = 'renamed' WHERE id = (SELECT MIN(id) FROM bookmarks)"))
+    changed = client.get('/api/bookmarks', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['etag'] != etag
+    assert changed.json()['data'][0]['name'] == 'renamed'
+
+def test_reliability_names_and_rates(api):
+    """GET /api/reliability 按错误率排序并附上创作者名"""
+    from datetime import datetime, timedelta
+    from services.check_history import insert_history
+    backend, client = api
+    _add_bookmarks(backend, 2)
+    with backend.engine.begin() as conn:
+        conn.execute(text('DELETE FROM check_history'))
+        first, second = [row[0] for row in conn.execute(text('SELECT id FROM bookmarks ORDER BY id'))]
+        checked_at = datetime.now() - timedelta(hours=1)
+        insert_history(conn, [
+            {'bookmark_id': bookmark_id, 'run_id': None, 'checked_at': checked_at, 'status': status,
+             'http_status': 200, 'bytes': 100, 'latency_ms': 10.0, 'cache': 'miss', 'videos': 0}
+            for bookmark_id, status in ((first, 'no_change'), (second, 'error'), (second, 'update'))
+        ])
+    data = client.get('/api/reliability', params={'days': 7}).json()['data']
+    assert [(row['name'], row['checks'], row['error_rate']) for row in data] == [('u1', 2, 0.5), ('u0', 1, 0.0)]
+    only = client.get('/api/reliability', params={'bookmark_id': first}).json()['data']
+    assert [row['bookmark_id'] for row in only] == [first]
+
+def test_updates_cursor_and_etag(api):
+    """轮询只取新增条目；没有新条目时回 304，清空后旧游标仍可用"""
+    backend, client = api
+    backend.clear_updates()
+    for i in range(3):
+        backend.add_update({'bookmark': {'id': i}, 'status': 'update'})
+    page = client.get('/api/updates', params={'after': 0}).json()
+    assert len(page['data']) == 3
+    cursor = page['next_cursor']
+
+    idle = client.get('/api/updates', params={'after': cursor})
+    assert idle.json()['data'] == []
+    assert client.get('/api/updates', params={'after': cursor},
+                      headers={'If-None-Match': idle.headers['etag']}).status_code == 304
+
+    backend.add_update({'bookmark': {'id': 9}, 'status': 'update'})
+    fresh = client.get('/api/updates', params={'after': cursor},
+                       headers={'If-None-Match': idle.headers['etag']})
+    assert fresh.status_code == 200
+    assert [item['bookmark']['id'] for item in fresh.json()['data']] == [9]
+    assert len(client.get('/api/updates').json()['data']) == 4
+
+    backend.clear_updates()
+    backend.add_update({'bookmark': {'id': 10}, 'status': 'update'})
+    after_clear = client.get('/api/updates', params={'after': fresh.json()['next_cursor']}).json()
+    assert [item['bookmark']['id'] for item in after_clear['data']] == [10]
+
+def test_updates_etag_changes_after_restart(api, monkeypatch):
+    """重启后版本号从头计数，可能与重启前相同；ETag 带启动标识，旧 ETag 不会误回 304"""
+    backend, client = api
+    backend.clear_updates()
+    etag = client.get('/api/updates', params={'after': 0}).headers['etag']
+    assert client.get('/api/updates', params={'after': 0}, headers={'If-None-Match': etag}).status_code == 304
+    monkeypatch.setattr(backend, 'BOOT_ID', 'restarted')
+    response = client.get('/api/updates', params={'after': 0}, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
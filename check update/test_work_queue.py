@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试分片检查的工作队列
+领取互不重叠、租约过期后被重新领取、只有租约持有者能完成/续租、失败的书签按次数放回
+"""
+
+import sys
+import os
+import time
+import tempfile
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.database import init_db, get_engine, CheckRun
+from services.work_queue import WorkQueue
+from services.result_writer import ResultWriter
+
+def _make_queue(count, **kwargs):
+    path = os.path.join(tempfile.mkdtemp(prefix='test_work_queue_'), 'queue.sqlite')
+    session = init_db(path)
+    run = CheckRun(total=count)
+    session.add(run)
+    session.commit()
+    run_id = run.id
+    session.close()
+    queue = WorkQueue(get_engine(path), run_id, **kwargs)
+    queue.enqueue(range(1, count + 1))
+    return queue
+
+def test_lease_is_exclusive():
+    """两个进程领取的书签互不重叠，重复入队被忽略"""
+    queue = _make_queue(10)
+    queue.enqueue([1, 2, 3])
+    first = queue.lease('a', 6)
+    second = queue.lease('b', 6)
+    assert len(first) == 6 and len(second) == 4
+    assert not set(first) & set(second)
+    assert queue.lease('c', 6) == []
+    assert queue.counts() == {'leased': 10}
+
+def test_expired_lease_taken_over():
+    """租约过期后别的进程可以接手，旧持有者的完成和续租不再生效"""
+    queue = _make_queue(2, lease_seconds=0.05)
+    assert queue.lease('a', 1) == [1]
+    time.sleep(0.1)
+    assert queue.lease('b', 2) == [1, 2]
+    assert queue.extend('a', [1]) == 0
+    queue.complete('a', 1)
+    assert queue.counts() == {'leased': 2}
+    queue.complete('b', 1)
+    queue.complete('b', 2)
+    assert queue.counts() == {'done': 2}
+    assert queue.is_finished()
+
+def test_extend_keeps_lease():
+    """续租后租约不会在原到期时间过期"""
+    queue = _make_queue(1, lease_seconds=0.2)
+    assert queue.lease('a', 1) == [1]
+    time.sleep(0.15)
+    assert queue.extend('a', [1]) == 1
+    time.sleep(0.1)
+    assert queue.lease('b', 1) == []
+
+def test_error_requeued_until_max_attempts():
+    """失败的书签放回队列，尝试次数用完后停在 error；归还的书签不计次数"""
+    queue = _make_queue(1, max_attempts=2)
+    assert queue.lease('a', 1) == [1]
+    queue.release('a', 1)
+    assert queue.lease('a', 1) == [1]
+    queue.complete('a', 1, 'error')
+    assert queue.counts() == {'pending': 1}
+    assert queue.lease('b', 1) == [1]
+    queue.complete('b', 1, 'error')
+    assert queue.counts() == {'error': 1}
+    assert queue.lease('c', 1) == []
+    assert queue.is_finished()
+
+def test_writer_completes_with_result():
+    """写入线程提交检查结果时在同一事务里完成书签"""
+    queue = _make_queue(2)
+    assert queue.lease('a', 2) == [1, 2]
+    writer = ResultWriter(queue.engine, flush_ms=20).start()
+    writer.put({'history': {'bookmark_id': 1, 'checked_at': datetime.now(), 'status': 'no_change'},
+                'work_item': queue.item('a', 1)})
+    writer.put({'work_item': queue.item('a', 2, 'error')})
+    writer.close()
+    assert queue.counts() == {'done': 1, 'pending': 1}
+
+if __name__ == "__main__":
+    test_lease_is_exclusive()
+    test_expired_lease_taken_over()
+    test_extend_keeps_lease()
+    test_error_requeued_until_max_attempts()
+    test_writer_completes_with_result()
+    print("✅ 全部通过")
@@ -371,6 +371,8 @@ class MainWindow(QMainWindow):
         cache_shortcut.activated.connect(self.clear_cache)
     
     def closeEvent(self, event):
+        # 停止正在进行的检查
+        self.update_checker.stop()
         # 停止所有图片加载线程
         for loader in self.image_loaders:
             loader.stop()
@@ -497,6 +499,7 @@ class MainWindow(QMainWindow):
 
         self.progress_dialog = QProgressDialog("正在检查更新...", "取消", 0, 100, self)
         self.progress_dialog.setWindowModality(Qt.WindowModality.NonModal)
+        self.progress_dialog.canceled.connect(self.update_checker.stop)
         self.progress_dialog.show()
 
         self.update_thread = UpdateCheckThread(self.session, self.update_checker)
@@ -506,9 +509,17 @@ class MainWindow(QMainWindow):
         self.update_thread.error.connect(self.on_update_check_error)
         self.update_thread.start()
 
+    def _close_progress_dialog(self):
+        """关闭进度对话框；先断开 canceled，close() 发出的 canceled 不应停止检查器"""
+        try:
+            self.progress_dialog.canceled.disconnect(self.update_checker.stop)
+        except TypeError:
+            pass
+        self.progress_dialog.close()
+
     def on_update_check_finished(self, updates):
         """更新检查完成后的处理"""
-        self.progress_dialog.close()
+        self._close_progress_dialog()
         if not updates:
             if self.update_list_layout.count() == 0:
                 self.update_list_layout.addWidget(QLabel("没有发现更新。"))
@@ -519,7 +530,7 @@ class MainWindow(QMainWindow):
 
     def on_update_check_error(self, error_message):
         """更新检查出错时的处理"""
-        self.progress_dialog.close()
+        self._close_progress_dialog()
         self.logger.error(f"检查更新失败: {error_message}")
         QMessageBox.critical(self, "错误", f"检查更新失败: {error_message}")
 
@@ -973,6 +984,7 @@ class MainWindow(QMainWindow):
         try:
             from services.request_manager import request_manager
             from utils.page_cache import page_cache
+            from utils.selector_memo import selector_memo
             
             bookmark_count = self.session.query(Bookmark).count()
             video_count = self.session.query(Video).count()
@@ -1000,6 +1012,11 @@ class MainWindow(QMainWindow):
             # 请求管理器统计
             req_stats = request_manager.get_statistics()
             
+            # 选择器记忆统计
+            memo_stats = selector_memo.get_stats()
+            memo_hits = sum(memo_stats['hits'].values())
+            memo_misses = sum(memo_stats['misses'].values())
+            
             # 计算书签活跃度
             active_bookmarks = self.session.query(Bookmark).filter(
                 Bookmark.update_frequency <= 7
@@ -1018,6 +1035,8 @@ class MainWindow(QMainWindow):
 📄 页面缓存: {page_stats['disk_size_mb']:.2f} MB
 💾 内存缓存: {page_stats['memory_cached']} 个页面
 📦 磁盘缓存: {page_stats['disk_cached']} 个页面
+🎯 选择器记忆: 命中 {memo_hits} / 未命中 {memo_misses} ({memo_stats['hit_rate']:.0%})
+⚡ 快速解析: {memo_stats['fast_path']['pages']} 页 / 回退 {memo_stats['fast_path']['fallbacks']} 次
 
 ═══ 请求统计 ═══
 🌐 总请求数: {req_stats['total_requests']}
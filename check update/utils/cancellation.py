@@ -0,0 +1,54 @@
+"""
+协作式取消
+检查线程里的所有等待都通过取消令牌进行，调用 cancel() 后正在等待的线程立即醒来，
+不必睡满重试/限速/Cloudflare 的等待时间
+"""
+
+import time
+import threading
+from typing import Optional
+
+class CheckCancelled(Exception):
+    """检查已被取消"""
+
+class CancelToken:
+    """取消令牌（线程安全）"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """取消，唤醒所有正在等待的线程"""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def sleep(self, seconds: float) -> bool:
+        """
+        可被取消的 time.sleep
+
+        Returns:
+            True 表示等待期间被取消
+        """
+        if seconds <= 0:
+            return self._event.is_set()
+        return self._event.wait(seconds)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise CheckCancelled()
+
+    def sleep_or_raise(self, seconds: float):
+        """等待指定时间，被取消时抛出 CheckCancelled"""
+        if self.sleep(seconds):
+            raise CheckCancelled()
+
+def sleep(seconds: float, token: Optional[CancelToken] = None):
+    """可选令牌的等待：没有令牌时等同 time.sleep，有令牌且被取消时抛出 CheckCancelled"""
+    if token is None:
+        if seconds > 0:
+            time.sleep(seconds)
+        return
+    token.sleep_or_raise(seconds)
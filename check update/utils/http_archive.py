@@ -0,0 +1,196 @@
+"""
+HTTP 录制与回放
+录制模式把一次检查的每个请求和响应（状态码、响应头、正文、耗时）写入压缩归档；
+回放模式不连网，按归档返回响应并按录制时的耗时（可缩放）等待，
+这样 WebScraper / UpdateChecker 的改动可以离线、可复现地跑完整检查做对比
+"""
+
+import gzip
+import json
+import time
+import base64
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# 正文以解码后的形式保存，这些头与保存的正文不再对应
+_DROPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'set-cookie')
+
+def load_archive(path: str) -> List[Dict]:
+    """读取归档：gzip 压缩的 JSON Lines，每行一个请求"""
+    entries = []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    return entries
+
+def _encode_body(content: bytes) -> Dict:
+    try:
+        return {'body': content.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'body_b64': base64.b64encode(content).decode('ascii')}
+
+def _decode_body(entry: Dict) -> bytes:
+    if 'body_b64' in entry:
+        return base64.b64decode(entry['body_b64'])
+    return entry.get('body', '').encode('utf-8')
+
+class RecordingAdapter(HTTPAdapter):
+    """正常发出请求，同时把请求和响应写入归档"""
+
+    def __init__(self, recorder: 'HttpArchiveManager', **kwargs):
+        super().__init__(**kwargs)
+        self.recorder = recorder
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        offset = time.time() - self.recorder.started_at
+        try:
+            response = super().send(request, **kwargs)
+            content = response.content  # 读完正文再计时
+        except Exception as e:
+            self.recorder.write({
+                't': round(offset, 3), 'method': request.method, 'url': request.url,
+                'error': type(e).__name__, 'elapsed': round(time.perf_counter() - started, 4)
+            })
+            raise
+        entry = {
+            't': round(offset, 3), 'method': request.method, 'url': request.url,
+            'status': response.status_code, 'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+            'elapsed': round(time.perf_counter() - started, 4)
+        }
+        entry.update(_encode_body(content))
+        self.recorder.write(entry)
+        return response
+
+class ReplayAdapter(BaseAdapter):
+    """从归档返回响应，不发出网络请求"""
+
+    def __init__(self, entries: List[Dict], latency_scale: float = 1.0):
+        """
+        Args:
+            entries: 归档条目（按录制顺序）
+            latency_scale: 等待时间 = 录制耗时 × 该比例，0 表示不等待
+        """
+        super().__init__()
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        # 同一地址请求了多次（重试、翻页回退）时按录制顺序依次返回，用完后重复最后一个
+        self._entries = defaultdict(list)
+        for entry in entries:
+            self._entries[(entry['method'], entry['url'])].append(entry)
+        self._cursor = defaultdict(int)
+        self.served = 0
+        self.misses = 0
+
+    def _next_entry(self, key) -> Optional[Dict]:
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                return None
+            index = self._cursor[key]
+            self._cursor[key] = index + 1
+            self.served += 1
+            return entries[min(index, len(entries) - 1)]
+
+    def send(self, request, **kwargs):
+        entry = self._next_entry((request.method, request.url))
+        if entry is None:
+            raise requests.exceptions.ConnectionError(f"回放归档中没有该请求: {request.url}", request=request)
+        if self.latency_scale > 0:
+            time.sleep(entry.get('elapsed', 0) * self.latency_scale)
+        if 'error' in entry:
+            raise requests.exceptions.ConnectionError(f"录制时请求失败: {entry['error']}", request=request)
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason', '')
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = _decode_body(entry)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+class HttpArchiveManager:
+    """录制/回放开关；开启后 WebScraper 新建的会话都会挂上对应的适配器"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.mode = None
+        self.path = None
+        self.started_at = 0.0
+        self._file = None
+        self._write_lock = threading.Lock()
+        self._replay = None
+        self.recorded = 0
+
+    def record(self, path: str):
+        """开始录制到 path（覆盖已有文件）"""
+        self.stop()
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self.mode = 'record'
+        self.path = path
+        self.started_at = time.time()
+        self.recorded = 0
+        self.logger.info(f"🎙️ 开始录制HTTP归档: {path}")
+
+    def replay(self, path: str, latency_scale: float = 1.0):
+        """开始从 path 回放"""
+        self.stop()
+        entries = load_archive(path)
+        self._replay = ReplayAdapter(entries, latency_scale)
+        self.mode = 'replay'
+        self.path = path
+        self.logger.info(f"▶️ 回放HTTP归档: {path}（{len(entries)} 个请求，耗时×{latency_scale}）")
+
+    def stop(self):
+        """结束录制/回放，录制的归档在此写完"""
+        if self._file is not None:
+            with self._write_lock:
+                self._file.close()
+                self._file = None
+            self.logger.info(f"💾 HTTP归档已保存: {self.path}（{self.recorded} 个请求）")
+        self._replay = None
+        self.mode = None
+
+    def write(self, entry: Dict):
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._write_lock:
+            if self._file is None:
+                return
+            self._file.write(line + '\n')
+            self.recorded += 1
+
+    def mount(self, session: requests.Session):
+        """按当前模式给会话挂上录制或回放适配器，未开启时什么也不做"""
+        if self.mode == 'record':
+            adapter = RecordingAdapter(self)
+        elif self.mode == 'replay':
+            adapter = self._replay
+        else:
+            return
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+    def get_stats(self) -> Dict:
+        stats = {'mode': self.mode, 'path': self.path, 'recorded': self.recorded}
+        if self._replay is not None:
+            stats.update(served=self._replay.served, misses=self._replay.misses)
+        return stats
+
+# 全局实例
+http_archive = HttpArchiveManager()
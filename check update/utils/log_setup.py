@@ -0,0 +1,79 @@
+"""
+日志配置
+所有线程只把日志记录放进队列，由单独的监听线程写文件和控制台，
+检查线程不会因为日志I/O或FileHandler的锁而阻塞
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+from typing import Optional
+
+from config.settings import LOG_FORMAT, LOG_LEVEL, LOG_DEBUG_SAMPLE_RATE
+
+class DebugSampler(logging.Filter):
+    """按比例采样DEBUG日志，INFO及以上全部保留"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+_listener = None
+
+def setup_logging(log_file: Optional[str] = None, level=None, debug_sample_rate: float = None,
+                  fmt: str = LOG_FORMAT) -> logging.handlers.QueueListener:
+    """
+    配置根日志：QueueHandler -> 监听线程 -> 文件/控制台
+
+    Args:
+        log_file: 日志文件路径，None 时只输出到控制台
+        level: 日志级别，默认取配置 LOG_LEVEL
+        debug_sample_rate: DEBUG日志采样比例(0~1)，默认取配置
+        fmt: 日志格式
+
+    Returns:
+        已启动的 QueueListener（重复调用返回同一个）
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = level or LOG_LEVEL
+    if debug_sample_rate is None:
+        debug_sample_rate = LOG_DEBUG_SAMPLE_RATE
+
+    formatter = logging.Formatter(fmt)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(DebugSampler(debug_sample_rate))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+def stop_logging():
+    """停止监听线程并写出队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,188 @@
+"""
+相对时间解析
+把"3天前"、"1月前"、"2 days ago"、"2024-01-05"等时间文本转换为datetime
+
+页面上的时间文本高度重复，解析结果按规范化后的文本（合并空白、去掉标点、小写）
+记忆为"相对偏移"或"绝对日期"，再套到调用方给定的基准时间上，
+同一次检查内的重复文本（含只差空白或大小写的写法）只解析一次
+"""
+
+import re
+import threading
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+# 绝大多数文本是单个相对时间，整串匹配即可确定结果
+_RELATIVE_FULL = re.compile(
+    r'(\d+)\s*(?:(day|hour|minute|week|month|year)s?\s*ago|(天|小时|分钟|周|月|年)前)',
+    re.IGNORECASE
+)
+
+_CLEAN = re.compile(r'[^\w\s\-:]+')
+
+# 以下按原解析顺序排列，整串匹配失败时逐个尝试
+_DATE_PATTERNS = [
+    (re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})'), 'ymd'),   # YYYY-MM-DD
+    (re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})'), 'dmy'),   # DD-MM-YYYY
+    (re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})'), 'mdy'),   # MM/DD/YYYY
+    (re.compile(r'(\d{4})/(\d{1,2})/(\d{1,2})'), 'ymd'),   # YYYY/MM/DD
+]
+
+_RELATIVE_PATTERNS = [
+    (re.compile(r'(\d+)\s*day[s]?\s*ago', re.IGNORECASE), 'days'),
+    (re.compile(r'(\d+)\s*hour[s]?\s*ago', re.IGNORECASE), 'hours'),
+    (re.compile(r'(\d+)\s*minute[s]?\s*ago', re.IGNORECASE), 'minutes'),
+    (re.compile(r'(\d+)\s*week[s]?\s*ago', re.IGNORECASE), 'weeks'),
+    (re.compile(r'(\d+)\s*month[s]?\s*ago', re.IGNORECASE), 'months'),
+    (re.compile(r'(\d+)\s*year[s]?\s*ago', re.IGNORECASE), 'years'),
+    # 中文格式
+    (re.compile(r'(\d+)\s*天前'), 'days'),
+    (re.compile(r'(\d+)\s*小时前'), 'hours'),
+    (re.compile(r'(\d+)\s*分钟前'), 'minutes'),
+    (re.compile(r'(\d+)\s*周前'), 'weeks'),
+    (re.compile(r'(\d+)\s*月前'), 'months'),
+    (re.compile(r'(\d+)\s*年前'), 'years')
+]
+
+_MONTH_PATTERNS = [
+    re.compile(r'(\w+)\s+(\d{1,2}),?\s+(\d{4})', re.IGNORECASE),  # Month DD, YYYY
+    re.compile(r'(\d{1,2})\s+(\w+)\s+(\d{4})', re.IGNORECASE),    # DD Month YYYY
+]
+
+_MONTH_MAP = {
+    'jan': 1, 'january': 1, 'feb': 2, 'february': 2, 'mar': 3, 'march': 3,
+    'apr': 4, 'april': 4, 'may': 5, 'jun': 6, 'june': 6,
+    'jul': 7, 'july': 7, 'aug': 8, 'august': 8,
+    'sep': 9, 'september': 9, 'oct': 10, 'october': 10,
+    'nov': 11, 'november': 11, 'dec': 12, 'december': 12
+}
+
+_UNIT_OFFSETS = {
+    'days': timedelta(days=1),
+    'hours': timedelta(hours=1),
+    'minutes': timedelta(minutes=1),
+    'weeks': timedelta(weeks=1),
+    'months': timedelta(days=30),
+    'years': timedelta(days=365),
+}
+
+_UNIT_NAMES = {
+    'day': 'days', 'hour': 'hours', 'minute': 'minutes', 'week': 'weeks', 'month': 'months', 'year': 'years',
+    '天': 'days', '小时': 'hours', '分钟': 'minutes', '周': 'weeks', '月': 'months', '年': 'years',
+}
+
+# 记忆中的"无法解析/就是现在"
+_NOW = timedelta(0)
+
+def _normalize(time_str: str) -> str:
+    """记忆的键：合并空白、去掉多余的标点并转小写（各个模式都不区分大小写）"""
+    return _CLEAN.sub('', ' '.join(time_str.split())).strip().lower()
+
+class RelativeTimeParser:
+    """带记忆的相对时间解析器（线程安全）"""
+
+    def __init__(self, memo_limit: int = 4096):
+        self.logger = logging.getLogger(__name__)
+        self.memo_limit = memo_limit
+        self._memo = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, time_str: str, now: Optional[datetime] = None) -> datetime:
+        """
+        将时间字符串转换为datetime对象
+
+        Args:
+            time_str: 页面上的时间文本
+            now: 基准时间（一次检查内固定），默认当前时间
+
+        Returns:
+            相对时间返回 now - 偏移，绝对日期原样返回，无法解析时返回 now
+        """
+        if now is None:
+            now = datetime.now()
+        if not time_str or time_str == '最近更新':
+            return now
+
+        key = _normalize(time_str)
+        with self._lock:
+            result = self._memo.get(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if result is None:
+            # 解析在锁外进行；两个线程同时解析同一文本时结果相同，后写入的覆盖即可
+            result = self._resolve(key)
+            with self._lock:
+                if len(self._memo) >= self.memo_limit:
+                    self._memo.clear()
+                self._memo[key] = result
+
+        if isinstance(result, datetime):
+            return result
+        return now - result
+
+    def _resolve(self, text: str):
+        """解析一次规范化后的文本（见 _normalize），返回偏移量(timedelta)或绝对日期(datetime)"""
+        try:
+            match = _RELATIVE_FULL.fullmatch(text)
+            if match:
+                unit = _UNIT_NAMES[match.group(2) or match.group(3)]
+                return _UNIT_OFFSETS[unit] * int(match.group(1))
+
+            # 首先尝试解析完整日期格式
+            for pattern, order in _DATE_PATTERNS:
+                match = pattern.search(text)
+                if match:
+                    a, b, c = (int(g) for g in match.groups())
+                    if order == 'ymd':
+                        year, month, day = a, b, c
+                    elif order == 'dmy':
+                        day, month, year = a, b, c
+                    else:
+                        month, day, year = a, b, c
+                    try:
+                        return datetime(year, month, day)
+                    except ValueError:
+                        continue
+
+            # 解析相对时间
+            for pattern, unit in _RELATIVE_PATTERNS:
+                match = pattern.search(text)
+                if match:
+                    return _UNIT_OFFSETS[unit] * int(match.group(1))
+
+            # 尝试解析英文月份格式
+            for pattern in _MONTH_PATTERNS:
+                match = pattern.search(text)
+                if match:
+                    groups = match.groups()
+                    month_str = groups[0].lower() if groups[0].isalpha() else groups[1].lower()
+                    month = _MONTH_MAP.get(month_str, 1)
+                    day = int(groups[0]) if groups[0].isdigit() else int(groups[1])
+                    try:
+                        return datetime(int(groups[2]), month, day)
+                    except ValueError:
+                        continue
+
+            self.logger.warning(f"无法解析的时间格式: {text}")
+            return _NOW
+
+        except Exception as e:
+            self.logger.error(f"解析时间失败: {str(e)}")
+            return _NOW
+
+    def get_stats(self) -> dict:
+        """获取记忆统计"""
+        with self._lock:
+            return {
+                'memo_size': len(self._memo),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+# 全局实例
+relative_time_parser = RelativeTimeParser()
@@ -0,0 +1,166 @@
+"""
+选择器记忆
+按域名记住上次成功的容器/标题/时间/缩略图选择器，下次解析时优先尝试
+
+记忆只用于 BeautifulSoup 通用解析；已知布局的站点（FAST_PARSER_DOMAINS）走 lxml 快速路径，
+不经过选择器探测，单独统计快速路径解析的页面数和回退到通用解析的次数
+"""
+
+import os
+import json
+import threading
+import logging
+from typing import Optional
+
+class SelectorMemo:
+    """按域名记忆解析选择器（线程安全，持久化到JSON文件）"""
+
+    KINDS = ('container', 'title', 'time', 'thumbnail')
+
+    def __init__(self, memo_file='cache/selector_memo.json'):
+        """
+        初始化选择器记忆
+
+        Args:
+            memo_file: 持久化文件路径
+        """
+        self.memo_file = memo_file
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # 多个检查线程同时保存时串行写文件
+        self._memo = {}
+        self._dirty = False
+        # 解析子进程里关闭持久化：不写文件，新记住的选择器攒在 _changes 里交给父进程合并
+        self.persist = True
+        self._changes = []
+
+        # 命中统计
+        self.hits = {kind: 0 for kind in self.KINDS}
+        self.misses = {kind: 0 for kind in self.KINDS}
+        self.fast_path = {'pages': 0, 'fallbacks': 0}
+
+        self._load()
+
+    def _load(self):
+        """从磁盘加载记忆"""
+        if not os.path.exists(self.memo_file):
+            return
+        try:
+            with open(self.memo_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._memo = {
+                    domain: {k: v for k, v in kinds.items() if k in self.KINDS}
+                    for domain, kinds in data.items()
+                    if isinstance(kinds, dict)
+                }
+        except Exception as e:
+            self.logger.error(f"读取选择器记忆失败: {str(e)}")
+            self._memo = {}
+
+    def save(self):
+        """保存记忆到磁盘（仅在有变化时写入）"""
+        if not self.persist:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = {domain: dict(kinds) for domain, kinds in self._memo.items()}
+                self._dirty = False
+            try:
+                memo_dir = os.path.dirname(self.memo_file)
+                if memo_dir:
+                    os.makedirs(memo_dir, exist_ok=True)
+                tmp_path = f"{self.memo_file}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.memo_file)
+            except Exception as e:
+                self.logger.error(f"保存选择器记忆失败: {str(e)}")
+
+    def get(self, domain: str, kind: str) -> Optional[str]:
+        """获取某域名上次成功的选择器"""
+        return self._memo.get(domain, {}).get(kind)
+
+    def record_hit(self, kind: str):
+        """记忆的选择器仍然有效"""
+        with self._lock:
+            self.hits[kind] += 1
+
+    def record_fast_path(self, parsed: bool):
+        """lxml 快速路径解析了一个页面（parsed=False 表示布局不符，回退到通用解析）"""
+        with self._lock:
+            self.fast_path['pages' if parsed else 'fallbacks'] += 1
+
+    def remember(self, domain: str, kind: str, selector: str):
+        """
+        记录重新探测得到的选择器（记为一次未命中）
+
+        Args:
+            domain: 域名
+            kind: 选择器类型（container/title/time/thumbnail）
+            selector: 成功的选择器
+        """
+        with self._lock:
+            self.misses[kind] += 1
+            kinds = self._memo.setdefault(domain, {})
+            if kinds.get(kind) != selector:
+                kinds[kind] = selector
+                self._dirty = True
+                if not self.persist:
+                    self._changes.append((domain, kind, selector))
+
+    def forget(self, domain: str):
+        """清除某个域名的记忆"""
+        with self._lock:
+            if self._memo.pop(domain, None) is not None:
+                self._dirty = True
+
+    def take_changes(self) -> dict:
+        """
+        取出自上次调用以来的命中统计和新记住的选择器并清零（解析子进程调用，结果随解析结果返回）
+        """
+        with self._lock:
+            changes = {'hits': dict(self.hits), 'misses': dict(self.misses), 'fast_path': dict(self.fast_path),
+                       'remembered': self._changes}
+            self.hits = {kind: 0 for kind in self.KINDS}
+            self.misses = {kind: 0 for kind in self.KINDS}
+            self.fast_path = {'pages': 0, 'fallbacks': 0}
+            self._changes = []
+        return changes
+
+    def merge_changes(self, changes: dict):
+        """合并解析子进程的 take_changes()，由父进程统一统计和保存"""
+        with self._lock:
+            for kind, count in changes['hits'].items():
+                self.hits[kind] += count
+            for kind, count in changes['misses'].items():
+                self.misses[kind] += count
+            for key, count in changes['fast_path'].items():
+                self.fast_path[key] += count
+            for domain, kind, selector in changes['remembered']:
+                kinds = self._memo.setdefault(domain, {})
+                if kinds.get(kind) != selector:
+                    kinds[kind] = selector
+                    self._dirty = True
+        if changes['remembered']:
+            self.save()
+
+    def get_stats(self) -> dict:
+        """获取命中统计"""
+        with self._lock:
+            total_hits = sum(self.hits.values())
+            total_misses = sum(self.misses.values())
+            total = total_hits + total_misses
+            return {
+                'hits': dict(self.hits),
+                'misses': dict(self.misses),
+                'hit_rate': total_hits / total if total else 0.0,
+                'fast_path': dict(self.fast_path),
+                'domains': len(self._memo)
+            }
+
+# 全局实例
+from config.settings import SELECTOR_MEMO_FILE
+selector_memo = SelectorMemo(memo_file=SELECTOR_MEMO_FILE)
@@ -0,0 +1,137 @@
+"""
+检查耗时追踪
+把每个书签的检查拆成计时区间（排队、限速等待、请求、下载、解析、写库、回调），
+导出为 Chrome / Perfetto 可直接打开的 trace JSON（chrome://tracing 或 ui.perfetto.dev）
+
+未开启时 span() 返回同一个空对象，热点路径上只多一次属性判断
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Dict, List, Optional
+
+class _NullSpan:
+    """未开启追踪时的空区间"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.add_span(self.name, self.start, time.perf_counter_ns(), self.cat, self.args)
+        return False
+
+    def set(self, **args):
+        """给区间补充参数（如字节数、视频数）"""
+        self.args.update(args)
+
+class Tracer:
+    """追踪记录器（线程安全）；事件先存成元组，导出时再转换"""
+
+    def __init__(self):
+        self.enabled = False
+        self._events = []
+        self._lock = threading.Lock()
+        self._thread_names = {}
+        self._origin = 0
+
+    def start(self):
+        """开始记录（清空上一次的事件）"""
+        with self._lock:
+            self._events = []
+            self._thread_names = {}
+            self._origin = time.perf_counter_ns()
+        self.enabled = True
+
+    def stop(self) -> List[tuple]:
+        """停止记录，返回本次的事件"""
+        self.enabled = False
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+    def now(self) -> int:
+        """与区间时间戳同一时钟的当前时间（纳秒）"""
+        return time.perf_counter_ns()
+
+    def span(self, name: str, cat: str = 'check', **args):
+        """
+        计时区间，用法: with tracer.span('parse', bookmark=name): ...
+
+        同一线程内的区间按时间嵌套显示
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def add_span(self, name: str, start_ns: int, end_ns: int, cat: str = 'check', args: Dict = None):
+        """记录当前线程上一段已计时的区间"""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        tid = thread.ident
+        if tid not in self._thread_names:
+            self._thread_names[tid] = thread.name
+        self._events.append(('X', name, cat, start_ns, end_ns, tid, args or {}, None))
+
+    def add_async(self, name: str, start_ns: int, end_ns: int, span_id, cat: str = 'queue', args: Dict = None):
+        """记录跨线程的区间（如从入队到开始执行），单独成行显示"""
+        if not self.enabled:
+            return
+        self._events.append(('A', name, cat, start_ns, end_ns, threading.get_ident(), args or {}, span_id))
+
+    def to_chrome(self, events: List[tuple], metadata: Optional[Dict] = None) -> Dict:
+        """转换为 Chrome trace 格式"""
+        pid = os.getpid()
+        origin = self._origin
+        trace_events = [
+            {'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in self._thread_names.items()
+        ]
+        for kind, name, cat, start, end, tid, args, span_id in events:
+            ts = (start - origin) / 1000
+            if kind == 'X':
+                trace_events.append({'ph': 'X', 'name': name, 'cat': cat, 'ts': ts,
+                                     'dur': (end - start) / 1000, 'pid': pid, 'tid': tid, 'args': args})
+            else:
+                trace_events.append({'ph': 'b', 'name': name, 'cat': cat, 'ts': ts, 'id': span_id,
+                                     'pid': pid, 'tid': tid, 'args': args})
+                trace_events.append({'ph': 'e', 'name': name, 'cat': cat, 'ts': (end - origin) / 1000,
+                                     'id': span_id, 'pid': pid, 'tid': tid})
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms', 'metadata': metadata or {}}
+
+    def save(self, trace: Dict, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f, ensure_ascii=False)
+
+# 全局实例
+tracer = Tracer()
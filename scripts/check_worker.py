@@ -0,0 +1,151 @@
+"""
+分片检查
+书签放进数据库中的工作队列，任意数量的检查进程按租约领取；多台机器共享同一个数据库时
+也可以一起跑。域名的请求间隔和并发上限通过数据库在所有进程间共享
+
+用法:
+    python scripts/check_worker.py run --processes 4         # 建队列并在本机启动4个检查进程
+    python scripts/check_worker.py enqueue [--adaptive]      # 只建队列，输出检查ID
+    python scripts/check_worker.py work --run-id 12          # 作为检查进程处理某次检查的队列
+    python scripts/check_worker.py status --run-id 12        # 查看队列进度
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+import subprocess
+from datetime import datetime
+
+# Setup paths
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEGACY_DIR = os.path.join(BASE_DIR, 'check update')
+DB_PATH = os.path.join(BASE_DIR, 'database.sqlite')
+TRACE_DIR = os.path.join(LEGACY_DIR, 'logs', 'traces')
+
+sys.path.append(LEGACY_DIR)
+
+from sqlalchemy import or_
+from sqlalchemy.orm import sessionmaker
+
+from models.database import init_db, get_engine, Bookmark, CheckRun, Settings
+from services.update_checker import UpdateChecker
+from services.work_queue import WorkQueue, make_owner_id
+from services.shared_limiter import SharedDomainLimiter
+from services.check_history import rollup_check_history
+from services.request_manager import request_manager
+from utils.log_setup import setup_logging
+
+setup_logging(fmt='%(asctime)s - %(process)d - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def open_db(db_path):
+    init_db(db_path).close()
+    # 多个进程同时写库靠 WAL 和忙等待超时（见 get_engine）
+    engine = get_engine(db_path)
+    return engine, sessionmaker(bind=engine)
+
+def enqueue(Session, engine, adaptive=False) -> int:
+    """新建一次检查并把书签放进工作队列，返回检查ID"""
+    session = Session()
+    try:
+        query = session.query(Bookmark.id)
+        if adaptive:
+            query = query.filter(or_(Bookmark.next_check_at.is_(None), Bookmark.next_check_at <= datetime.now()))
+        bookmark_ids = [bookmark_id for (bookmark_id,) in query]
+        # 记下检查范围：各检查进程按它扫描，本机的 _begin_run 也不会因范围不同把它当成别的检查
+        settings = session.query(Settings).first()
+        update_range_days = settings.update_range_days if settings else 7
+        run = CheckRun(total=len(bookmark_ids), status='running', update_range_days=update_range_days)
+        session.add(run)
+        session.commit()
+        run_id = run.id
+    finally:
+        session.close()
+    WorkQueue(engine, run_id).enqueue(bookmark_ids)
+    logger.info(f"📋 检查 #{run_id}: {len(bookmark_ids)} 个书签已入队")
+    return run_id
+
+def work(Session, engine, run_id, max_workers=None, trace=False):
+    """作为检查进程处理队列，直到队列处理完；trace 时每个进程导出自己的耗时追踪"""
+    owner = make_owner_id()
+    request_manager.set_shared_limiter(SharedDomainLimiter(
+        engine, owner, request_manager.domain_min_interval, request_manager.domain_max_concurrency
+    ))
+    session = Session()
+    try:
+        checker = UpdateChecker(session, max_workers=max_workers, trace=trace or None)
+        checker.trace_dir = TRACE_DIR
+        start = time.time()
+        counts = checker.run_work_queue(WorkQueue(engine, run_id), owner)
+        logger.info(f"✅ {owner} 完成: {counts}，耗时 {time.time() - start:.1f} 秒")
+    finally:
+        session.close()
+
+def finish(Session, engine, run_id):
+    """所有检查进程退出后记录检查结束"""
+    queue = WorkQueue(engine, run_id)
+    counts = queue.counts()
+    session = Session()
+    try:
+        run = session.get(CheckRun, run_id)
+        if run:
+            run.status = 'completed' if queue.is_finished() else 'stopped'
+            run.finished_at = datetime.now()
+            session.commit()
+    finally:
+        session.close()
+    logger.info(f"📊 检查 #{run_id} 队列状态: {counts}")
+    rollup_check_history(engine)
+    return counts
+
+def main():
+    ap = argparse.ArgumentParser(description="分片检查")
+    ap.add_argument('--db', default=DB_PATH, help='数据库路径（多机时为共享数据库）')
+    sub = ap.add_subparsers(dest='command', required=True)
+
+    p_run = sub.add_parser('run', help='建队列并在本机启动多个检查进程')
+    p_run.add_argument('--processes', type=int, default=2)
+    p_run.add_argument('--workers', type=int, default=None, help='每个进程的检查线程数')
+    p_run.add_argument('--adaptive', action='store_true', help='只检查已到期的书签')
+    p_run.add_argument('--trace', action='store_true', help='导出耗时追踪（Chrome trace JSON）')
+
+    p_enqueue = sub.add_parser('enqueue', help='只建队列')
+    p_enqueue.add_argument('--adaptive', action='store_true')
+
+    p_work = sub.add_parser('work', help='处理某次检查的队列')
+    p_work.add_argument('--run-id', type=int, required=True)
+    p_work.add_argument('--workers', type=int, default=None)
+    p_work.add_argument('--trace', action='store_true')
+
+    p_status = sub.add_parser('status', help='查看队列进度')
+    p_status.add_argument('--run-id', type=int, required=True)
+
+    args = ap.parse_args()
+    engine, Session = open_db(args.db)
+
+    if args.command == 'enqueue':
+        print(enqueue(Session, engine, args.adaptive))
+    elif args.command == 'work':
+        work(Session, engine, args.run_id, args.workers, args.trace)
+    elif args.command == 'status':
+        print(WorkQueue(engine, args.run_id).counts())
+    elif args.command == 'run':
+        run_id = enqueue(Session, engine, args.adaptive)
+        cmd = [sys.executable, os.path.abspath(__file__), '--db', args.db, 'work', '--run-id', str(run_id)]
+        if args.workers:
+            cmd += ['--workers', str(args.workers)]
+        if args.trace:
+            cmd.append('--trace')
+        procs = [subprocess.Popen(cmd) for _ in range(args.processes)]
+        try:
+            for proc in procs:
+                proc.wait()
+        except KeyboardInterrupt:
+            for proc in procs:
+                proc.terminate()
+        finish(Session, engine, run_id)
+
+if __name__ == "__main__":
+    main()
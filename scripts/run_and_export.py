@@ -2,6 +2,7 @@ import os
 import sys
 import json
 import logging
+import argparse
 from datetime import datetime
 
 # Setup paths
@@ -9,20 +10,29 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LEGACY_DIR = os.path.join(BASE_DIR, 'check update')
 OUTPUT_FILE = os.path.join(BASE_DIR, 'web-platform', 'frontend', 'data.json')
 DB_PATH = os.path.join(BASE_DIR, 'database.sqlite')
+TRACE_DIR = os.path.join(LEGACY_DIR, 'logs', 'traces')
 
 # Add legacy code to path
 sys.path.append(LEGACY_DIR)
 
-from models.database import init_db, Bookmark, Video, Settings
+from models.database import init_db, get_engine, Bookmark, Video, Settings
 from services.update_checker import UpdateChecker
-from sqlalchemy import create_engine
+from services.check_result import UPDATE, ERROR
+from services.check_history import rollup_check_history
+from utils.log_setup import setup_logging
 from sqlalchemy.orm import sessionmaker
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+setup_logging(fmt='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 def main():
+    ap = argparse.ArgumentParser(description="检查更新并导出")
+    ap.add_argument('--trace', action='store_true', help='导出本次检查的耗时追踪（Chrome trace JSON）')
+    # 每小时运行的定时任务默认只检查到期的书签（next_check_at 随数据库一起保存）
+    ap.add_argument('--all', action='store_true', help='检查全部书签（关闭自适应轮询）')
+    args = ap.parse_args()
+
     logger.info("🚀 Starting automated update check...")
     
     # Ensure database exists
@@ -32,7 +42,10 @@ def main():
         # actually init_db in models uses a hardcoded path usually, let's just connect manually
         pass
 
-    engine = create_engine(f'sqlite:///{DB_PATH}')
+    # 建表并补齐旧数据库缺少的列
+    init_db(DB_PATH).close()
+
+    engine = get_engine(DB_PATH)
     Session = sessionmaker(bind=engine)
     session = Session()
     
@@ -48,10 +61,20 @@ def main():
         logger.info(f"Update range: {update_range_days} days")
         
         # Run Check
-        checker = UpdateChecker(session)
-        updates = checker.check_all_bookmarks()
+        checker = UpdateChecker(session, adaptive=not args.all, trace=args.trace or None)
+        checker.trace_dir = TRACE_DIR
+        found = 0
+        errors = 0
+        for result in checker.iter_check_results():
+            if result.kind == UPDATE:
+                found += len(result.videos)
+                for video in result.videos:
+                    logger.info(f"🆕 {result.bookmark.name}: {video.title}")
+            elif result.kind == ERROR:
+                errors += 1
         
-        logger.info(f"✅ Check complete. Found {len(updates)} distinct updates.")
+        logger.info(f"✅ Check complete. Found {found} distinct updates, {errors} errors.")
+        rollup_check_history(engine)
         
         # Prepare data for export
         # We need to fetch ALL relevant updates from database to show in the frontend, 
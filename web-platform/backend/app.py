@@ -2,15 +2,19 @@ import os
 import sys
 import time
 import json
+import logging
 import webbrowser
 import subprocess
 import asyncio
 import threading
+import bisect
+import itertools
+import uuid
 from typing import List, Dict
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, BackgroundTasks
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -25,10 +29,15 @@ if LEGACY_DIR not in sys.path:
 # Add legacy code to path
 sys.path.append(LEGACY_DIR)
 
-from models.database import init_db, Bookmark, Video, Settings
+from models.database import init_db, get_engine, get_data_version, Bookmark, Video, Settings
 from services.update_checker import UpdateChecker
+from services.check_result import ERROR
+from services.check_history import rollup_check_history, creator_reliability
+from services.video_search import search_videos
 from services.request_manager import request_manager
 from utils.page_cache import page_cache
+from utils.selector_memo import selector_memo
+from utils.log_setup import setup_logging
 
 app = FastAPI()
 app.add_middleware(
@@ -43,25 +52,30 @@ frontend_dir = os.path.join(BASE_DIR, '..', 'frontend')
 app.mount("/static", StaticFiles(directory=os.path.normpath(frontend_dir)), name="static")
 
 @app.head("/api/stats")
-@app.get("/api/stats")
 def health_check():
+    """前端的在线检测（只发 HEAD，不收集统计）"""
     return {"status": "online", "type": "dynamic"}
 
 @app.get("/")
 def index():
     return FileResponse(os.path.normpath(os.path.join(frontend_dir, 'index.html')))
 
-from sqlalchemy import create_engine
+from sqlalchemy import select
 from sqlalchemy.orm import sessionmaker
 from pydantic import BaseModel
 
 # Use the database in the root directory which contains the actual data
-db_path = os.path.join(ROOT_DIR, 'database.sqlite')
-if not os.path.exists(db_path):
+# （环境变量 CHECKER_DB_PATH 可指定其他数据库，测试时用临时文件）
+db_path = os.environ.get('CHECKER_DB_PATH') or os.path.join(ROOT_DIR, 'database.sqlite')
+if not os.path.exists(db_path) and 'CHECKER_DB_PATH' not in os.environ:
     # Fallback to legacy directory if root db doesn't exist
     db_path = os.path.join(LEGACY_DIR, 'database.sqlite')
 
-engine = create_engine(f'sqlite:///{db_path}')
+# 补齐旧数据库缺少的列（如 next_check_at）
+init_db(db_path).close()
+
+# 进程内唯一的引擎（WAL，检查写入时 API 仍可读）
+engine = get_engine(db_path)
 Session = sessionmaker(bind=engine)
 
 # Configure Logging
@@ -69,16 +83,12 @@ log_dir = os.path.join(LEGACY_DIR, 'logs')
 os.makedirs(log_dir, exist_ok=True)
 log_file = os.path.join(log_dir, 'app.log')
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+setup_logging(log_file)
 logger = logging.getLogger(__name__)
 
+# 检查耗时追踪（Chrome trace JSON）
+trace_dir = os.path.join(log_dir, 'traces')
+
 # Verify Database
 try:
     with Session() as s:
@@ -87,8 +97,6 @@ try:
 except Exception as e:
     logger.error(f"❌ Database connection failed: {e}")
 
-class SettingsModel(BaseModel):
-
 class SettingsModel(BaseModel):
     check_interval: int
     update_range_days: int
@@ -171,11 +179,13 @@ print(f"Using database at: {db_path}")
 
 # Create our own session factory to avoid 'Session object is not callable' error
 # and to ensure thread safety with new sessions for each request/thread
-engine = create_engine(f'sqlite:///{db_path}')
 SessionFactory = sessionmaker(bind=engine)
 
 clients: List[WebSocket] = []
-updates_cache: List[Dict] = []
+updates_cache: List[Dict] = []  # 按 seq 递增排列
+updates_seq = itertools.count(1)  # 进程内全局递增，新一轮检查不重置，旧游标仍然有效
+updates_version = 0  # updates_cache 每次变化加一，用作 ETag
+BOOT_ID = uuid.uuid4().hex[:8]  # 每次启动不同：重启后版本号从 0 重新计数，旧 ETag 不能再命中
 main_loop = None
 clients_lock = threading.Lock()
 
@@ -211,30 +221,111 @@ async def ws_progress(ws: WebSocket):
             if ws in clients:
                 clients.remove(ws)
 
+# 列表接口每页条数
+PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+def _page_size(limit: int, after: int):
+    """每页条数；after 和 limit 都没给时返回 None，表示不分页（兼容分页前的调用方）"""
+    if limit is None and after is None:
+        return None
+    return max(1, min(limit or PAGE_SIZE, MAX_PAGE_SIZE))
+
+def _cached_json(request: Request, etag: str, build):
+    """
+    带 ETag 的 JSON 响应：If-None-Match 与当前版本一致时直接回 304，不查询也不序列化
+
+    Args:
+        etag: 由数据版本和分页参数组成的 ETag
+        build: 生成响应内容的函数，仅在需要返回数据时调用
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build(), headers=headers)
+
 @app.get("/api/bookmarks")
-def list_bookmarks():
-    sess = SessionFactory()
-    rows = sess.query(Bookmark).all()
-    data = []
-    for b in rows:
-        data.append({
-            "id": b.id,
-            "name": b.name or "",
-            "url": b.url,
-            "avatar_url": b.avatar_url or ""
-        })
-    sess.close()
-    return {"data": data}
+def list_bookmarks(request: Request, after: int = None, limit: int = None):
+    """
+    书签列表，按 id 升序：传 after（上一页的 next_cursor）或 limit 时分页，都不传时返回全部；
+    只查列表需要的列，书签增删改名时 ETag 才会变化
+    """
+    limit = _page_size(limit, after)
+    after = after or 0
+    with engine.connect() as conn:
+        version = get_data_version(conn, 'bookmarks')
+
+    def build():
+        columns = Bookmark.__table__.c
+        query = (select(columns.id, columns.name, columns.url, columns.avatar_url)
+                 .where(columns.id > after).order_by(columns.id))
+        if limit is not None:
+            query = query.limit(limit + 1)
+        with engine.connect() as conn:
+            rows = conn.execute(query).fetchall()
+        has_more = limit is not None and len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "data": [{"id": id_, "name": name or "", "url": url, "avatar_url": avatar_url or ""}
+                     for id_, name, url, avatar_url in rows],
+            "next_cursor": rows[-1][0] if rows else after,
+            "has_more": has_more
+        }
+
+    return _cached_json(request, f'W/"bookmarks-{version}-{after}-{limit or "all"}"', build)
 
 @app.get("/api/updates")
-def get_updates():
-    return {"data": updates_cache}
+def get_updates(request: Request, after: int = None, limit: int = None):
+    """
+    本轮检查发现的更新，按 seq 升序：轮询时把上次的 next_cursor 作为 after，
+    只取新增的条目，都不传时返回全部；没有新条目时 ETag 不变，回 304
+    """
+    limit = _page_size(limit, after)
+    after = after or 0
+
+    def build():
+        items = list(updates_cache)
+        start = bisect.bisect_right(items, after, key=lambda item: item["seq"])
+        end = len(items) if limit is None else start + limit
+        page = items[start:end]
+        return {
+            "data": page,
+            "next_cursor": page[-1]["seq"] if page else after,
+            "has_more": end < len(items)
+        }
+
+    return _cached_json(request, f'W/"updates-{BOOT_ID}-{updates_version}-{after}-{limit or "all"}"', build)
 
 @app.get("/api/stats")
 def get_stats():
+    """在线状态和综合统计（请求管理器、页面缓存、解析选择器命中）"""
     req = request_manager.get_statistics()
     cache = page_cache.get_stats()
-    return {"request": req, "cache": cache}
+    selectors = selector_memo.get_stats()
+    return {"status": "online", "type": "dynamic", "request": req, "cache": cache, "selectors": selectors}
+
+@app.get("/api/reliability")
+def get_reliability(days: int = 30, bookmark_id: int = None):
+    """各创作者最近 days 天的检查可靠性（错误率、平均耗时、304 次数等）"""
+    names = {}
+    with engine.connect() as conn:
+        rows = creator_reliability(conn, days, bookmark_id)
+    if rows:
+        sess = SessionFactory()
+        try:
+            names = dict(sess.query(Bookmark.id, Bookmark.name).all())
+        finally:
+            sess.close()
+    for row in rows:
+        row['name'] = names.get(row['bookmark_id'], '')
+    return {"data": rows}
+
+@app.get("/api/search")
+def search(q: str = "", limit: int = 50):
+    """在全部历史视频的标题和创作者名中搜索"""
+    with engine.connect() as conn:
+        rows = search_videos(conn, q, max(1, min(limit, 200)))
+    return {"data": rows}
 
 @app.get("/api/logs")
 def get_logs():
@@ -251,17 +342,28 @@ def get_logs():
 
 current_checker = None
 checker_lock = threading.Lock()
+last_trace_path = None
 
-def run_check(update_range_days: int):
-    global current_checker
+def add_update(item: Dict):
+    global updates_version
+    item["seq"] = next(updates_seq)
+    updates_cache.append(item)
+    updates_version += 1
+
+def clear_updates():
+    global updates_version
+    updates_cache.clear()
+    updates_version += 1
+
+def run_check(update_range_days: int, adaptive: bool = None, trace: bool = None):
+    global current_checker, last_trace_path
     sess = SessionFactory()
-    checker = UpdateChecker(sess)
+    checker = UpdateChecker(sess, adaptive=adaptive, trace=trace)
+    checker.trace_dir = trace_dir
     
     with checker_lock:
         current_checker = checker
         
-    def on_progress(current, total, name, speed=0.0):
-        broadcast({"type": "progress", "current": current, "total": total, "name": name, "speed": speed})
     def on_item(update):
         try:
             b = update.get("bookmark")
@@ -280,40 +382,60 @@ def run_check(update_range_days: int):
                     "relative_time": getattr(v, "relative_time", "")
                 }
             }
-            updates_cache.append(item)
+            add_update(item)
             broadcast({"type": "item", "data": item})
         except Exception:
             pass
-    checker.set_progress_callback(on_progress)
-    checker.set_item_callback(on_item)
-    updates_cache.clear()
+    clear_updates()
     
     try:
         logger.info(f"🚀 Starting check for range: {update_range_days} days")
-        res = checker.check_all_bookmarks()
-        logger.info(f"✅ Check complete. Found {len(res)} updates.")
-        broadcast({"type": "done", "count": len(res)})
+        # 结果按完成顺序流式到达，逐条推送给前端
+        start = time.time()
+        count = 0
+        errors = 0
+        for result in checker.iter_check_results():
+            for update in result.updates:
+                on_item(update)
+            count += len(result.videos)
+            errors += result.kind == ERROR
+            elapsed = time.time() - start
+            broadcast({"type": "progress", "current": result.completed, "total": result.total,
+                       "name": result.bookmark.name, "speed": result.completed / elapsed if elapsed > 0 else 0.0})
+        logger.info(f"✅ Check complete. Found {count} updates, {errors} errors.")
+        broadcast({"type": "done", "count": count, "errors": errors})
     except Exception as e:
         logger.error(f"❌ Check failed: {e}", exc_info=True)
     finally:
+        if checker.last_trace_path:
+            last_trace_path = checker.last_trace_path
         with checker_lock:
             current_checker = None
         sess.close()
 
 @app.post("/api/check")
-def start_check(update_range_days: int = 7, background_tasks: BackgroundTasks = None):
+def start_check(update_range_days: int = 7, adaptive: bool = None, trace: bool = None,
+                background_tasks: BackgroundTasks = None):
     global current_checker
     with checker_lock:
         if current_checker is not None:
             return {"status": "running"}
             
     if background_tasks is None:
-        t = threading.Thread(target=run_check, args=(update_range_days,), daemon=True)
+        t = threading.Thread(target=run_check, args=(update_range_days, adaptive, trace), daemon=True)
         t.start()
     else:
-        background_tasks.add_task(run_check, update_range_days)
+        background_tasks.add_task(run_check, update_range_days, adaptive, trace)
     return {"status": "started"}
 
+@app.get("/api/check/trace")
+def get_check_trace(run_id: int = None):
+    """检查的耗时追踪（Chrome trace JSON），不指定 run_id 时返回最近一次"""
+    path = os.path.join(trace_dir, f"check_{run_id}.json") if run_id is not None else last_trace_path
+    if not path or not os.path.exists(path):
+        return {"status": "not_found"}
+    return FileResponse(path, media_type="application/json", filename=os.path.basename(path))
+
 @app.post("/api/stop")
 def stop_check():
     global current_checker
@@ -370,9 +492,19 @@ async def auto_check_loop():
             print(f"Auto-check loop error: {e}")
             await asyncio.sleep(60)
 
+async def history_rollup_loop():
+    """每小时把过期的检查记录汇总为按小时/按天的统计"""
+    while True:
+        try:
+            await asyncio.to_thread(rollup_check_history, engine)
+        except Exception as e:
+            logger.error(f"检查记录汇总失败: {e}")
+        await asyncio.sleep(3600)
+
 @app.on_event("startup")
 async def start_background_tasks():
     asyncio.create_task(auto_check_loop())
+    asyncio.create_task(history_rollup_loop())
 
 if __name__ == "__main__":
     import uvicorn
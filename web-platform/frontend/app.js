@@ -10,6 +10,7 @@ const emptyState = document.getElementById('emptyState');
 const updateCount = document.getElementById('updateCount');
 const statusIndicator = document.getElementById('statusIndicator');
 const searchInput = document.getElementById('searchInput');
+const searchGrid = document.getElementById('searchGrid');
 const toastContainer = document.getElementById('toastContainer');
 
 // Settings Elements
@@ -87,18 +88,7 @@ function updateProgress(data) {
     progressText.textContent = `正在检查: ${data.name}`;
 }
 
-function addCard(item) {
-    if (emptyState.style.display !== 'none') {
-        emptyState.style.display = 'none';
-    }
-
-    // Store raw data for search
-    const cardData = {
-        element: null,
-        title: item.video.title.toLowerCase(),
-        author: item.bookmark.name.toLowerCase()
-    };
-
+function createCard(item) {
     const card = document.createElement('div'); // Wrapper div
     card.className = 'card';
 
@@ -150,6 +140,26 @@ function addCard(item) {
             </div>
         </div>
     `;
+    return card;
+}
+
+function addCard(item) {
+    if (emptyState.style.display !== 'none') {
+        emptyState.style.display = 'none';
+    }
+
+    // Store raw data for search
+    const cardData = {
+        element: null,
+        title: item.video.title.toLowerCase(),
+        author: item.bookmark.name.toLowerCase()
+    };
+
+    const card = createCard(item);
+    // 正在显示历史搜索结果时，新卡片先隐藏
+    if (searchGrid.style.display !== 'none') {
+        card.style.display = 'none';
+    }
 
     // Add entrance animation
     card.style.opacity = '0';
@@ -419,22 +429,56 @@ resetBtn.addEventListener('click', () => {
     }
 });
 
-searchInput.addEventListener('input', (e) => {
-    const term = e.target.value.toLowerCase();
-    let visibleCount = 0;
+// 搜索：输入时先即时过滤本次结果，停顿后再到后端搜索全部历史视频
+let searchTimer = null;
+let searchSeq = 0;
 
+function filterCards(term) {
     allCards.forEach(card => {
         const visible = card.title.includes(term) || card.author.includes(term);
         card.element.style.display = visible ? 'flex' : 'none';
-        if (visible) visibleCount++;
     });
+    updateCountBadge();
+}
 
-    // Update empty state based on search result
-    if (visibleCount === 0 && allCards.length > 0) {
-        // Maybe show a "No search results" state?
+function showRunCards() {
+    searchGrid.style.display = 'none';
+    searchGrid.innerHTML = '';
+    cardsGrid.style.display = '';
+    emptyState.style.display = allCards.length === 0 ? 'block' : 'none';
+}
+
+async function searchHistory(term) {
+    const seq = ++searchSeq;
+    try {
+        const res = await fetch(`/api/search?q=${encodeURIComponent(term)}&limit=100`);
+        const data = await res.json();
+        if (seq !== searchSeq) return; // 已有更新的搜索
+
+        searchGrid.innerHTML = '';
+        data.data.forEach(item => searchGrid.appendChild(createCard(item)));
+        cardsGrid.style.display = 'none';
+        searchGrid.style.display = '';
+        emptyState.style.display = data.data.length === 0 ? 'block' : 'none';
+        updateCount.textContent = data.data.length;
+    } catch (error) {
+        console.error('Search failed:', error);
     }
+}
 
-    updateCountBadge();
+searchInput.addEventListener('input', (e) => {
+    const term = e.target.value.trim().toLowerCase();
+    clearTimeout(searchTimer);
+
+    if (!term) {
+        searchSeq++;
+        showRunCards();
+        filterCards('');
+        return;
+    }
+
+    filterCards(term);
+    searchTimer = setTimeout(() => searchHistory(term), 250);
 });
 
 // Settings Events